@@ -0,0 +1,306 @@
+# scripts/benchmarks/carga.py
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import sys
+import time
+from urllib.parse import urlsplit
+
+# Mensajes del chat web por idioma; se combinan con MENSAJES_UNICOS para simular preguntas irrepetibles
+MENSAJES = {
+    'es': [
+        'Hola, ¿cuál es el precio del plan premium?',
+        '¿Qué horario tienen los sábados?',
+        '¿Dónde están ubicados?',
+        'Necesito el teléfono de contacto, por favor',
+        '¿Cuánto cuesta el servicio?',
+        'Buenos días',
+        'ok gracias'
+    ],
+    'en': [
+        'What are your business hours?',
+        'How much does the enterprise plan cost?',
+        'Where is your office located?',
+        'Hello! How can I contact support?',
+        'What is the price?',
+        'thanks'
+    ],
+    'pt': [
+        'Qual é o preço do plano básico?',
+        'Onde fica o endereço de vocês?',
+        'Olá, qual o horário de atendimento?',
+        'Preciso falar com alguém, qual o telefone?',
+        'Quanto custa o serviço?',
+        'obrigado'
+    ]
+}
+MENSAJES_UNICOS = {
+    'es': 'Quisiera saber el precio para {n} usuarios en mi empresa',
+    'en': 'I would like to know the price for {n} users at my company',
+    'pt': 'Gostaria de saber o preço para {n} usuários na minha empresa'
+}
+
+# Límites superiores (ms) de las barras del histograma de latencia
+LIMITES_HISTOGRAMA_MS = [0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, math.inf]
+
+# Escalón saturado: throughput por debajo de este porcentaje del objetivo o más errores que TASA_ERROR_SATURACION
+PORCENTAJE_SATURACION = 0.95
+TASA_ERROR_SATURACION = 0.01
+
+
+def parsear_mezcla(texto):
+    """'es=0.5,en=0.3,pt=0.2' -> {'es': 0.5, 'en': 0.3, 'pt': 0.2}"""
+    mezcla = {}
+    for parte in texto.split(','):
+        idioma, _, peso = parte.partition('=')
+        idioma = idioma.strip()
+        if idioma not in MENSAJES:
+            raise argparse.ArgumentTypeError(f"Idioma no soportado: {idioma}")
+        mezcla[idioma] = float(peso)
+    if sum(mezcla.values()) <= 0:
+        raise argparse.ArgumentTypeError('La mezcla debe tener algún peso positivo')
+    return mezcla
+
+
+def parsear_escalones(texto):
+    return [float(rps) for rps in texto.split(',') if rps.strip()]
+
+
+class GeneradorMensajes:
+    """
+    Elige el siguiente turno: cada sesión tiene un idioma fijo según la
+    mezcla y pregunta por mensajes de ese idioma; una fracción de los turnos
+    lleva un número al azar para que no se repita.
+    """
+
+    def __init__(self, mezcla, sesiones, proporcion_unicos, semilla):
+        self.aleatorio = random.Random(semilla)
+        idiomas = list(mezcla)
+        pesos = [mezcla[idioma] for idioma in idiomas]
+        self.idiomas_sesion = self.aleatorio.choices(idiomas, pesos, k=sesiones)
+        self.proporcion_unicos = proporcion_unicos
+
+    def siguiente(self):
+        sesion = self.aleatorio.randrange(len(self.idiomas_sesion))
+        idioma = self.idiomas_sesion[sesion]
+        if self.aleatorio.random() < self.proporcion_unicos:
+            mensaje = MENSAJES_UNICOS[idioma].format(n=self.aleatorio.randrange(10, 100000))
+        else:
+            mensaje = self.aleatorio.choice(MENSAJES[idioma])
+        return idioma, json.dumps({'message': mensaje, 'sessionId': f'carga-{sesion}'}, ensure_ascii=False)
+
+
+def armar_peticion(host, puerto, ruta, cuerpo):
+    datos = cuerpo.encode('utf-8')
+    encabezado = (
+        f'POST {ruta} HTTP/1.1\r\n'
+        f'Host: {host}:{puerto}\r\n'
+        'Content-Type: application/json\r\n'
+        f'Content-Length: {len(datos)}\r\n'
+        'Connection: close\r\n\r\n'
+    )
+    return encabezado.encode('ascii') + datos
+
+
+async def enviar(host, puerto, peticion):
+    """Envía la petición por una conexión nueva y devuelve (status, cuerpo)"""
+    reader, writer = await asyncio.open_connection(host, puerto)
+    try:
+        writer.write(peticion)
+        await writer.drain()
+        respuesta = await reader.read()
+    finally:
+        writer.close()
+
+    cabecera, _, cuerpo = respuesta.partition(b'\r\n\r\n')
+    linea_estado = cabecera.split(b'\r\n', 1)[0].split()
+    if len(linea_estado) < 2:
+        raise ConnectionError('respuesta incompleta')
+    return int(linea_estado[1]), cuerpo
+
+
+def clasificar(status, cuerpo, idioma):
+    """Resultado de una respuesta: 'ok', 'idioma_incorrecto' o el tipo de error"""
+    if status != 200:
+        return f'http_{status}'
+    try:
+        datos = json.loads(cuerpo)
+    except ValueError:
+        return 'cuerpo_invalido'
+    if datos.get('status') == 'error':
+        return 'error_aplicacion'
+    return 'ok' if datos.get('detectedLanguage') == idioma else 'idioma_incorrecto'
+
+
+async def ejecutar_escalon(destino, generador, rps, duracion, args, medir=True):
+    """
+    Dispara peticiones a `rps` durante `duracion` segundos en lazo abierto:
+    cada llegada se programa sin esperar a las anteriores, y la latencia se
+    mide desde el instante programado para no ocultar las colas del servidor.
+    """
+    host, puerto, ruta = destino
+    resultados = {'latencias': [], 'tipos': {}, 'retrasos': [], 'descartadas': 0}
+    en_vuelo = set()
+    aleatorio = random.Random(args.semilla + int(rps))
+
+    async def una_peticion(programada, idioma, cuerpo):
+        try:
+            status, respuesta = await asyncio.wait_for(
+                enviar(host, puerto, armar_peticion(host, puerto, ruta, cuerpo)), args.timeout)
+            tipo = clasificar(status, respuesta, idioma)
+        except asyncio.TimeoutError:
+            tipo = 'timeout'
+        except OSError:
+            tipo = 'conexion'
+        if tipo in ('ok', 'idioma_incorrecto'):
+            resultados['latencias'].append(time.perf_counter() - programada)
+        resultados['tipos'][tipo] = resultados['tipos'].get(tipo, 0) + 1
+
+    loop = asyncio.get_running_loop()
+    inicio = time.perf_counter()
+    programada = inicio
+    while programada - inicio < duracion:
+        espera = programada - time.perf_counter()
+        if espera > 0:
+            await asyncio.sleep(espera)
+        resultados['retrasos'].append(time.perf_counter() - programada)
+
+        if len(en_vuelo) >= args.max_en_vuelo:
+            resultados['descartadas'] += 1
+        else:
+            idioma, cuerpo = generador.siguiente()
+            tarea = loop.create_task(una_peticion(programada, idioma, cuerpo))
+            en_vuelo.add(tarea)
+            tarea.add_done_callback(en_vuelo.discard)
+
+        intervalo = aleatorio.expovariate(rps) if args.llegadas == 'poisson' else 1.0 / rps
+        programada += intervalo
+
+    if en_vuelo:
+        await asyncio.wait(en_vuelo)
+    transcurrido = time.perf_counter() - inicio
+    return resumir(rps, transcurrido, resultados) if medir else None
+
+
+def percentil(ordenadas, q):
+    if not ordenadas:
+        return None
+    return round(ordenadas[min(len(ordenadas) - 1, int(q * len(ordenadas)))] * 1000, 3)
+
+
+def histograma(latencias):
+    conteos = [0] * len(LIMITES_HISTOGRAMA_MS)
+    for latencia in latencias:
+        ms = latencia * 1000
+        for i, limite in enumerate(LIMITES_HISTOGRAMA_MS):
+            if ms <= limite:
+                conteos[i] += 1
+                break
+    return [{'hasta_ms': None if math.isinf(limite) else limite, 'conteo': conteo}
+            for limite, conteo in zip(LIMITES_HISTOGRAMA_MS, conteos)]
+
+
+def resumir(rps, transcurrido, resultados):
+    latencias = sorted(resultados['latencias'])
+    tipos = resultados['tipos']
+    respondidas = tipos.get('ok', 0) + tipos.get('idioma_incorrecto', 0)
+    intentadas = sum(tipos.values()) + resultados['descartadas']
+    errores = intentadas - respondidas
+    throughput = respondidas / transcurrido if transcurrido else 0.0
+    tasa_error = errores / intentadas if intentadas else 0.0
+    return {
+        'objetivo_rps': rps,
+        'intentadas': intentadas,
+        'respondidas': respondidas,
+        'throughput_rps': round(throughput, 1),
+        'tasa_error': round(tasa_error, 4),
+        'resultados': dict(sorted(tipos.items())),
+        'descartadas': resultados['descartadas'],
+        'latencia_ms': {
+            'p50': percentil(latencias, 0.50), 'p90': percentil(latencias, 0.90),
+            'p99': percentil(latencias, 0.99), 'p999': percentil(latencias, 0.999),
+            'max': round(latencias[-1] * 1000, 3) if latencias else None
+        },
+        'retraso_generador_p99_ms': percentil(sorted(resultados['retrasos']), 0.99),
+        'histograma': histograma(latencias),
+        'saturado': throughput < PORCENTAJE_SATURACION * rps or tasa_error > TASA_ERROR_SATURACION
+    }
+
+
+def imprimir_escalon(datos):
+    latencia = datos['latencia_ms']
+    print(f"\n{datos['objetivo_rps']:.0f} rps objetivo -> {datos['throughput_rps']} rps logrados, "
+          f"tasa de error {datos['tasa_error'] * 100:.2f}%{'  [SATURADO]' if datos['saturado'] else ''}")
+    print(f"    resultados {datos['resultados']}  descartadas {datos['descartadas']}")
+    print(f"    latencia ms  p50 {latencia['p50']}  p90 {latencia['p90']}  p99 {latencia['p99']}  "
+          f"p99.9 {latencia['p999']}  max {latencia['max']}")
+
+    total = sum(barra['conteo'] for barra in datos['histograma']) or 1
+    for barra in datos['histograma']:
+        if barra['conteo']:
+            etiqueta = f"<= {barra['hasta_ms']:g} ms" if barra['hasta_ms'] is not None else '>  5000 ms'
+            proporcion = barra['conteo'] / total
+            print(f"    {etiqueta:>12} {barra['conteo']:>8}  {'#' * max(1, round(proporcion * 50))}")
+
+    if datos['retraso_generador_p99_ms'] and datos['retraso_generador_p99_ms'] > 5:
+        print(f"    aviso: el generador salió con {datos['retraso_generador_p99_ms']} ms de retraso (p99); "
+              f"el límite puede ser este proceso y no el servidor")
+
+
+async def correr(args):
+    partes = urlsplit(args.url)
+    destino = (partes.hostname, partes.port or 80, partes.path or '/')
+    generador = GeneradorMensajes(args.mezcla, args.sesiones, args.proporcion_unicos, args.semilla)
+
+    if args.calentamiento > 0:
+        await ejecutar_escalon(destino, generador, args.rps[0], args.calentamiento, args, medir=False)
+
+    escalones = []
+    for rps in args.rps:
+        datos = await ejecutar_escalon(destino, generador, rps, args.duracion, args)
+        imprimir_escalon(datos)
+        escalones.append(datos)
+
+    saturados = [datos['objetivo_rps'] for datos in escalones if datos['saturado']]
+    if saturados:
+        print(f"\nSaturación a partir de {saturados[0]:.0f} rps objetivo")
+    return escalones
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generador de carga en lazo abierto contra el Orchestrator servido por HTTP.')
+    parser.add_argument('--url', type=str, default='http://127.0.0.1:8080/chat')
+    parser.add_argument('--rps', type=parsear_escalones, default=[100.0],
+                        help='Peticiones por segundo objetivo; una lista separada por comas corre un escalón por valor.')
+    parser.add_argument('--duracion', type=float, default=10.0, help='Segundos medidos por escalón.')
+    parser.add_argument('--calentamiento', type=float, default=2.0, help='Segundos iniciales sin medir, al primer rps.')
+    parser.add_argument('--mezcla', type=parsear_mezcla, default='es=0.5,en=0.3,pt=0.2', help='Peso de cada idioma.')
+    parser.add_argument('--sesiones', type=int, default=500, help='Sesiones distintas; cada una con un idioma fijo.')
+    parser.add_argument('--proporcion-unicos', type=float, default=0.05, help='Fracción de mensajes que no se repiten.')
+    parser.add_argument('--llegadas', choices=['poisson', 'constante'], default='poisson')
+    parser.add_argument('--max-en-vuelo', type=int, default=1000,
+                        help='Peticiones simultáneas; las llegadas que lo exceden se cuentan como descartadas.')
+    parser.add_argument('--timeout', type=float, default=5.0, help='Segundos antes de contar una petición como timeout.')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--output', type=str, help='Archivo JSON donde guardar el resultado.')
+    args = parser.parse_args()
+
+    escalones = asyncio.run(correr(args))
+
+    if args.output:
+        resultado = {
+            'python': platform.python_version(),
+            'plataforma': sys.platform,
+            'parametros': {k: v for k, v in vars(args).items() if k != 'output'},
+            'escalones': escalones
+        }
+        with open(args.output, 'w') as f:
+            json.dump(resultado, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+# scripts/benchmarks/fake_dynamodb.py
+
+import copy
+import json
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src', 'backend'))
+
+import aws_clients
+from aws_clients import deserializar_item, serializar_item
+
+# Límite de datos por página de scan que aplica DynamoDB
+TAMANO_PAGINA_BYTES = 1024 * 1024
+
+# Temas reales de la FAQ, para que los mensajes de ejemplo encuentren respuesta
+ITEMS_FAQ = [
+    {'keyword': 'precio', 'variaciones': ['costo', 'precios', 'price', 'preço'],
+     'respuesta_es': 'Precios desde $50 mensuales', 'respuesta_en': 'Prices from $50 monthly',
+     'respuesta_pt': 'Preços a partir de $50 mensais'},
+    {'keyword': 'horario', 'variaciones': ['horarios', 'hours', 'horário'],
+     'respuesta_es': 'Lunes a viernes de 9 a 18', 'respuesta_en': 'Monday to Friday 9 to 6',
+     'respuesta_pt': 'Segunda a sexta das 9 às 18'},
+    {'keyword': 'ubicacion', 'variaciones': ['direccion', 'location', 'endereço'],
+     'respuesta_es': 'Av. Principal 123', 'respuesta_en': 'Main Ave 123', 'respuesta_pt': 'Av. Principal 123'},
+    {'keyword': 'contacto', 'variaciones': ['telefono', 'contact', 'telefone'],
+     'respuesta_es': 'soporte@smartcloud.com', 'respuesta_en': 'support@smartcloud.com',
+     'respuesta_pt': 'suporte@smartcloud.com'}
+]
+
+
+def tamano_item(item):
+    """Aproxima el tamaño en bytes de un item tal como lo contabiliza DynamoDB"""
+    return len(json.dumps(item, ensure_ascii=False, default=str).encode('utf-8'))
+
+
+class TablaFalsa:
+    """
+    Sustituto en memoria de un boto3 `Table` para benchmarks locales.
+
+    Implementa get_item, put_item y scan (paginado a 1 MB con
+    LastEvaluatedKey) y lleva la cuenta de llamadas, items leídos y
+    unidades de lectura consumidas. Opcionalmente simula la latencia de
+    red de cada llamada.
+    """
+
+    def __init__(self, nombre, clave, items=(), latencia_ms=0.0):
+        self.name = nombre
+        self.clave = clave
+        self.latencia_ms = latencia_ms
+        self.items = {}
+        self.orden = []
+        self.reiniciar_contadores()
+        for item in items:
+            self.put_item(Item=item)
+        self.reiniciar_contadores()
+
+    def reiniciar_contadores(self):
+        self.llamadas = {'get_item': 0, 'put_item': 0, 'scan': 0}
+        self.items_leidos = 0
+        self.unidades_lectura = 0.0
+
+    def _esperar(self):
+        if self.latencia_ms:
+            time.sleep(self.latencia_ms / 1000.0)
+
+    def _proyectar(self, item, kwargs):
+        proyeccion = kwargs.get('ProjectionExpression')
+        if not proyeccion:
+            return copy.deepcopy(item)
+        nombres = kwargs.get('ExpressionAttributeNames', {})
+        atributos = [nombres.get(a.strip(), a.strip()) for a in proyeccion.split(',')]
+        return {a: copy.deepcopy(item[a]) for a in atributos if a in item}
+
+    def get_item(self, Key, **kwargs):
+        self._esperar()
+        self.llamadas['get_item'] += 1
+        item = self.items.get(Key[self.clave])
+        if item is None:
+            self.unidades_lectura += 0.5
+            return {}
+        self.items_leidos += 1
+        self.unidades_lectura += math.ceil(tamano_item(item) / 4096) * 0.5
+        return {'Item': self._proyectar(item, kwargs)}
+
+    def put_item(self, Item, **kwargs):
+        self.llamadas['put_item'] += 1
+        clave = Item[self.clave]
+        if clave not in self.items:
+            self.orden.append(clave)
+        self.items[clave] = copy.deepcopy(Item)
+        return {}
+
+    def scan(self, **kwargs):
+        self._esperar()
+        self.llamadas['scan'] += 1
+        inicio = 0
+        if 'ExclusiveStartKey' in kwargs:
+            inicio = self.orden.index(kwargs['ExclusiveStartKey'][self.clave]) + 1
+
+        pagina, bytes_leidos = [], 0
+        posicion = inicio
+        while posicion < len(self.orden) and bytes_leidos < TAMANO_PAGINA_BYTES:
+            item = self.items[self.orden[posicion]]
+            bytes_leidos += tamano_item(item)
+            pagina.append(self._proyectar(item, kwargs))
+            posicion += 1
+
+        self.items_leidos += len(pagina)
+        self.unidades_lectura += math.ceil(bytes_leidos / 4096) * 0.5
+        response = {'Items': pagina, 'Count': len(pagina), 'ScannedCount': len(pagina)}
+        if posicion < len(self.orden):
+            response['LastEvaluatedKey'] = {self.clave: self.orden[posicion - 1]}
+        return response
+
+
+class ClienteFalso:
+    """
+    Sustituto en memoria del cliente de bajo nivel de DynamoDB.
+
+    Traduce el formato tipado del cliente a las `TablaFalsa` registradas,
+    que son las que llevan los contadores.
+    """
+
+    class exceptions:
+        class ConditionalCheckFailedException(Exception):
+            pass
+
+    def __init__(self, *tablas):
+        self.tablas = {tabla.name: tabla for tabla in tablas}
+
+    def get_item(self, TableName, Key, **kwargs):
+        response = self.tablas[TableName].get_item(Key=deserializar_item(Key), **kwargs)
+        if 'Item' in response:
+            response['Item'] = serializar_item(response['Item'])
+        return response
+
+    def put_item(self, TableName, Item, **kwargs):
+        return self.tablas[TableName].put_item(Item=deserializar_item(Item))
+
+    def scan(self, TableName, **kwargs):
+        if 'ExclusiveStartKey' in kwargs:
+            kwargs['ExclusiveStartKey'] = deserializar_item(kwargs['ExclusiveStartKey'])
+        response = self.tablas[TableName].scan(**kwargs)
+        response['Items'] = [serializar_item(item) for item in response['Items']]
+        if 'LastEvaluatedKey' in response:
+            response['LastEvaluatedKey'] = serializar_item(response['LastEvaluatedKey'])
+        return response
+
+    def batch_get_item(self, RequestItems):
+        respuestas = {}
+        for nombre, pedido in RequestItems.items():
+            items = []
+            for clave in pedido['Keys']:
+                response = self.tablas[nombre].get_item(Key=deserializar_item(clave))
+                if 'Item' in response:
+                    items.append(serializar_item(response['Item']))
+            respuestas[nombre] = items
+        return {'Responses': respuestas, 'UnprocessedKeys': {}}
+
+    def batch_write_item(self, RequestItems):
+        for nombre, pedidos in RequestItems.items():
+            for pedido in pedidos:
+                self.tablas[nombre].put_item(Item=deserializar_item(pedido['PutRequest']['Item']))
+        return {'UnprocessedItems': {}}
+
+
+def instalar_cliente(cliente):
+    """Hace que las Lambdas usen `cliente` en lugar de crear uno real con boto3"""
+    aws_clients._clientes['dynamodb'] = cliente
+
+
+def generar_items_faq(cantidad, variaciones_por_item=3):
+    """Genera items sintéticos con la forma de FAQKnowledgeBase"""
+    items = []
+    for i in range(cantidad):
+        items.append({
+            'keyword': f'tema{i}',
+            'variaciones': [f'tema{i}-var{j}' for j in range(variaciones_por_item)],
+            'respuesta_es': f'Respuesta en español para el tema {i}. ' * 3,
+            'respuesta_en': f'English answer for topic {i}. ' * 3,
+            'respuesta_pt': f'Resposta em português para o tópico {i}. ' * 3
+        })
+    return items
@@ -0,0 +1,105 @@
+# scripts/benchmarks/faq_index.py
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src', 'backend'))
+
+from fake_dynamodb import ITEMS_FAQ, ClienteFalso, TablaFalsa, generar_items_faq, instalar_cliente
+import Fulfillment
+import knowledge_base
+
+
+def buscar_respuesta_scan(tabla, topic, idioma):
+    """Ruta de búsqueda original: get_item y, si falla, un scan de una sola página"""
+    response = tabla.get_item(Key={'keyword': topic})
+    if 'Item' in response:
+        return response['Item'].get(f'respuesta_{idioma}')
+
+    response = tabla.scan()
+    for item in response.get('Items', []):
+        if topic in item.get('variaciones', []):
+            return item.get(f'respuesta_{idioma}')
+    return None
+
+
+def con_error(termino, aleatorio):
+    """Aplica al término un error de tipeo: borrar, duplicar o transponer un carácter"""
+    i = aleatorio.randrange(len(termino) - 1)
+    error = aleatorio.randrange(3)
+    if error == 0:
+        return termino[:i] + termino[i + 1:]
+    if error == 1:
+        return termino[:i] + termino[i] + termino[i:]
+    return termino[:i] + termino[i + 1] + termino[i] + termino[i + 2:]
+
+
+def medir(nombre, tabla, consultas, funcion):
+    tabla.reiniciar_contadores()
+    encontradas = 0
+    inicio = time.perf_counter()
+    for topic in consultas:
+        if funcion(topic):
+            encontradas += 1
+    duracion = time.perf_counter() - inicio
+
+    print(f"{nombre}:")
+    print(f"  consultas:          {len(consultas)}")
+    print(f"  encontradas:        {encontradas}")
+    print(f"  ms por consulta:    {duracion * 1000 / len(consultas):.3f}")
+    print(f"  llamadas:           {tabla.llamadas}")
+    print(f"  items leídos:       {tabla.items_leidos}")
+    print(f"  RCU consumidas:     {tabla.unidades_lectura:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara el scan por variaciones contra el snapshot en memoria.')
+    parser.add_argument('--items', type=int, default=10000, help='Número de items FAQ en la tabla simulada.')
+    parser.add_argument('--consultas', type=int, default=200, help='Número de búsquedas por variación.')
+    parser.add_argument('--latencia-ms', type=float, default=0.0, help='Latencia simulada por llamada a DynamoDB.')
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.semilla)
+    tabla = TablaFalsa('FAQKnowledgeBase', 'keyword', ITEMS_FAQ + generar_items_faq(args.items), latencia_ms=args.latencia_ms)
+    consultas = [f'tema{random.randrange(args.items)}-var{random.randrange(3)}' for _ in range(args.consultas)]
+
+    instalar_cliente(ClienteFalso(tabla))
+    knowledge_base._snapshot['verificado_en'] = None
+    # Se mide el snapshot, no la caché de respuestas
+    Fulfillment.CACHE_MAX_ENTRADAS = 0
+
+    medir('scan por consulta (original)', tabla, consultas,
+          lambda topic: buscar_respuesta_scan(tabla, topic, 'es'))
+
+    tabla.reiniciar_contadores()
+    inicio = time.perf_counter()
+    knowledge_base.obtener_snapshot()
+    print(f"\ncarga del snapshot: {(time.perf_counter() - inicio) * 1000:.1f} ms, "
+          f"llamadas {tabla.llamadas}, RCU {tabla.unidades_lectura:.1f}\n")
+
+    medir('snapshot en memoria', tabla, consultas,
+          lambda topic: Fulfillment.buscar_respuesta(topic, 'es').startswith('Respuesta'))
+
+    # Topics mal escritos: el contenedor arma el índice en el pool de E/S con el primer topic
+    # sin coincidencia; aquí se construye antes para medir solo las búsquedas
+    inicio = time.perf_counter()
+    indice = knowledge_base.indexar_difuso(knowledge_base._snapshot['items'])
+    knowledge_base._snapshot['difuso'] = indice
+    print(f"\nconstrucción del índice difuso: {(time.perf_counter() - inicio) * 1000:.1f} ms, "
+          f"{len(indice['lista'])} términos, {len(indice['borrados']) * indice['borrados'].itemsize / 1e6:.1f} MB\n")
+
+    aleatorio = random.Random(args.semilla)
+    reales = [termino for item in ITEMS_FAQ for termino in [item['keyword']] + item['variaciones']]
+    errores = [con_error(random.choice(reales), aleatorio) for _ in range(args.consultas // 2)]
+    errores += [con_error(topic, aleatorio) for topic in consultas[:args.consultas - len(errores)]]
+    medir('índice difuso (topics con errores)', tabla, errores,
+          lambda topic: Fulfillment.buscar_respuesta(topic, 'es') != Fulfillment.RESPUESTAS_DEFAULT['es'])
+
+
+if __name__ == '__main__':
+    main()
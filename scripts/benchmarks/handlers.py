@@ -0,0 +1,220 @@
+# scripts/benchmarks/handlers.py
+
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src', 'backend'))
+
+from fake_dynamodb import ITEMS_FAQ, ClienteFalso, TablaFalsa, generar_items_faq, instalar_cliente
+import Fulfillment
+import Orchestrator
+
+# Corpus por defecto: mensajes del chat web y turnos de Lex en es/en/pt
+CORPUS_DEFECTO = {
+    'orquestador': [
+        'Hola, ¿cuál es el precio del plan premium?',
+        '¿Qué horario tienen los sábados?',
+        '¿Dónde están ubicados?',
+        'Necesito el teléfono de contacto, por favor',
+        'Buenos días',
+        'What are your business hours?',
+        'How much does the enterprise plan cost?',
+        'Where is your office located?',
+        'Hello! How can I contact support?',
+        'Qual é o preço do plano básico?',
+        'Onde fica o endereço de vocês?',
+        'Olá, qual o horário de atendimento?',
+        'Preciso falar com alguém, qual o telefone?',
+        'asdf qwerty'
+    ],
+    'fulfillment': [
+        {'topic': 'precio', 'idioma': 'es', 'texto': 'Hola, quiero saber el precio, gracias'},
+        {'topic': 'horario', 'idioma': 'es', 'texto': 'El horario no es bueno para mí'},
+        {'topic': 'ubicacion', 'idioma': 'es', 'texto': '¿Dónde están? Estoy muy molesto con la demora'},
+        {'topic': 'costo', 'idioma': 'es', 'texto': '¿Cuánto cuesta?'},
+        {'topic': 'precio', 'idioma': 'en', 'texto': 'What is the price? Thank you!'},
+        {'topic': 'horario', 'idioma': 'en', 'texto': 'Your hours are not great'},
+        {'topic': 'contacto', 'idioma': 'en', 'texto': 'I need help, this is terrible'},
+        {'topic': 'precio', 'idioma': 'pt', 'texto': 'Qual é o preço? Obrigado'},
+        {'topic': 'ubicacion', 'idioma': 'pt', 'texto': 'Onde fica? O atendimento é ótimo'},
+        {'topic': 'tema-desconocido', 'idioma': 'pt', 'texto': 'Não entendi nada'}
+    ]
+}
+
+# Funciones de cada módulo que se cronometran como etapas
+ETAPAS = {
+    'orquestador': {
+        'procesar_mensaje': (Orchestrator, 'procesar_mensaje'),
+        'matching': (Orchestrator, 'resolver_tema'),
+        'kb': (Orchestrator, 'cuerpo_respuesta')
+    },
+    'fulfillment': {
+        'kb': (Fulfillment, 'buscar_respuesta'),
+        'sentimiento': (Fulfillment, 'analizar_sentimiento_mejorado'),
+        'log': (Fulfillment, 'guardar_log'),
+        'flush_log': (Fulfillment, 'vaciar_logs')
+    }
+}
+
+_tiempos = {}
+
+
+def cronometrar(etapa, funcion):
+    """Envuelve `funcion` acumulando su duración en la invocación en curso"""
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            _tiempos[etapa] = _tiempos.get(etapa, 0.0) + time.perf_counter() - inicio
+    return envoltura
+
+
+def instrumentar(handler):
+    for etapa, (modulo, nombre) in ETAPAS[handler].items():
+        setattr(modulo, nombre, cronometrar(etapa, getattr(modulo, nombre)))
+
+
+def evento_orquestador(mensaje, i):
+    return {'httpMethod': 'POST', 'body': json.dumps({'message': mensaje, 'sessionId': f'sesion-{i % 50}'})}
+
+
+def evento_lex(turno, i):
+    return {
+        'sessionId': f'sesion-{i % 50}',
+        'inputTranscript': turno['texto'],
+        'sessionState': {
+            'intent': {'name': 'AskFAQ', 'slots': {'Topic': {'value': {'interpretedValue': turno['topic']}}}},
+            'sessionAttributes': {'idioma': turno['idioma']}
+        }
+    }
+
+
+def percentiles(muestras):
+    ordenadas = sorted(muestras)
+    def p(q):
+        return round(ordenadas[min(len(ordenadas) - 1, int(q * len(ordenadas)))] * 1e6, 1)
+    return {'n': len(ordenadas), 'p50_us': p(0.50), 'p95_us': p(0.95), 'p99_us': p(0.99)}
+
+
+def ejecutar(handler, funcion, eventos, calentamiento):
+    """Invoca el handler con cada evento y devuelve throughput y percentiles por etapa"""
+    por_etapa = {}
+    with contextlib.redirect_stdout(io.StringIO()) as salida:
+        for evento in eventos[:calentamiento]:
+            funcion(evento, None)
+
+        inicio = time.perf_counter()
+        for evento in eventos[calentamiento:]:
+            _tiempos.clear()
+            t0 = time.perf_counter()
+            funcion(evento, None)
+            _tiempos['total'] = time.perf_counter() - t0
+            if handler == 'orquestador' and 'procesar_mensaje' in _tiempos:
+                # La detección de idioma es lo que procesar_mensaje hace antes de resolver el tema
+                _tiempos['deteccion_idioma'] = _tiempos.pop('procesar_mensaje') - _tiempos.get('matching', 0.0)
+            for etapa, duracion in _tiempos.items():
+                por_etapa.setdefault(etapa, []).append(duracion)
+            # Se descarta lo impreso para que el buffer no crezca durante la corrida
+            salida.seek(0)
+            salida.truncate()
+        duracion = time.perf_counter() - inicio
+
+    medidas = len(eventos) - calentamiento
+    return {
+        'invocaciones': medidas,
+        'throughput_rps': round(medidas / duracion, 1),
+        'etapas': {etapa: percentiles(muestras) for etapa, muestras in sorted(por_etapa.items())}
+    }
+
+
+def commit_actual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def comparar(resultado, baseline):
+    """Imprime la variación de p50/p95 por etapa respecto de un resultado anterior"""
+    print(f"\nComparación con {baseline.get('commit')}:")
+    for handler, datos in resultado['handlers'].items():
+        anterior = baseline.get('handlers', {}).get(handler, {})
+        for etapa, medida in datos['etapas'].items():
+            previa = anterior.get('etapas', {}).get(etapa)
+            if not previa:
+                continue
+            cambios = '  '.join(
+                f"{p} {previa[p]:.1f} -> {medida[p]:.1f} µs ({(medida[p] / previa[p] - 1) * 100 if previa[p] else 0:+.0f}%)"
+                for p in ('p50_us', 'p95_us')
+            )
+            print(f"  {handler:<12} {etapa:<18} {cambios}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latencia por etapa de los handlers de las Lambdas contra una DynamoDB en memoria.')
+    parser.add_argument('--corpus', type=str, help='JSON con las listas "orquestador" (mensajes) y "fulfillment" ({topic, idioma, texto}).')
+    parser.add_argument('--invocaciones', type=int, default=5000, help='Invocaciones medidas por handler.')
+    parser.add_argument('--calentamiento', type=int, default=200, help='Invocaciones iniciales que no se miden.')
+    parser.add_argument('--items', type=int, default=1000, help='Items FAQ sintéticos además de los temas reales.')
+    parser.add_argument('--latencia-ms', type=float, default=0.0, help='Latencia simulada por llamada a DynamoDB.')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--output', type=str, help='Archivo JSON donde guardar el resultado.')
+    parser.add_argument('--baseline', type=str, help='Resultado JSON previo contra el cual comparar.')
+    args = parser.parse_args()
+
+    corpus = CORPUS_DEFECTO
+    if args.corpus:
+        with open(args.corpus, encoding='utf-8') as f:
+            corpus = json.load(f)
+
+    faq = TablaFalsa('FAQKnowledgeBase', 'keyword', ITEMS_FAQ + generar_items_faq(args.items), latencia_ms=args.latencia_ms)
+    logs = TablaFalsa('ChatSessionLogs', 'timestamp', latencia_ms=args.latencia_ms)
+    instalar_cliente(ClienteFalso(faq, logs))
+
+    generador = random.Random(args.semilla)
+    total = args.calentamiento + args.invocaciones
+    eventos = {
+        'orquestador': [evento_orquestador(generador.choice(corpus['orquestador']), i) for i in range(total)],
+        'fulfillment': [evento_lex(generador.choice(corpus['fulfillment']), i) for i in range(total)]
+    }
+    handlers = {'orquestador': Orchestrator.lambda_handler, 'fulfillment': Fulfillment.lambda_handler}
+
+    resultado = {
+        'commit': commit_actual(),
+        'python': platform.python_version(),
+        'parametros': {k: v for k, v in vars(args).items() if k not in ('output', 'baseline')},
+        'handlers': {}
+    }
+    for handler, funcion in handlers.items():
+        instrumentar(handler)
+        datos = ejecutar(handler, funcion, eventos[handler], args.calentamiento)
+        resultado['handlers'][handler] = datos
+
+        print(f"{handler}: {datos['throughput_rps']} invocaciones/s")
+        for etapa, medida in datos['etapas'].items():
+            print(f"    {etapa:<18} p50 {medida['p50_us']:>9.1f} µs   p95 {medida['p95_us']:>9.1f} µs   p99 {medida['p99_us']:>9.1f} µs")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(resultado, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            comparar(resultado, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# scripts/benchmarks/import_time.py
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+DIRECTORIO_BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src', 'backend')
+MODULOS = ['Orchestrator', 'Fulfillment']
+
+
+def medir_importacion(modulo, repeticiones):
+    """
+    Importa `modulo` en un intérprete nuevo con `-X importtime` y devuelve el
+    tiempo acumulado (mediana de las repeticiones) y las dependencias más pesadas.
+    """
+    totales = []
+    dependencias = {}
+    for _ in range(repeticiones):
+        proceso = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+            cwd=DIRECTORIO_BACKEND, capture_output=True, text=True, check=True
+        )
+        # Cada módulo se imprime después de sus dependencias, con una sangría de dos espacios por nivel
+        hijos = {}
+        for linea in proceso.stderr.splitlines():
+            if not linea.startswith('import time:') or 'cumulative' in linea:
+                continue
+            _, acumulado, nombre = linea.split(':', 1)[1].split('|')
+            nivel = (len(nombre) - len(nombre.lstrip()) - 1) // 2
+            nombre = nombre.strip()
+            if nivel == 1:
+                hijos[nombre] = int(acumulado)
+            elif nivel == 0:
+                if nombre == modulo:
+                    totales.append(int(acumulado))
+                    for hijo, us in hijos.items():
+                        dependencias[hijo] = min(dependencias.get(hijo, us), us)
+                hijos = {}
+
+    totales.sort()
+    pesadas = sorted(dependencias.items(), key=lambda par: par[1], reverse=True)[:10]
+    return {'total_us': totales[len(totales) // 2], 'dependencias_us': dict(pesadas)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reporte de tiempo de importación (arranque en frío) de las Lambdas.')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--output', type=str, help='Archivo JSON donde guardar el resultado.')
+    parser.add_argument('--baseline', type=str, help='Resultado JSON previo contra el cual comparar.')
+    parser.add_argument('--max-regresion', type=float, default=0.25,
+                        help='Aumento relativo máximo tolerado respecto al baseline (0.25 = 25%%).')
+    args = parser.parse_args()
+
+    resultado = {modulo: medir_importacion(modulo, args.repeticiones) for modulo in MODULOS}
+    for modulo, datos in resultado.items():
+        print(f"{modulo}: {datos['total_us'] / 1000:.1f} ms")
+        for nombre, us in datos['dependencias_us'].items():
+            print(f"    {nombre:<30} {us / 1000:8.1f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(resultado, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regresiones = []
+        for modulo, datos in resultado.items():
+            anterior = baseline.get(modulo, {}).get('total_us')
+            if anterior and datos['total_us'] > anterior * (1 + args.max_regresion):
+                regresiones.append(f"{modulo}: {anterior / 1000:.1f} ms -> {datos['total_us'] / 1000:.1f} ms")
+        if regresiones:
+            print("Regresión en el tiempo de importación:\n  " + "\n  ".join(regresiones))
+            sys.exit(1)
+        print("Sin regresiones respecto al baseline.")
+
+
+if __name__ == '__main__':
+    main()
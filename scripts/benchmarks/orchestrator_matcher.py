@@ -0,0 +1,101 @@
+# scripts/benchmarks/orchestrator_matcher.py
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src', 'backend'))
+
+import Orchestrator
+
+MENSAJES = [
+    'Hola, ¿cuál es el precio del plan premium?',
+    '¿Qué horario tienen los sábados?',
+    'What are your business hours?',
+    'How much does the enterprise plan cost?',
+    'Qual é o preço do plano básico?',
+    'Onde fica o endereço de vocês?',
+    'Necesito ayuda con mi cuenta',
+    'ok gracias',
+    'I need support please',
+    'Olá, preciso de ajuda'
+]
+
+
+def palabras_sinteticas(cantidad, semilla):
+    generador = random.Random(semilla)
+    return [''.join(generador.choices(string.ascii_lowercase, k=generador.randint(5, 10))) for _ in range(cantidad)]
+
+
+def analizar_con_bucles(texto, palabras_idioma, palabras_tema):
+    """Estrategia original: una prueba de subcadena por término y lista"""
+    texto_lower = texto.lower()
+    scores = {idioma: sum(1 for palabra in palabras if palabra in texto_lower)
+              for idioma, palabras in palabras_idioma.items()}
+    tokens = set(Orchestrator.PATRON_PALABRA.findall(texto_lower))
+    temas = {tema for tema, palabras in palabras_tema.items()
+             if any(palabra in tokens for palabra in palabras)}
+    return scores, temas
+
+
+def analizar_con_automata(texto, automata, idiomas_por_termino, temas_por_termino):
+    texto_lower = texto.lower()
+    scores = {'es': 0, 'en': 0, 'pt': 0}
+    for termino in Orchestrator.buscar_terminos(automata, texto_lower):
+        for idioma in idiomas_por_termino.get(termino, ()):
+            scores[idioma] += 1
+    temas = {tema for palabra in Orchestrator.PATRON_PALABRA.findall(texto_lower)
+             for tema in temas_por_termino.get(palabra, ())}
+    return scores, temas
+
+
+def medir(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for mensaje in MENSAJES:
+            funcion(mensaje)
+    return (time.perf_counter() - inicio) * 1e6 / (repeticiones * len(MENSAJES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Costo por mensaje del matcher multilingüe según el tamaño del vocabulario.')
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[0, 100, 1000, 5000],
+                        help='Términos sintéticos añadidos por idioma y por tema.')
+    parser.add_argument('--repeticiones', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'términos':>10} {'bucles (µs)':>14} {'autómata (µs)':>15} {'construcción (ms)':>18}")
+    for tamano in args.tamanos:
+        palabras_idioma = {idioma: palabras + palabras_sinteticas(tamano, idioma)
+                           for idioma, palabras in Orchestrator.PALABRAS_IDIOMA.items()}
+        palabras_tema = {tema: palabras + palabras_sinteticas(tamano, tema)
+                         for tema, palabras in Orchestrator.PALABRAS_TEMA.items()}
+
+        idiomas_por_termino, temas_por_termino = {}, {}
+        for idioma, palabras in palabras_idioma.items():
+            for palabra in palabras:
+                idiomas_por_termino.setdefault(palabra, []).append(idioma)
+        for tema, palabras in palabras_tema.items():
+            for palabra in palabras:
+                temas_por_termino.setdefault(palabra, []).append(tema)
+
+        inicio = time.perf_counter()
+        automata = Orchestrator.construir_automata(set(idiomas_por_termino))
+        construccion_ms = (time.perf_counter() - inicio) * 1000
+
+        for mensaje in MENSAJES:
+            assert analizar_con_bucles(mensaje, palabras_idioma, palabras_tema) == \
+                analizar_con_automata(mensaje, automata, idiomas_por_termino, temas_por_termino)
+
+        bucles = medir(lambda m: analizar_con_bucles(m, palabras_idioma, palabras_tema), args.repeticiones)
+        automata_us = medir(lambda m: analizar_con_automata(m, automata, idiomas_por_termino, temas_por_termino),
+                            args.repeticiones)
+        total = len(idiomas_por_termino) + len(temas_por_termino)
+        print(f"{total:>10} {bucles:>14.1f} {automata_us:>15.1f} {construccion_ms:>18.1f}")
+
+
+if __name__ == '__main__':
+    main()
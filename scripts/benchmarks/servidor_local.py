@@ -0,0 +1,208 @@
+# scripts/benchmarks/servidor_local.py
+
+import argparse
+import base64
+import json
+import os
+import signal
+import socket
+import sys
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src', 'backend'))
+
+import Orchestrator
+
+# Límite de tiempo de la función desplegada, para get_remaining_time_in_millis
+TIMEOUT_LAMBDA_MS = 30000
+
+
+class ContextoLocal:
+    """Sustituto del objeto context que Lambda pasa al handler"""
+
+    function_name = 'Orchestrator'
+    function_version = '$LATEST'
+    memory_limit_in_mb = 128
+
+    def __init__(self):
+        self.aws_request_id = str(uuid.uuid4())
+        self.invoked_function_arn = f'arn:aws:lambda:local:000000000000:function:{self.function_name}'
+        self._limite = time.monotonic() + TIMEOUT_LAMBDA_MS / 1000.0
+
+    def get_remaining_time_in_millis(self):
+        return max(0, int((self._limite - time.monotonic()) * 1000))
+
+
+def evento_api_gateway(metodo, ruta, encabezados, cuerpo, ip_origen):
+    """Arma el evento de integración proxy de API Gateway (REST) para una petición HTTP"""
+    partes = urlsplit(ruta)
+    consulta = dict(parse_qsl(partes.query)) or None
+    return {
+        'resource': partes.path,
+        'path': partes.path,
+        'httpMethod': metodo,
+        'headers': dict(encabezados),
+        'queryStringParameters': consulta,
+        'pathParameters': None,
+        'stageVariables': None,
+        'requestContext': {
+            'requestId': str(uuid.uuid4()),
+            'stage': 'local',
+            'httpMethod': metodo,
+            'path': partes.path,
+            'requestTimeEpoch': int(time.time() * 1000),
+            'identity': {'sourceIp': ip_origen}
+        },
+        'body': cuerpo,
+        'isBase64Encoded': False
+    }
+
+
+class ManejadorApiGateway(BaseHTTPRequestHandler):
+    """
+    Traduce cada petición HTTP a un evento de API Gateway, invoca el handler
+    y escribe la respuesta. Cada proceso atiende una petición a la vez, como
+    un contenedor de Lambda, y cierra la conexión al responder (HTTP/1.0).
+    """
+
+    ruta = '/chat'
+    server_version = 'SmartCloudBotLocal/1.0'
+
+    def do_POST(self):
+        self.invocar()
+
+    def do_GET(self):
+        self.invocar()
+
+    def do_OPTIONS(self):
+        self.invocar()
+
+    def invocar(self):
+        if urlsplit(self.path).path != self.ruta:
+            self.responder(404, {'Content-Type': 'application/json'}, json.dumps({'message': 'Not Found'}))
+            return
+
+        largo = int(self.headers.get('Content-Length') or 0)
+        cuerpo = self.rfile.read(largo).decode('utf-8') if largo else None
+        evento = evento_api_gateway(self.command, self.path, self.headers.items(), cuerpo, self.client_address[0])
+
+        try:
+            resultado = Orchestrator.lambda_handler(evento, ContextoLocal())
+        except Exception as e:
+            # API Gateway responde 502 cuando la integración falla
+            print(f"ERROR en el handler: {e}", file=sys.stderr)
+            self.responder(502, {'Content-Type': 'application/json'}, json.dumps({'message': 'Internal server error'}))
+            return
+
+        cuerpo_respuesta = resultado.get('body') or ''
+        if resultado.get('isBase64Encoded'):
+            cuerpo_respuesta = base64.b64decode(cuerpo_respuesta)
+        encabezados = dict(resultado.get('headers') or {})
+        encabezados.setdefault('Content-Type', 'application/json')
+        self.responder(resultado.get('statusCode', 200), encabezados, cuerpo_respuesta)
+
+    def responder(self, status, encabezados, cuerpo):
+        datos = cuerpo if isinstance(cuerpo, bytes) else cuerpo.encode('utf-8')
+        self.send_response(status)
+        for nombre, valor in encabezados.items():
+            self.send_header(nombre, valor)
+        self.send_header('Content-Length', str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def log_message(self, formato, *args):
+        # Una línea por petición distorsiona la medición; el handler ya emite sus métricas
+        pass
+
+
+def crear_socket(host, puerto, backlog):
+    """Socket de escucha compartido por todos los workers"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, puerto))
+    sock.listen(backlog)
+    return sock
+
+
+def atender(sock, sin_logs):
+    """Cuerpo de cada worker: acepta conexiones del socket compartido hasta recibir SIGTERM"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    if sin_logs:
+        sys.stdout = open(os.devnull, 'w')
+
+    servidor = HTTPServer(sock.getsockname(), ManejadorApiGateway, bind_and_activate=False)
+    servidor.socket = sock
+    servidor.serve_forever()
+
+
+def iniciar_worker(sock, sin_logs):
+    pid = os.fork()
+    if pid == 0:
+        try:
+            atender(sock, sin_logs)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def supervisar(sock, workers, sin_logs):
+    """Mantiene `workers` procesos atendiendo y los detiene con Ctrl+C o SIGTERM"""
+    activos = {iniciar_worker(sock, sin_logs) for _ in range(workers)}
+    detener = {'pedido': False}
+
+    def terminar(*_):
+        detener['pedido'] = True
+        for pid in activos:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, terminar)
+    signal.signal(signal.SIGTERM, terminar)
+
+    while activos:
+        try:
+            pid, estado = os.wait()
+        except ChildProcessError:
+            break
+        activos.discard(pid)
+        if not detener['pedido']:
+            print(f"Worker {pid} terminó (estado {estado}); se reinicia", file=sys.stderr)
+            activos.add(iniciar_worker(sock, sin_logs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sirve Orchestrator.lambda_handler como un endpoint HTTP con la forma de API Gateway.')
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8080)
+    parser.add_argument('--ruta', type=str, default='/chat', help='Ruta del recurso de API Gateway.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Procesos que atienden en paralelo; cada uno equivale a un contenedor de Lambda.')
+    parser.add_argument('--backlog', type=int, default=1024, help='Conexiones pendientes de aceptar.')
+    parser.add_argument('--dynamodb-falsa', action='store_true',
+                        help='Usa una FAQKnowledgeBase en memoria en lugar de la tabla real de AWS.')
+    parser.add_argument('--items', type=int, default=1000, help='Items FAQ sintéticos de la tabla en memoria.')
+    parser.add_argument('--latencia-ms', type=float, default=0.0, help='Latencia simulada por llamada a la tabla en memoria.')
+    parser.add_argument('--sin-logs', action='store_true', help='Descarta lo que el handler imprime en stdout.')
+    args = parser.parse_args()
+
+    if args.dynamodb_falsa:
+        # Se instala antes del fork: cada worker hereda su copia de la tabla
+        from fake_dynamodb import ITEMS_FAQ, ClienteFalso, TablaFalsa, generar_items_faq, instalar_cliente
+        faq = TablaFalsa('FAQKnowledgeBase', 'keyword', ITEMS_FAQ + generar_items_faq(args.items), latencia_ms=args.latencia_ms)
+        instalar_cliente(ClienteFalso(faq))
+
+    ManejadorApiGateway.ruta = args.ruta
+    sock = crear_socket(args.host, args.puerto, args.backlog)
+    print(f"Orchestrator en http://{args.host}:{args.puerto}{args.ruta} con {args.workers} worker(s)", file=sys.stderr)
+    supervisar(sock, args.workers, args.sin_logs)
+
+
+if __name__ == '__main__':
+    main()
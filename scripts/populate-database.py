@@ -1,21 +1,175 @@
+# scripts/populate-database.py
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
 import boto3
 
-def populate_database():
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('FAQKnowledgeBase')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'backend'))
+
+from aws_clients import configuracion_cliente
 
-faq_data = [
+ATRIBUTO_HASH = 'content_hash'
+SEPARADOR_VARIACIONES = '|'
+
+# Datos de ejemplo que se cargan cuando no se indica un archivo de entrada
+DATOS_EJEMPLO = [
     {
         'keyword': 'precio',
         'respuesta_es': 'Precios desde $50 mensuales',
-        'respuesta_en': 'Prices from $50 monthly', 
+        'respuesta_en': 'Prices from $50 monthly',
         'respuesta_pt': 'Preços a partir de $50 mensais'
     }
 ]
 
-for item in faq_data:
-    table.put_item(Item=item)
-    print(f"Insertado: {item['keyword']}")
 
-if name == "main":
-populate_database()
\ No newline at end of file
+def leer_items(ruta):
+    """
+    Lee los items de la FAQ desde un CSV con encabezado o un archivo JSON Lines.
+    En el CSV, la columna `variaciones` separa los valores con '|'.
+    """
+    with open(ruta, encoding='utf-8', newline='') as f:
+        if ruta.endswith('.csv'):
+            for fila in csv.DictReader(f):
+                item = {clave: valor.strip() for clave, valor in fila.items() if clave and valor and valor.strip()}
+                if 'variaciones' in item:
+                    item['variaciones'] = [v.strip() for v in item['variaciones'].split(SEPARADOR_VARIACIONES) if v.strip()]
+                yield item
+        else:
+            for linea in f:
+                if linea.strip():
+                    yield json.loads(linea, parse_float=Decimal)
+
+
+def hash_contenido(item):
+    """Hash estable del contenido del item (sin el propio atributo de hash)"""
+    contenido = {clave: valor for clave, valor in item.items() if clave != ATRIBUTO_HASH}
+    serializado = json.dumps(contenido, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serializado.encode('utf-8')).hexdigest()
+
+
+def crear_tabla(nombre, region):
+    """Tabla de la capa resource con la configuración ajustada; una por hilo, ya que los resources no son thread-safe"""
+    sesion = boto3.session.Session(region_name=region)
+    return sesion.resource('dynamodb', config=configuracion_cliente()).Table(nombre)
+
+
+def crear_cliente_dynamodb(region):
+    """Cliente de bajo nivel en la región elegida, para que el marcador de versión se escriba junto a los items"""
+    sesion = boto3.session.Session(region_name=region)
+    return sesion.client('dynamodb', config=configuracion_cliente())
+
+
+def escanear_segmento(nombre, region, segmento, total_segmentos):
+    """Lee keyword y hash de contenido de un segmento de la tabla"""
+    tabla = crear_tabla(nombre, region)
+    kwargs = {
+        'Segment': segmento,
+        'TotalSegments': total_segmentos,
+        'ProjectionExpression': '#k, #h',
+        'ExpressionAttributeNames': {'#k': 'keyword', '#h': ATRIBUTO_HASH}
+    }
+    hashes = {}
+    while True:
+        response = tabla.scan(**kwargs)
+        for item in response.get('Items', []):
+            hashes[item['keyword']] = item.get(ATRIBUTO_HASH)
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    return hashes
+
+
+def leer_hashes_existentes(nombre, region, segmentos):
+    """Scan paralelo por segmentos de los hashes de contenido ya guardados"""
+    with ThreadPoolExecutor(max_workers=segmentos) as ejecutor:
+        resultados = ejecutor.map(lambda s: escanear_segmento(nombre, region, s, segmentos), range(segmentos))
+        hashes = {}
+        for parcial in resultados:
+            hashes.update(parcial)
+
+    return hashes
+
+
+def escribir_items(nombre, region, items, eliminar):
+    """Escribe una porción de los items con un batch_writer propio del hilo"""
+    tabla = crear_tabla(nombre, region)
+    with tabla.batch_writer(overwrite_by_pkeys=['keyword']) as escritor:
+        for item in items:
+            escritor.put_item(Item=item)
+        for keyword in eliminar:
+            escritor.delete_item(Key={'keyword': keyword})
+
+    return len(items) + len(eliminar)
+
+
+def populate_database(items, nombre_tabla, region=None, hilos=8, segmentos=4, eliminar_faltantes=False):
+    """Sincroniza la tabla con `items`, escribiendo solo los que cambiaron"""
+    # Se importa aquí para que FAQ_TABLE_NAME ya apunte a la tabla elegida
+    import knowledge_base
+
+    inicio = time.perf_counter()
+    items = {item['keyword']: item for item in items if item.get('keyword')}
+    items.pop(knowledge_base.KEYWORD_VERSION, None)
+
+    existentes = leer_hashes_existentes(nombre_tabla, region, segmentos)
+    existentes.pop(knowledge_base.KEYWORD_VERSION, None)
+    print(f"Items en la tabla: {len(existentes)} (scan en {time.perf_counter() - inicio:.1f} s)")
+
+    cambiados = []
+    for keyword, item in items.items():
+        item[ATRIBUTO_HASH] = hash_contenido(item)
+        if existentes.get(keyword) != item[ATRIBUTO_HASH]:
+            cambiados.append(item)
+
+    eliminar = [keyword for keyword in existentes if keyword not in items] if eliminar_faltantes else []
+    print(f"Items leídos: {len(items)}, sin cambios: {len(items) - len(cambiados)}, "
+          f"a escribir: {len(cambiados)}, a eliminar: {len(eliminar)}")
+
+    if cambiados or eliminar:
+        inicio_escritura = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+            tareas = [
+                ejecutor.submit(escribir_items, nombre_tabla, region, cambiados[i::hilos], eliminar[i::hilos])
+                for i in range(hilos)
+            ]
+            escritos = sum(tarea.result() for tarea in tareas)
+        duracion_escritura = time.perf_counter() - inicio_escritura
+        print(f"Escrituras: {escritos} en {duracion_escritura:.1f} s ({escritos / duracion_escritura if duracion_escritura else 0:.0f} items/s)")
+
+        # Avisa a las Lambdas qué keywords releer en su próxima sincronización
+        version = knowledge_base.registrar_cambios([item['keyword'] for item in cambiados] + eliminar,
+                                                   crear_cliente_dynamodb(region))
+        print(f"Versión de la base de conocimiento: {version}")
+
+    duracion = time.perf_counter() - inicio
+    print(f"Sincronización completada en {duracion:.1f} s ({len(items) / duracion if duracion else 0:.0f} items/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Carga o sincroniza FAQKnowledgeBase desde un CSV o un archivo JSON Lines.')
+    parser.add_argument('--input', type=str, help='Archivo .csv (con encabezado) o .jsonl; sin él se cargan los datos de ejemplo.')
+    parser.add_argument('--table', type=str, default=os.environ.get('FAQ_TABLE_NAME', 'FAQKnowledgeBase'))
+    parser.add_argument('--region', type=str, default=None)
+    parser.add_argument('--workers', type=int, default=8, help='Hilos escritores, cada uno con su batch_writer.')
+    parser.add_argument('--scan-segments', type=int, default=4, help='Segmentos del scan paralelo de hashes existentes.')
+    parser.add_argument('--delete-missing', action='store_true', help='Elimina de la tabla las keywords que no están en la entrada.')
+    args = parser.parse_args()
+
+    os.environ['FAQ_TABLE_NAME'] = args.table
+
+    items = list(leer_items(args.input)) if args.input else [dict(item) for item in DATOS_EJEMPLO]
+    populate_database(items, args.table, args.region, args.workers, args.scan_segments, args.delete_missing)
+
+
+if __name__ == "__main__":
+    main()
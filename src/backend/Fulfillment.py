@@ -1,22 +1,75 @@
-import boto3
+import atexit
 import json
+import os
+import queue
+import random
 import re
+import signal
+import sys
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
 from datetime import datetime
 
-dynamodb = boto3.resource('dynamodb')
-table_faq = dynamodb.Table('FAQKnowledgeBase')
-table_logs = dynamodb.Table('ChatSessionLogs')
+import knowledge_base
+import metrics
+from aws_clients import deserializar_item, obtener_cliente, obtener_ejecutor, serializar_item
 
+TABLA_LOGS = os.environ.get('LOG_TABLE_NAME', 'ChatSessionLogs')
+
+# Caché de respuestas resueltas (topic, idioma) -> respuesta, con LRU y TTL
+CACHE_MAX_ENTRADAS = int(os.environ.get('FAQ_CACHE_MAX_ENTRIES', '256'))
+CACHE_TTL_SEGUNDOS = float(os.environ.get('FAQ_CACHE_TTL_SECONDS', '600'))
+CACHE_TTL_NEGATIVO_SEGUNDOS = float(os.environ.get('FAQ_CACHE_NEGATIVE_TTL_SECONDS', '60'))
+CACHE_STATS_CADA = int(os.environ.get('FAQ_CACHE_STATS_EVERY', '1000'))
+
+_cache_respuestas = OrderedDict()
+_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expiradas': 0}
+
+# Escritura de logs: 'async' (cola acotada + hilo escritor con batch_write_item) o 'sync'
+LOG_MODO = os.environ.get('LOG_WRITE_MODE', 'async')
+LOG_COLA_MAX = int(os.environ.get('LOG_QUEUE_MAX', '1000'))
+LOG_POLITICA_DESBORDE = os.environ.get('LOG_OVERFLOW_POLICY', 'spill')
+LOG_FLUSH_AL_RESPONDER = os.environ.get('LOG_FLUSH_ON_RETURN', 'false').lower() == 'true'
+LOG_FLUSH_UMBRAL = int(os.environ.get('LOG_FLUSH_THRESHOLD', '25'))
+LOG_FLUSH_TIMEOUT_SEGUNDOS = float(os.environ.get('LOG_FLUSH_TIMEOUT_SECONDS', '0.5'))
+LOG_MAX_REINTENTOS = int(os.environ.get('LOG_BATCH_MAX_RETRIES', '5'))
+TAMANO_LOTE_DYNAMODB = 25
+
+_cola_logs = queue.Queue(maxsize=LOG_COLA_MAX)
+_escritor_logs = {'hilo': None}
+_escritor_lock = threading.Lock()
+# Manejador de SIGTERM que había antes de instalar el propio (se instala con el primer arranque del escritor)
+_senal_terminar = {'instalada': False, 'anterior': None}
+_logs_stats = {'encolados': 0, 'escritos': 0, 'descartados': 0, 'derramados': 0}
+
+# Léxicos de sentimiento: uno o más archivos JSON separados por comas; los posteriores agregan o reemplazan términos
+SENTIMIENTO_ARCHIVOS = os.environ.get(
+    'SENTIMENT_LEXICON_FILES',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sentimiento.json')
+)
+VENTANA_NEGACION = int(os.environ.get('SENTIMENT_NEGATION_WINDOW', '3'))
+VENTANA_INTENSIFICADOR = 2
+PATRON_TOKEN = re.compile(r"[\w']+|[.,;:!?¡¿]")
+PUNTUACION = frozenset('.,;:!?¡¿')
+
+RESPUESTAS_DEFAULT = {
+    'es': 'Lo siento, no tengo información sobre ese tema. ¿Puedes intentar con "precio", "horario" o "ubicación"?',
+    'en': "I'm sorry, I don't have information about that topic. Can you try with 'price', 'schedule' or 'location'?",
+    'pt': 'Desculpe, não tenho informações sobre esse tópico. Pode tentar com "preço", "horário" ou "localização"?'
+}
+
+@metrics.medir_invocacion('Fulfillment')
 def lambda_handler(event, context):
-    print("Event received:", json.dumps(event, ensure_ascii=False))
-    
     try:
         # Obtener el topic y idioma
         topic = obtener_topic(event)
         session_attributes = event.get('sessionState', {}).get('sessionAttributes', {})
         idioma = session_attributes.get('idioma', 'es')
         
-        print(f"Topic: {topic}, Idioma: {idioma}")
+        if metrics.DEBUG:
+            print(f"Topic: {topic}, Idioma: {idioma}")
         
         # Buscar en DynamoDB
         respuesta = buscar_respuesta(topic, idioma)
@@ -25,14 +78,29 @@ def lambda_handler(event, context):
         input_text = event.get('inputTranscript', '')
         sentimiento = analizar_sentimiento_mejorado(input_text, idioma)
         
-        # Log de la sesión
-        guardar_log(event, respuesta, idioma, sentimiento)
+        # Log de la sesión: en modo sync el put_item corre en el pool de E/S
+        # mientras se arma la respuesta, en paralelo con una eventual sincronización del snapshot
+        if LOG_MODO == 'sync':
+            escritura = obtener_ejecutor().submit(guardar_log, event, respuesta, idioma, sentimiento)
+        else:
+            escritura = None
+            guardar_log(event, respuesta, idioma, sentimiento)
+        
+        respuesta_lex = construir_respuesta_lex(respuesta, sentimiento, idioma)
+        
+        if escritura is not None:
+            escritura.result()
         
-        return construir_respuesta_lex(respuesta, sentimiento, idioma)
+        return respuesta_lex
         
     except Exception as e:
         print(f"Error: {str(e)}")
         return construir_respuesta_error(idioma)
+    
+    finally:
+        if vaciar_al_responder():
+            with metrics.etapa('log_flush'):
+                vaciar_logs(LOG_FLUSH_TIMEOUT_SEGUNDOS)
 
 def obtener_topic(event):
     """Extrae el topic de forma robusta"""
@@ -59,67 +127,179 @@ def obtener_topic(event):
         print(f"Error obteniendo topic: {e}")
         return "general"
 
+@metrics.medir('dynamodb')
 def buscar_respuesta(topic, idioma):
     """Busca respuesta considerando variaciones y sinónimos"""
     try:
-        # Primero buscar por keyword exacto
-        response = table_faq.get_item(Key={'keyword': topic})
-        
-        if 'Item' in response:
-            item = response['Item']
-            respuesta = item.get(f'respuesta_{idioma}') or item.get('respuesta_es')
-            if respuesta:
-                return respuesta
-        
-        # Búsqueda por variaciones en la tabla
-        response = table_faq.scan()
-        for item in response.get('Items', []):
-            variaciones = item.get('variaciones', [])
-            if topic in variaciones:
-                respuesta = item.get(f'respuesta_{idioma}') or item.get('respuesta_es')
-                if respuesta:
-                    return respuesta
+        # Verifica el TTL del snapshot aunque la respuesta salga de la caché
+        knowledge_base.obtener_snapshot()
+        
+        clave = (topic, idioma)
+        encontrada, respuesta = cache_obtener(clave)
+        consultas = _cache_stats['hits'] + _cache_stats['misses']
+        if CACHE_STATS_CADA > 0 and consultas % CACHE_STATS_CADA == 0:
+            registrar_stats_cache()
+        if not encontrada:
+            respuesta = resolver_respuesta(topic, idioma)
+            cache_guardar(clave, respuesta)
+        
+        if respuesta:
+            return respuesta
         
         # Respuesta por defecto
-        respuestas_default = {
-            'es': 'Lo siento, no tengo información sobre ese tema. ¿Puedes intentar con "precio", "horario" o "ubicación"?',
-            'en': "I'm sorry, I don't have information about that topic. Can you try with 'price', 'schedule' or 'location'?",
-            'pt': 'Desculpe, não tenho informações sobre esse tópico. Pode tentar com "preço", "horário" ou "localização"?'
-        }
-        return respuestas_default.get(idioma, respuestas_default['es'])
+        return RESPUESTAS_DEFAULT.get(idioma, RESPUESTAS_DEFAULT['es'])
         
     except Exception as e:
         print(f"Error buscando respuesta: {e}")
         return "Ocurrió un error al buscar la información."
 
-def analizar_sentimiento_mejorado(texto, idioma):
-    """Análisis de sentimiento mejorado con más vocabulario"""
-    try:
-        palabras_positivas = {
-            'es': ['excelente', 'bueno', 'genial', 'perfecto', 'gracias', 'ayuda', 'útil', 'fantástico', 'maravilloso', 'agradecido'],
-            'en': ['excellent', 'good', 'great', 'perfect', 'thanks', 'helpful', 'awesome', 'fantastic', 'wonderful', 'thank you'],
-            'pt': ['excelente', 'bom', 'ótimo', 'perfeito', 'obrigado', 'útil', 'maravilhoso', 'fantástico', 'agradecido']
-        }
-        
-        palabras_negativas = {
-            'es': ['malo', 'horrible', 'terrible', 'pésimo', 'odio', 'frustrado', 'enojado', 'molesto', 'insatisfecho', 'decepcionado'],
-            'en': ['bad', 'horrible', 'terrible', 'awful', 'hate', 'frustrated', 'angry', 'upset', 'dissatisfied', 'disappointed'],
-            'pt': ['ruim', 'horrível', 'terrível', 'péssimo', 'ódio', 'frustrado', 'nervoso', 'chateado', 'insatisfeito', 'decepcionado']
-        }
-        
-        positivas = palabras_positivas.get(idioma, palabras_positivas['es'])
-        negativas = palabras_negativas.get(idioma, palabras_negativas['es'])
+def resolver_respuesta(topic, idioma):
+    """Busca por keyword exacto, por variaciones y por cercanía en el snapshot de FAQKnowledgeBase (None si no hay respuesta)"""
+    return knowledge_base.obtener_respuesta(topic, idioma, difuso=True)
+
+def cache_obtener(clave):
+    """Devuelve (encontrada, respuesta); una respuesta None es un resultado negativo cacheado"""
+    entrada = _cache_respuestas.get(clave)
+    if entrada is None:
+        _cache_stats['misses'] += 1
+        return False, None
+    
+    expira_en, respuesta = entrada
+    if time.monotonic() >= expira_en:
+        del _cache_respuestas[clave]
+        _cache_stats['expiradas'] += 1
+        _cache_stats['misses'] += 1
+        return False, None
+    
+    _cache_respuestas.move_to_end(clave)
+    _cache_stats['hits'] += 1
+    return True, respuesta
+
+def cache_guardar(clave, respuesta):
+    """Guarda una respuesta (o un negativo) y desaloja la entrada menos usada si no hay espacio"""
+    if CACHE_MAX_ENTRADAS <= 0:
+        return
+    
+    ttl = CACHE_TTL_SEGUNDOS if respuesta else CACHE_TTL_NEGATIVO_SEGUNDOS
+    _cache_respuestas[clave] = (time.monotonic() + ttl, respuesta)
+    _cache_respuestas.move_to_end(clave)
+    
+    while len(_cache_respuestas) > CACHE_MAX_ENTRADAS:
+        _cache_respuestas.popitem(last=False)
+        _cache_stats['evictions'] += 1
+
+@knowledge_base.al_actualizar
+def limpiar_cache_respuestas():
+    """La tabla cambió: las respuestas cacheadas dejan de ser confiables"""
+    _cache_respuestas.clear()
+
+def registrar_stats_cache():
+    """Escribe en el log los contadores acumulados de la caché de respuestas"""
+    consultas = _cache_stats['hits'] + _cache_stats['misses']
+    hit_rate = _cache_stats['hits'] / consultas if consultas else 0.0
+    print(
+        f"Caché FAQ: hits={_cache_stats['hits']} misses={_cache_stats['misses']} "
+        f"evictions={_cache_stats['evictions']} expiradas={_cache_stats['expiradas']} "
+        f"entradas={len(_cache_respuestas)} hit_rate={hit_rate:.3f}"
+    )
+
+def normalizar_texto(texto):
+    """Minúsculas y sin tildes, para que 'pésimo' y 'pesimo' sean el mismo token"""
+    descompuesto = unicodedata.normalize('NFD', texto.casefold())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+def cargar_lexicos(rutas):
+    """Lee y combina los léxicos {idioma: {sección: términos}} de los archivos indicados"""
+    lexicos = {}
+    for ruta in rutas:
+        with open(ruta, encoding='utf-8') as f:
+            datos = json.load(f)
+        for idioma, secciones in datos.items():
+            destino = lexicos.setdefault(idioma, {})
+            for seccion, terminos in secciones.items():
+                # Una lista equivale a peso 1 para cada término
+                if isinstance(terminos, list):
+                    terminos = dict.fromkeys(terminos, 1)
+                destino.setdefault(seccion, {}).update(terminos)
+    
+    return lexicos
+
+def compilar_lexico(secciones):
+    """Compila un léxico a mapas token -> peso; las frases de varias palabras se indexan como tuplas"""
+    terminos, frases = {}, {}
+    for seccion, signo in (('positivas', 1), ('negativas', -1)):
+        for termino, peso in secciones.get(seccion, {}).items():
+            tokens = tuple(PATRON_TOKEN.findall(normalizar_texto(termino)))
+            if len(tokens) == 1:
+                terminos[tokens[0]] = signo * float(peso)
+            elif tokens:
+                frases[tokens] = signo * float(peso)
+    
+    return {
+        'terminos': terminos,
+        'frases': frases,
+        'inicios_frase': {frase[0] for frase in frases},
+        'largo_frase': max((len(frase) for frase in frases), default=1),
+        'negaciones': {normalizar_texto(t) for t in secciones.get('negaciones', {})},
+        'intensificadores': {normalizar_texto(t): float(f) for t, f in secciones.get('intensificadores', {}).items()}
+    }
+
+LEXICOS_SENTIMIENTO = {
+    idioma: compilar_lexico(secciones)
+    for idioma, secciones in cargar_lexicos(r.strip() for r in SENTIMIENTO_ARCHIVOS.split(',') if r.strip()).items()
+}
+
+def puntuar_tokens(tokens, lexico):
+    """
+    Suma los pesos en una sola pasada. Una negación invierte el siguiente término
+    dentro de VENTANA_NEGACION tokens y un intensificador multiplica el siguiente
+    dentro de VENTANA_INTENSIFICADOR; la puntuación corta ambas ventanas.
+    """
+    terminos, frases = lexico['terminos'], lexico['frases']
+    inicios_frase, largo_frase = lexico['inicios_frase'], lexico['largo_frase']
+    negaciones, intensificadores = lexico['negaciones'], lexico['intensificadores']
+    
+    puntaje = 0.0
+    fin_negacion = fin_intensificador = -1
+    factor = 1.0
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        avance = 1
+        peso = None
         
-        score = 0
-        texto_lower = texto.lower()
+        if token in inicios_frase:
+            for n in range(min(largo_frase, len(tokens) - i), 1, -1):
+                peso = frases.get(tuple(tokens[i:i + n]))
+                if peso is not None:
+                    avance = n
+                    break
+        if peso is None:
+            peso = terminos.get(token)
         
-        for palabra in positivas:
-            if palabra in texto_lower:
-                score += 1
+        if peso is not None:
+            if i <= fin_intensificador:
+                peso *= factor
+            puntaje += -peso if i <= fin_negacion else peso
+            fin_negacion = fin_intensificador = -1
+        elif token in PUNTUACION:
+            fin_negacion = fin_intensificador = -1
+        elif token in negaciones:
+            fin_negacion = i + VENTANA_NEGACION
+        elif token in intensificadores:
+            factor = intensificadores[token] * (factor if i <= fin_intensificador else 1.0)
+            fin_intensificador = i + VENTANA_INTENSIFICADOR
         
-        for palabra in negativas:
-            if palabra in texto_lower:
-                score -= 1
+        i += avance
+    
+    return puntaje
+
+@metrics.medir('sentimiento')
+def analizar_sentimiento_mejorado(texto, idioma):
+    """Análisis de sentimiento con léxicos compilados, negaciones e intensificadores"""
+    try:
+        lexico = LEXICOS_SENTIMIENTO.get(idioma) or LEXICOS_SENTIMIENTO['es']
+        score = puntuar_tokens(PATRON_TOKEN.findall(normalizar_texto(texto)), lexico)
         
         if score > 0:
             return 'positivo'
@@ -132,10 +312,11 @@ def analizar_sentimiento_mejorado(texto, idioma):
         print(f"Error analizando sentimiento: {e}")
         return 'neutral'
 
+@metrics.medir('log')
 def guardar_log(event, respuesta, idioma, sentimiento):
     """Guarda el log mejorado con más información"""
     try:
-        table_logs.put_item(Item={
+        item = {
             'sessionId': event.get('sessionId', 'unknown'),
             'timestamp': datetime.now().isoformat(),
             'inputText': event.get('inputTranscript', ''),
@@ -143,10 +324,150 @@ def guardar_log(event, respuesta, idioma, sentimiento):
             'sentiment': sentimiento,
             'botResponse': respuesta,
             'intent': event.get('sessionState', {}).get('intent', {}).get('name', 'Unknown')
-        })
+        }
+        
+        if LOG_MODO == 'sync':
+            obtener_cliente('dynamodb').put_item(TableName=TABLA_LOGS, Item=serializar_item(item))
+        else:
+            encolar_log(item)
     except Exception as e:
         print(f"Error guardando log: {e}")
 
+def encolar_log(item):
+    """Entrega el registro al escritor en segundo plano sin bloquear la conversación"""
+    iniciar_escritor_logs()
+    try:
+        _cola_logs.put_nowait(item)
+        _logs_stats['encolados'] += 1
+    except queue.Full:
+        desbordar_logs([item])
+
+def desbordar_logs(items):
+    """Aplica la política de desborde: 'spill' escribe los registros en CloudWatch, 'drop' los descarta"""
+    if LOG_POLITICA_DESBORDE == 'drop':
+        _logs_stats['descartados'] += len(items)
+        print(f"Logs descartados: {len(items)}")
+        return
+    
+    for item in items:
+        print("LOG_SPILL " + json.dumps(item, ensure_ascii=False, default=str))
+    _logs_stats['derramados'] += len(items)
+
+def iniciar_escritor_logs():
+    """Arranca el hilo escritor la primera vez que se necesita (o si murió)"""
+    hilo = _escritor_logs['hilo']
+    if hilo is not None and hilo.is_alive():
+        return
+    
+    with _escritor_lock:
+        hilo = _escritor_logs['hilo']
+        if hilo is None or not hilo.is_alive():
+            hilo = threading.Thread(target=bucle_escritor_logs, name='escritor-logs', daemon=True)
+            hilo.start()
+            _escritor_logs['hilo'] = hilo
+            instalar_manejador_senal()
+
+def bucle_escritor_logs():
+    """Agrupa los registros encolados en lotes de hasta 25 y los escribe con batch_write_item"""
+    while True:
+        lote = [_cola_logs.get()]
+        while len(lote) < TAMANO_LOTE_DYNAMODB:
+            try:
+                lote.append(_cola_logs.get_nowait())
+            except queue.Empty:
+                break
+        
+        try:
+            no_escritos = escribir_lote_logs(lote)
+            _logs_stats['escritos'] += len(lote) - len(no_escritos)
+            if no_escritos:
+                desbordar_logs(no_escritos)
+        except Exception as e:
+            print(f"Error escribiendo lote de logs: {e}")
+            desbordar_logs(lote)
+        finally:
+            for _ in lote:
+                _cola_logs.task_done()
+
+def escribir_lote_logs(items):
+    """Escribe un lote reintentando los UnprocessedItems con backoff exponencial y jitter"""
+    # Los clientes de boto3 son thread-safe: el escritor comparte el del contenedor
+    cliente = obtener_cliente('dynamodb')
+    pendientes = [{'PutRequest': {'Item': serializar_item(item)}} for item in items]
+    
+    for intento in range(LOG_MAX_REINTENTOS + 1):
+        response = cliente.batch_write_item(RequestItems={TABLA_LOGS: pendientes})
+        pendientes = response.get('UnprocessedItems', {}).get(TABLA_LOGS, [])
+        if not pendientes:
+            return []
+        
+        if intento < LOG_MAX_REINTENTOS:
+            time.sleep(random.uniform(0, min(0.05 * 2 ** intento, 1.0)))
+    
+    return [deserializar_item(pendiente['PutRequest']['Item']) for pendiente in pendientes]
+
+def vaciar_logs(timeout):
+    """Espera hasta `timeout` segundos a que el escritor vacíe la cola; devuelve True si lo logró"""
+    limite = time.monotonic() + timeout
+    with _cola_logs.all_tasks_done:
+        while _cola_logs.unfinished_tasks:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                print(f"Logs pendientes tras el flush: {_cola_logs.unfinished_tasks}")
+                return False
+            _cola_logs.all_tasks_done.wait(restante)
+    
+    return True
+
+def vaciar_al_responder():
+    """Si el turno espera al escritor antes de responder: siempre con LOG_FLUSH_ON_RETURN o al juntar LOG_FLUSH_THRESHOLD pendientes"""
+    return LOG_FLUSH_AL_RESPONDER or 0 < LOG_FLUSH_UMBRAL <= _cola_logs.unfinished_tasks
+
+def vaciar_logs_al_terminar():
+    """Último flush antes de que Lambda apague el contenedor"""
+    if not vaciar_logs(LOG_FLUSH_TIMEOUT_SEGUNDOS * 4):
+        # Lo que no alcanzó a escribirse se conserva en CloudWatch
+        pendientes = []
+        while True:
+            try:
+                pendientes.append(_cola_logs.get_nowait())
+            except queue.Empty:
+                break
+        desbordar_logs(pendientes)
+    
+    # Un proceso que nunca registró logs (pruebas, benchmarks) no ensucia la salida
+    if any(_logs_stats.values()):
+        print(f"Logs de sesión: {_logs_stats}")
+
+def instalar_manejador_senal():
+    """Instala el manejador de SIGTERM una sola vez, conservando el que hubiera para encadenarlo"""
+    if _senal_terminar['instalada'] or threading.current_thread() is not threading.main_thread():
+        # signal solo puede registrarse desde el hilo principal
+        return
+    
+    anterior = signal.getsignal(signal.SIGTERM)
+    _senal_terminar['instalada'] = True
+    if anterior == signal.SIG_IGN:
+        # Quien ignora SIGTERM no quiere que el proceso termine con él
+        return
+    
+    _senal_terminar['anterior'] = anterior
+    signal.signal(signal.SIGTERM, terminar_por_senal)
+
+def terminar_por_senal(signum, frame):
+    """Vacía los logs ante el SIGTERM del apagado y sigue con el manejador anterior"""
+    anterior = _senal_terminar['anterior']
+    if callable(anterior):
+        vaciar_logs_al_terminar()
+        anterior(signum, frame)
+        return
+    
+    # Sin manejador propio: una salida normal, para que corra atexit
+    sys.exit(0)
+
+atexit.register(vaciar_logs_al_terminar)
+
+@metrics.medir('generacion')
 def construir_respuesta_lex(respuesta, sentimiento, idioma):
     """Construye respuesta con personalización por sentimiento"""
     try:
@@ -1,5 +1,13 @@
 import json
-import boto3
+import os
+import re
+import unicodedata
+from collections import OrderedDict, deque
+from functools import lru_cache
+
+import knowledge_base
+import metrics
+import session_store
 
 # Diccionario de traducciones expandido
 TRADUCCIONES = {
@@ -16,6 +24,8 @@ TRADUCCIONES = {
         'contact': 'contacto',
         'support': 'contacto',
         'help': 'contacto',
+        'hello': 'hola',
+        'hi': 'hola',
         
         # Palabras de contexto
         'what': 'qué',
@@ -40,6 +50,8 @@ TRADUCCIONES = {
         'contato': 'contacto',
         'suporte': 'contacto',
         'ajuda': 'contacto',
+        'olá': 'hola',
+        'oi': 'hola',
         
         # Palabras de contexto
         'qual': 'qué',
@@ -55,42 +67,202 @@ TRADUCCIONES = {
     }
 }
 
-# Respuestas por defecto en 3 idiomas
-RESPUESTAS_DEFAULT = {
-    'es': {
-        'error': 'Lo siento, no tengo información sobre ese tema. ¿Puedes intentar con "precio", "horario" o "ubicación"?',
-        'saludo': '¡Hola! ¿En qué puedo ayudarte? Puedes preguntar sobre precios, horarios, ubicación o contacto.',
-        'despedida': '¡Gracias por contactarnos! ¿Hay algo más en lo que pueda ayudarte?'
-    },
-    'en': {
-        'error': "I'm sorry, I don't have information about that topic. Can you try with 'price', 'schedule' or 'location'?",
-        'saludo': "Hello! How can I help you? You can ask about prices, schedules, location or contact.",
-        'despedida': "Thank you for contacting us! Is there anything else I can help you with?"
-    },
-    'pt': {
-        'error': 'Desculpe, não tenho informações sobre esse tópico. Pode tentar com "preço", "horário" ou "localização"?',
-        'saludo': 'Olá! Como posso ajudá-lo? Pode perguntar sobre preços, horários, localização ou contato.',
-        'despedida': 'Obrigado por entrar em contato! Há algo mais em que posso ajudá-lo?'
-    }
+# Tabla tema x idioma de respuestas, cargada una sola vez por contenedor
+RESPUESTAS_ARCHIVO = os.environ.get(
+    'RESPONSES_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'respuestas.json')
+)
+
+def cargar_respuestas(ruta):
+    """Lee la tabla de respuestas {tema: {idioma: texto}} desde un archivo JSON"""
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+RESPUESTAS = cargar_respuestas(RESPUESTAS_ARCHIVO)
+
+# Headers CORS
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS, DELETE',
+    'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
+    'Access-Control-Allow-Credentials': 'false'
 }
 
-def lambda_handler(event, context):
-    print("🔍 === LAMBDA ORQUESTADOR MULTILINGÜE ===")
-    
-    # Headers CORS
-    cors_headers = {
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'GET, POST, OPTIONS, DELETE',
-        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-        'Access-Control-Allow-Credentials': 'false'
+def serializar_cuerpo(texto, idioma, status):
+    """Serializa el cuerpo JSON que se devuelve a API Gateway"""
+    return json.dumps({
+        'response': texto,
+        'detectedLanguage': idioma,
+        'status': status
+    })
+
+# Cuerpos pre-serializados: el camino caliente solo arma el sobre final
+CUERPO_OPTIONS = json.dumps({'status': 'OK'})
+CUERPOS_RESPUESTA = {
+    (tema, idioma): serializar_cuerpo(texto, idioma, 'success')
+    for tema, textos in RESPUESTAS.items()
+    for idioma, texto in textos.items()
+}
+CUERPOS_ERROR = {
+    idioma: serializar_cuerpo(texto, idioma, 'error')
+    for idioma, texto in RESPUESTAS['error'].items()
+}
+
+# Máximo de mensajes aceptados en una sola invocación por lotes
+LOTE_MAX_MENSAJES = int(os.environ.get('BATCH_MAX_MESSAGES', '1000'))
+
+# Las respuestas de FAQKnowledgeBase tienen prioridad sobre respuestas.json
+KB_ACTIVA = os.environ.get('ORCHESTRATOR_USE_KB', 'true').lower() == 'true'
+_cuerpos_kb = {}
+
+@knowledge_base.al_actualizar
+def limpiar_cuerpos_kb():
+    """La tabla cambió: se descartan los cuerpos serializados a partir de ella"""
+    _cuerpos_kb.clear()
+
+# Palabras clave por idioma para la detección
+PALABRAS_IDIOMA = {
+    'es': ['hola', 'precio', 'horario', 'ubicacion', 'contacto', 'gracias', 'por favor', 'qué', 'cómo', 'dónde'],
+    'en': ['hello', 'hi', 'price', 'cost', 'schedule', 'hours', 'location', 'address', 'contact', 'thanks', 'please', 'what', 'how', 'where'],
+    'pt': ['olá', 'oi', 'preço', 'custo', 'horário', 'hora', 'localização', 'endereço', 'contato', 'obrigado', 'por favor', 'qual', 'como', 'onde']
+}
+
+# Temas en orden de prioridad y sus palabras en español, sin tildes; los otros idiomas llegan por TRADUCCIONES.
+# Los plurales ('precios', 'ubicaciones') se reconocen por su singular
+ORDEN_TEMAS = ['precio', 'horario', 'ubicacion', 'contacto', 'saludo']
+PALABRAS_TEMA = {tema: [tema] for tema in ORDEN_TEMAS[:-1]}
+PALABRAS_TEMA['ubicacion'] += ['ubicado', 'ubicada']
+PALABRAS_TEMA['contacto'] += ['contactar', 'contactarnos', 'contactarlos']
+PALABRAS_TEMA['saludo'] = ['hola']
+
+def construir_automata(terminos):
+    """Construye un autómata Aho-Corasick que encuentra todos los términos en una sola pasada"""
+    transiciones = [{}]
+    salidas = [set()]
+    
+    # Trie de caracteres
+    for termino in terminos:
+        estado = 0
+        for caracter in termino:
+            siguiente = transiciones[estado].get(caracter)
+            if siguiente is None:
+                siguiente = len(transiciones)
+                transiciones[estado][caracter] = siguiente
+                transiciones.append({})
+                salidas.append(set())
+            estado = siguiente
+        salidas[estado].add(termino)
+    
+    # Enlaces de fallo por anchura; cada estado hereda las salidas de su sufijo
+    fallos = [0] * len(transiciones)
+    cola = deque(transiciones[0].values())
+    while cola:
+        estado = cola.popleft()
+        for caracter, siguiente in transiciones[estado].items():
+            cola.append(siguiente)
+            fallo = fallos[estado]
+            while fallo and caracter not in transiciones[fallo]:
+                fallo = fallos[fallo]
+            destino = transiciones[fallo].get(caracter, 0)
+            fallos[siguiente] = destino if destino != siguiente else 0
+            salidas[siguiente] |= salidas[fallos[siguiente]]
+    
+    return transiciones, fallos, [frozenset(salida) for salida in salidas]
+
+def buscar_terminos(automata, texto):
+    """Devuelve el conjunto de términos que aparecen como subcadena de `texto`"""
+    transiciones, fallos, salidas = automata
+    estado = 0
+    encontrados = set()
+    
+    for caracter in texto:
+        while estado and caracter not in transiciones[estado]:
+            estado = fallos[estado]
+        estado = transiciones[estado].get(caracter, 0)
+        if salidas[estado]:
+            encontrados |= salidas[estado]
+    
+    return encontrados
+
+# Etiquetas de cada término: idiomas que puntúa y temas que activa como palabra completa
+IDIOMAS_POR_TERMINO = {}
+TEMAS_POR_TERMINO = {}
+for _idioma, _palabras in PALABRAS_IDIOMA.items():
+    for _palabra in _palabras:
+        IDIOMAS_POR_TERMINO.setdefault(_palabra, []).append(_idioma)
+for _tema, _palabras in PALABRAS_TEMA.items():
+    for _palabra in _palabras:
+        TEMAS_POR_TERMINO.setdefault(_palabra, []).append(_tema)
+
+AUTOMATA = construir_automata(set(IDIOMAS_POR_TERMINO))
+
+# Traducción palabra por palabra, cacheada por mensaje normalizado
+PATRON_PALABRA = re.compile(r'\w+')
+TRADUCCION_CACHE_MAX = int(os.environ.get('TRANSLATION_CACHE_MAX_ENTRIES', '1024'))
+
+# Contexto por sesión: los turnos cortos o ambiguos heredan el idioma y el tema anteriores
+SESION_CONFIANZA_MINIMA = float(os.environ.get('SESSION_MIN_CONFIDENCE', '0.3'))
+SESION_SENAL_FUERTE = int(os.environ.get('SESSION_STRONG_SIGNAL', '2'))
+SESION_PALABRAS_TURNO_CORTO = int(os.environ.get('SESSION_SHORT_TURN_WORDS', '2'))
+SESION_DECAIMIENTO_TEMA = 0.5
+SESION_ANONIMA = 'default-session'
+
+# Memo de mensajes repetidos: mensaje normalizado -> (tema, idioma, confianza) de la detección sin contexto.
+# La admisión es TinyLFU: un mensaje nuevo solo desaloja al menos reciente si es más frecuente que él
+CACHE_MENSAJES_MAX = int(os.environ.get('MESSAGE_CACHE_MAX_ENTRIES', '2048'))
+CACHE_MENSAJES_STATS_CADA = int(os.environ.get('MESSAGE_CACHE_STATS_EVERY', '1000'))
+SKETCH_SEMILLAS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+SKETCH_MAX_CONTADOR = 15
+TABLA_MITAD = bytes(i >> 1 for i in range(256))
+
+def crear_sketch(capacidad):
+    """Count-Min Sketch de contadores de un byte, con ancho de al menos 8 veces la capacidad"""
+    ancho = 1 << max(4, (capacidad * 8 - 1).bit_length())
+    return {
+        'filas': [bytearray(ancho) for _ in SKETCH_SEMILLAS],
+        'mascara': ancho - 1,
+        'incrementos': 0,
+        'muestra': capacidad * 10
     }
+
+def sketch_posiciones(sketch, clave):
+    h = hash(clave)
+    return [((h * semilla) >> 17) & sketch['mascara'] for semilla in SKETCH_SEMILLAS]
+
+def sketch_estimar(sketch, clave):
+    """Frecuencia reciente estimada de `clave` (cota superior)"""
+    return min(fila[i] for fila, i in zip(sketch['filas'], sketch_posiciones(sketch, clave)))
+
+def sketch_incrementar(sketch, clave):
+    """Incremento conservador; cada `muestra` incrementos se dividen todos los contadores a la mitad"""
+    posiciones = sketch_posiciones(sketch, clave)
+    minimo = min(fila[i] for fila, i in zip(sketch['filas'], posiciones))
+    if minimo < SKETCH_MAX_CONTADOR:
+        for fila, i in zip(sketch['filas'], posiciones):
+            if fila[i] == minimo:
+                fila[i] = minimo + 1
+    
+    sketch['incrementos'] += 1
+    if sketch['incrementos'] >= sketch['muestra']:
+        # Envejecimiento: los mensajes que dejaron de repetirse pierden peso
+        sketch['filas'] = [fila.translate(TABLA_MITAD) for fila in sketch['filas']]
+        sketch['incrementos'] //= 2
+
+_cache_mensajes = OrderedDict()
+_cache_mensajes_stats = {'hits': 0, 'misses': 0, 'admitidos': 0, 'rechazados': 0}
+_sketch_mensajes = crear_sketch(max(CACHE_MENSAJES_MAX, 1))
+
+@metrics.medir_invocacion('Orchestrator')
+def lambda_handler(event, context):
+    if metrics.DEBUG:
+        print("🔍 === LAMBDA ORQUESTADOR MULTILINGÜE ===")
     
     # Manejar preflight OPTIONS
     if event.get('httpMethod') == 'OPTIONS':
         return {
             'statusCode': 200,
-            'headers': cors_headers,
-            'body': json.dumps({'status': 'OK'})
+            'headers': CORS_HEADERS,
+            'body': CUERPO_OPTIONS
         }
     
     try:
@@ -100,62 +272,190 @@ def lambda_handler(event, context):
             body_data = json.loads(body)
         else:
             body_data = body
+        
+        # Lote de mensajes: una sola invocación para N mensajes
+        if 'messages' in body_data:
+            return responder_lote(body_data['messages'])
             
         user_message = body_data.get('message', '').strip()
         session_id = body_data.get('sessionId', 'default-session')
         
-        print(f"💬 Mensaje recibido: '{user_message}'")
+        if metrics.DEBUG:
+            print(f"💬 Mensaje recibido: '{user_message}'")
         
         if not user_message:
-            return respuesta_error('Mensaje vacío', 'es', cors_headers)
+            return respuesta_error('Mensaje vacío', 'es')
         
-        # 1. Detectar idioma MEJORADO
-        detected_language = detectar_idioma_mejorado(user_message)
-        print(f"🌐 Idioma detectado: {detected_language}")
-        
-        # 2. Generar respuesta en el idioma detectado
-        response_text = generar_respuesta_multilingue(user_message, detected_language)
+        # 1. Detectar idioma y 2. resolver el tema en el idioma detectado, con el contexto de la sesión
+        tema, detected_language = procesar_mensaje(user_message, session_id)
+        if metrics.DEBUG:
+            print(f"🌐 Idioma detectado: {detected_language}")
         
+        # 3. Devolver la respuesta pre-serializada
         return {
             'statusCode': 200,
-            'headers': cors_headers,
-            'body': json.dumps({
-                'response': response_text,
-                'detectedLanguage': detected_language,
-                'status': 'success'
-            })
+            'headers': CORS_HEADERS,
+            'body': cuerpo_respuesta(tema, detected_language)
         }
         
     except Exception as e:
         print(f"❌ ERROR: {str(e)}")
-        return respuesta_error('Error interno', 'es', cors_headers)
+        return respuesta_error('Error interno', 'es')
 
-def detectar_idioma_mejorado(texto):
-    """Detección MEJORADA de idioma con scoring"""
-    texto_lower = texto.lower()
+def procesar_mensaje(mensaje, session_id=None):
+    """Detecta el idioma y resuelve el tema de un mensaje; devuelve (tema, idioma)"""
+    recordar = session_id is not None and session_id != SESION_ANONIMA
+    sesion = session_store.obtener(session_id) if recordar else None
+    clave = normalizar_mensaje(mensaje)
+    memo = cache_mensaje_obtener(clave)
     
-    # Scoring por idioma
-    scores = {'es': 0, 'en': 0, 'pt': 0}
+    with metrics.etapa('deteccion'):
+        if turno_corto(clave, sesion):
+            # Turnos cortos ("ok", "¿y el sábado?"): no aportan señal, se omite la detección
+            deteccion = None
+            idioma, confianza_idioma = sesion['idioma'], sesion['confianza_idioma']
+        else:
+            deteccion = memo[1:] if memo else detectar_idioma(clave)
+            idioma, confianza_idioma = idioma_con_sesion(deteccion, sesion)
+    
+    with metrics.etapa('generacion'):
+        if memo and memo[1] == idioma:
+            tema = memo[0]
+        else:
+            tema = resolver_tema(clave, idioma)
+            # Solo se memoiza el resultado sin contexto: el de un idioma heredado de la sesión no vale para otros
+            if memo is None and deteccion and deteccion[0] == idioma:
+                cache_mensaje_guardar(clave, (tema,) + deteccion)
+        tema, confianza_tema = tema_con_sesion(tema, sesion)
+    
+    if recordar:
+        # Un saludo o un turno sin tema no borra el último tema de la sesión
+        if confianza_tema == 0 and sesion:
+            tema_guardado, confianza_tema = sesion['tema'], sesion['confianza_tema']
+        else:
+            tema_guardado = tema if confianza_tema else None
+        session_store.guardar(session_id, idioma, confianza_idioma, tema_guardado, confianza_tema, sesion)
+    
+    return tema, idioma
+
+def sesion_confiable(sesion):
+    return sesion is not None and sesion['confianza_idioma'] >= SESION_CONFIANZA_MINIMA
+
+def turno_corto(mensaje, sesion):
+    """Un mensaje de pocas palabras en una sesión confiable hereda su idioma sin detectar"""
+    return sesion_confiable(sesion) and len(mensaje.split()) <= SESION_PALABRAS_TURNO_CORTO
+
+def detectar_idioma(mensaje):
+    """Idioma sin contexto y su confianza, según la ventaja sobre el segundo idioma"""
+    scores, _ = analizar_mensaje(mensaje)
+    primero, segundo = sorted(scores.values(), reverse=True)[:2]
+    return elegir_idioma(scores), min(1.0, (primero - segundo) / SESION_SENAL_FUERTE)
+
+def idioma_con_sesion(deteccion, sesion):
+    """Idioma del turno y su confianza; solo una señal fuerte cambia el idioma de una sesión confiable"""
+    idioma, confianza = deteccion
+    if sesion_confiable(sesion) and confianza < 1.0:
+        return sesion['idioma'], sesion['confianza_idioma']
     
-    # Palabras clave por idioma
-    palabras_es = ['hola', 'precio', 'horario', 'ubicacion', 'contacto', 'gracias', 'por favor', 'qué', 'cómo', 'dónde']
-    palabras_en = ['hello', 'hi', 'price', 'cost', 'schedule', 'hours', 'location', 'address', 'contact', 'thanks', 'please', 'what', 'how', 'where']
-    palabras_pt = ['olá', 'oi', 'preço', 'custo', 'horário', 'hora', 'localização', 'endereço', 'contato', 'obrigado', 'por favor', 'qual', 'como', 'onde']
+    if sesion is not None and sesion['idioma'] == idioma:
+        confianza = min(1.0, confianza + sesion['confianza_idioma'])
     
-    # Calcular scores
-    for palabra in palabras_es:
-        if palabra in texto_lower:
-            scores['es'] += 1
+    return idioma, confianza
+
+def tema_con_sesion(tema, sesion):
+    """Tema del turno y su confianza; un turno sin tema retoma el de la sesión con menos confianza"""
+    if tema not in ('error', 'saludo'):
+        return tema, 1.0
+    
+    if tema == 'error' and sesion and sesion['tema'] and sesion['confianza_tema'] >= SESION_CONFIANZA_MINIMA:
+        return sesion['tema'], sesion['confianza_tema'] * SESION_DECAIMIENTO_TEMA
+    
+    return tema, 0.0
+
+def responder_lote(mensajes):
+    """Procesa una lista de mensajes en orden, aislando los errores de cada uno"""
+    if not isinstance(mensajes, list) or len(mensajes) > LOTE_MAX_MENSAJES:
+        return respuesta_error(f'Lote inválido (máximo {LOTE_MAX_MENSAJES} mensajes)', 'es')
     
-    for palabra in palabras_en:
-        if palabra in texto_lower:
-            scores['en'] += 1
+    if metrics.DEBUG:
+        print(f"📦 Lote recibido: {len(mensajes)} mensajes")
+    resultados = []
+    errores = 0
+    
+    for entrada in mensajes:
+        session_id = 'default-session'
+        try:
+            session_id = entrada.get('sessionId', 'default-session')
+            mensaje = (entrada.get('message') or '').strip()
+            if not mensaje:
+                raise ValueError('Mensaje vacío')
             
-    for palabra in palabras_pt:
-        if palabra in texto_lower:
-            scores['pt'] += 1
+            tema, idioma = procesar_mensaje(mensaje, session_id)
+            resultados.append({
+                'sessionId': session_id,
+                'response': obtener_respuesta(tema, idioma),
+                'detectedLanguage': idioma,
+                'status': 'success'
+            })
+        except Exception as e:
+            errores += 1
+            resultados.append({
+                'sessionId': session_id,
+                'response': RESPUESTAS['error']['es'],
+                'detectedLanguage': 'es',
+                'status': 'error',
+                'error': str(e)
+            })
+    
+    if errores:
+        print(f"❌ Mensajes con error en el lote: {errores}")
+    
+    return {
+        'statusCode': 200,
+        'headers': CORS_HEADERS,
+        'body': json.dumps({
+            'responses': resultados,
+            'status': 'success'
+        })
+    }
+
+def analizar_mensaje(texto):
+    """Calcula los puntajes por idioma en una sola pasada y los temas presentes"""
+    texto = texto.lower()
+    scores = {'es': 0, 'en': 0, 'pt': 0}
     
-    # Determinar idioma ganador
+    for termino in buscar_terminos(AUTOMATA, texto):
+        for idioma in IDIOMAS_POR_TERMINO.get(termino, ()):
+            scores[idioma] += 1
+    
+    # Los temas se reconocen por palabra completa: 'sometimes' no es 'time' ni 'chihuahua' es 'hi'
+    temas = set()
+    for palabra in PATRON_PALABRA.findall(sin_tildes(texto)):
+        temas.update(buscar_palabra(TEMAS_POR_TERMINO, palabra) or ())
+    
+    return scores, temas
+
+def formas_singulares(palabra):
+    """La palabra y sus posibles singulares: 'ubicaciones' -> 'ubicacione', 'ubicacion'"""
+    formas = [palabra]
+    # Las palabras cortas no se recortan: 'his' no es el plural de 'hi'
+    if len(palabra) > 3 and palabra.endswith('s'):
+        formas.append(palabra[:-1])
+        if palabra.endswith('es'):
+            formas.append(palabra[:-2])
+    return formas
+
+def buscar_palabra(diccionario, palabra):
+    """Valor de la palabra o de su singular en el diccionario (None si no está)"""
+    return next((diccionario[forma] for forma in formas_singulares(palabra) if forma in diccionario), None)
+
+def sin_tildes(texto):
+    """Quita las tildes para que 'ubicación' y 'ubicacion' sean la misma palabra"""
+    descompuesto = unicodedata.normalize('NFD', texto)
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+def elegir_idioma(scores):
+    """Determina el idioma ganador; español si no hay indicadores"""
     idioma_ganador = max(scores, key=scores.get)
     
     # Si no hay suficientes indicadores, usar español por defecto
@@ -164,83 +464,137 @@ def detectar_idioma_mejorado(texto):
     
     return idioma_ganador
 
-def generar_respuesta_multilingue(mensaje, idioma):
-    """Genera respuesta en el idioma correspondiente"""
-    mensaje_lower = mensaje.lower()
-    
-    # Primero traducir el mensaje a español para procesamiento
+def resolver_tema(mensaje, idioma):
+    """Tema de mayor prioridad presente en el mensaje, o 'error' si no hay ninguno"""
+    # Primero traducir el mensaje a español: los temas se buscan sobre el texto traducido
     mensaje_es = traducir_a_espanol(mensaje, idioma)
+    _, temas = analizar_mensaje(mensaje_es)
     
-    # Respuestas en diferentes idiomas basadas en palabras clave
-    if any(palabra in mensaje_lower for palabra in ['precio', 'price', 'preço', 'cost', 'custo']):
-        return obtener_respuesta_precio(idioma)
-    
-    elif any(palabra in mensaje_lower for palabra in ['horario', 'schedule', 'horário', 'hours', 'time', 'hora']):
-        return obtener_respuesta_horario(idioma)
+    # Sin indicadores la detección cae en español y el mensaje no se traduce ("I need help",
+    # "Preciso de ajuda"): si no aparece ningún tema se prueba con cada diccionario
+    if not temas and idioma not in TRADUCCIONES:
+        for otro_idioma in TRADUCCIONES:
+            temas |= analizar_mensaje(traducir_a_espanol(mensaje, otro_idioma))[1]
     
-    elif any(palabra in mensaje_lower for palabra in ['ubicacion', 'location', 'localização', 'address', 'place', 'endereço']):
-        return obtener_respuesta_ubicacion(idioma)
+    return next((tema for tema in ORDEN_TEMAS if tema in temas), 'error')
+
+def cache_mensaje_obtener(clave):
+    """Resultado memoizado del mensaje (None si no está); toda consulta cuenta para su frecuencia"""
+    if CACHE_MENSAJES_MAX <= 0:
+        return None
     
-    elif any(palabra in mensaje_lower for palabra in ['contacto', 'contact', 'contato', 'support', 'suporte', 'help', 'ajuda']):
-        return obtener_respuesta_contacto(idioma)
+    sketch_incrementar(_sketch_mensajes, clave)
+    resultado = _cache_mensajes.get(clave)
+    if resultado is None:
+        _cache_mensajes_stats['misses'] += 1
+    else:
+        _cache_mensajes.move_to_end(clave)
+        _cache_mensajes_stats['hits'] += 1
     
-    elif any(palabra in mensaje_lower for palabra in ['hola', 'hello', 'hi', 'olá', 'oi']):
-        return RESPUESTAS_DEFAULT[idioma]['saludo']
+    consultas = _cache_mensajes_stats['hits'] + _cache_mensajes_stats['misses']
+    if CACHE_MENSAJES_STATS_CADA > 0 and consultas % CACHE_MENSAJES_STATS_CADA == 0:
+        registrar_stats_mensajes()
     
-    else:
-        return RESPUESTAS_DEFAULT[idioma]['error']
+    return resultado
 
-def traducir_a_espanol(texto, idioma_original):
-    """Traduce palabras clave al español para procesamiento"""
-    if idioma_original == 'es':
-        return texto.lower()
+def cache_mensaje_guardar(clave, resultado):
+    """Admite el resultado si hay lugar o si el mensaje es más frecuente que el menos reciente"""
+    if CACHE_MENSAJES_MAX <= 0:
+        return
     
-    texto_traducido = texto.lower()
-    for palabra_ext, palabra_es in TRADUCCIONES[idioma_original].items():
-        texto_traducido = texto_traducido.replace(palabra_ext, palabra_es)
+    if len(_cache_mensajes) >= CACHE_MENSAJES_MAX:
+        victima = next(iter(_cache_mensajes))
+        if sketch_estimar(_sketch_mensajes, clave) <= sketch_estimar(_sketch_mensajes, victima):
+            _cache_mensajes_stats['rechazados'] += 1
+            return
+        del _cache_mensajes[victima]
     
-    return texto_traducido
+    _cache_mensajes[clave] = resultado
+    _cache_mensajes_stats['admitidos'] += 1
 
-# Respuestas específicas por idioma
-def obtener_respuesta_precio(idioma):
-    respuestas = {
-        'es': "💰 *Precios:*\n• Plan Básico: $50/mes\n• Plan Premium: $80/mes\n• Plan Empresarial: $120/mes\n\n¿Te gustaría más información sobre algún plan en específico?",
-        'en': "💰 *Prices:*\n• Basic Plan: $50/month\n• Premium Plan: $80/month\n• Enterprise Plan: $120/month\n\nWould you like more information about a specific plan?",
-        'pt': "💰 *Preços:*\n• Plano Básico: $50/mês\n• Plano Premium: $80/mês\n• Plano Empresarial: $120/mês\n\nGostaria de mais informações sobre algum plano específico?"
-    }
-    return respuestas.get(idioma, respuestas['es'])
+def registrar_stats_mensajes():
+    """Escribe en el log los contadores acumulados del memo de mensajes"""
+    consultas = _cache_mensajes_stats['hits'] + _cache_mensajes_stats['misses']
+    hit_rate = _cache_mensajes_stats['hits'] / consultas if consultas else 0.0
+    print(
+        f"Caché de mensajes: hits={_cache_mensajes_stats['hits']} misses={_cache_mensajes_stats['misses']} "
+        f"admitidos={_cache_mensajes_stats['admitidos']} rechazados={_cache_mensajes_stats['rechazados']} "
+        f"entradas={len(_cache_mensajes)} hit_rate={hit_rate:.3f}"
+    )
 
-def obtener_respuesta_horario(idioma):
-    respuestas = {
-        'es': "🕐 *Horario de Atención:*\n• Lunes a Viernes: 9:00 AM - 6:00 PM\n• Sábados: 9:00 AM - 1:00 PM\n• Soporte 24/7 para emergencias\n\n¿Necesitas información específica sobre algún horario?",
-        'en': "🕐 *Business Hours:*\n• Monday to Friday: 9:00 AM - 6:00 PM\n• Saturdays: 9:00 AM - 1:00 PM\n• 24/7 support for emergencies\n\nDo you need specific information about any schedule?",
-        'pt': "🕐 *Horário de Atendimento:*\n• Segunda a Sexta: 9:00 às 18:00\n• Sábados: 9:00 às 13:00\n• Suporte 24/7 para emergências\n\nPrecisa de informações específicas sobre algum horário?"
-    }
-    return respuestas.get(idioma, respuestas['es'])
+@knowledge_base.al_actualizar
+def limpiar_cache_mensajes():
+    """Vocabulario o respuestas recargados: se descartan los resultados memoizados"""
+    _cache_mensajes.clear()
+    traducir_normalizado.cache_clear()
 
-def obtener_respuesta_ubicacion(idioma):
-    respuestas = {
-        'es': "📍 *Ubicación:*\n• Dirección: Av. Principal 123, Ciudad\n• Teléfono: +1-234-567-8900\n• Email: info@smartcloud.com\n\n¿Necesitas direcciones específicas o información de transporte?",
-        'en': "📍 *Location:*\n• Address: Main Ave 123, City\n• Phone: +1-234-567-8900\n• Email: info@smartcloud.com\n\nDo you need specific directions or transportation information?",
-        'pt': "📍 *Localização:*\n• Endereço: Av. Principal 123, Cidade\n• Telefone: +1-234-567-8900\n• Email: info@smartcloud.com\n\nPrecisa de direções específicas ou informações de transporte?"
-    }
-    return respuestas.get(idioma, respuestas['es'])
+def recargar_respuestas(ruta=None):
+    """Vuelve a leer la tabla de respuestas, re-serializa sus cuerpos y vacía las cachés que dependen de ella"""
+    respuestas = cargar_respuestas(ruta or RESPUESTAS_ARCHIVO)
+    RESPUESTAS.clear()
+    RESPUESTAS.update(respuestas)
+    CUERPOS_RESPUESTA.clear()
+    CUERPOS_RESPUESTA.update({
+        (tema, idioma): serializar_cuerpo(texto, idioma, 'success')
+        for tema, textos in RESPUESTAS.items()
+        for idioma, texto in textos.items()
+    })
+    CUERPOS_ERROR.clear()
+    CUERPOS_ERROR.update({idioma: serializar_cuerpo(texto, idioma, 'error') for idioma, texto in RESPUESTAS['error'].items()})
+    limpiar_cuerpos_kb()
+    limpiar_cache_mensajes()
 
-def obtener_respuesta_contacto(idioma):
-    respuestas = {
-        'es': "📞 *Contacto:*\n• Teléfono: +1-234-567-8900\n• Email: soporte@smartcloud.com\n• Chat en vivo: Disponible en nuestro sitio web\n• Redes sociales: @SmartCloudBot\n\n¿Por cuál medio prefieres contactarnos?",
-        'en': "📞 *Contact:*\n• Phone: +1-234-567-8900\n• Email: support@smartcloud.com\n• Live chat: Available on our website\n• Social media: @SmartCloudBot\n\nWhich contact method do you prefer?",
-        'pt': "📞 *Contato:*\n• Telefone: +1-234-567-8900\n• Email: suporte@smartcloud.com\n• Chat ao vivo: Disponível em nosso site\n• Redes sociais: @SmartCloudBot\n\nPor qual meio prefere nos contactar?"
-    }
-    return respuestas.get(idioma, respuestas['es'])
+def normalizar_mensaje(texto):
+    """Minúsculas y espacios colapsados: la clave con la que se cachea un mensaje"""
+    return ' '.join(texto.lower().split())
+
+def traducir_a_espanol(texto, idioma_original):
+    """Traduce palabras clave al español para procesamiento"""
+    return traducir_normalizado(normalizar_mensaje(texto), idioma_original)
+
+@lru_cache(maxsize=TRADUCCION_CACHE_MAX)
+def traducir_normalizado(texto, idioma_original):
+    """Reemplaza palabras completas en una sola pasada; el costo no depende del tamaño del diccionario"""
+    diccionario = TRADUCCIONES.get(idioma_original)
+    if not diccionario:
+        return texto
+    
+    return PATRON_PALABRA.sub(lambda palabra: buscar_palabra(diccionario, palabra.group(0)) or palabra.group(0), texto)
 
-def respuesta_error(mensaje, idioma, headers):
+@metrics.medir('dynamodb')
+def obtener_respuesta(tema, idioma):
+    """Texto de FAQKnowledgeBase si existe; si no, de la tabla de respuestas con español como respaldo"""
+    if KB_ACTIVA:
+        respuesta = knowledge_base.obtener_respuesta(tema, idioma)
+        if respuesta:
+            return respuesta
+    
+    textos = RESPUESTAS.get(tema, RESPUESTAS['error'])
+    return textos.get(idioma, textos['es'])
+
+@metrics.medir('dynamodb')
+def cuerpo_respuesta(tema, idioma):
+    """Cuerpo serializado de la respuesta, reutilizado mientras no cambie el snapshot"""
+    if not KB_ACTIVA:
+        return CUERPOS_RESPUESTA[(tema, idioma)]
+    
+    # Verifica el TTL del snapshot; si cambió la tabla, limpiar_cuerpos_kb ya vació la caché
+    knowledge_base.obtener_snapshot()
+    
+    cuerpo = _cuerpos_kb.get((tema, idioma))
+    if cuerpo is None:
+        respuesta = knowledge_base.obtener_respuesta(tema, idioma)
+        if respuesta:
+            cuerpo = serializar_cuerpo(respuesta, idioma, 'success')
+        else:
+            cuerpo = CUERPOS_RESPUESTA[(tema, idioma)]
+        _cuerpos_kb[(tema, idioma)] = cuerpo
+    
+    return cuerpo
+
+def respuesta_error(mensaje, idioma):
     return {
         'statusCode': 200,
-        'headers': headers,
-        'body': json.dumps({
-            'response': RESPUESTAS_DEFAULT[idioma]['error'],
-            'detectedLanguage': idioma,
-            'status': 'error'
-        })
-    }
\ No newline at end of file
+        'headers': CORS_HEADERS,
+        'body': CUERPOS_ERROR[idioma]
+    }
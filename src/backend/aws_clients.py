@@ -0,0 +1,135 @@
+"""
+Clientes de AWS compartidos por las Lambdas.
+
+boto3 se importa y cada cliente se crea recién en el primer uso, para no pagar
+ese costo en el arranque en frío de un contenedor que quizás no lo necesite.
+Se usan clientes de bajo nivel (más livianos que la capa `resource`), así que
+los items viajan en el formato tipado de DynamoDB; `serializar_item` y
+`deserializar_item` hacen la conversión.
+
+Los clientes se configuran para el presupuesto de latencia de un chat:
+timeouts cortos, reintentos adaptativos, keep-alive de TCP y un pool de
+conexiones dimensionado para el pool de hilos de E/S (`obtener_ejecutor`).
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+MAX_CONEXIONES = int(os.environ.get('BOTO_MAX_POOL_CONNECTIONS', '10'))
+CONNECT_TIMEOUT_SEGUNDOS = float(os.environ.get('BOTO_CONNECT_TIMEOUT_SECONDS', '1'))
+READ_TIMEOUT_SEGUNDOS = float(os.environ.get('BOTO_READ_TIMEOUT_SECONDS', '2'))
+MAX_INTENTOS = int(os.environ.get('BOTO_MAX_ATTEMPTS', '3'))
+MODO_REINTENTOS = os.environ.get('BOTO_RETRY_MODE', 'adaptive')
+TCP_KEEPALIVE = os.environ.get('BOTO_TCP_KEEPALIVE', 'true').lower() == 'true'
+HILOS_IO = int(os.environ.get('IO_WORKERS', '4'))
+
+_clientes = {}
+_clientes_lock = threading.Lock()
+_ejecutor = {'pool': None}
+
+def configuracion_cliente(**opciones):
+    """Config de botocore con los valores del entorno; `opciones` sobrescribe cualquiera de ellos"""
+    from botocore.config import Config
+
+    configuracion = {
+        'max_pool_connections': MAX_CONEXIONES,
+        'connect_timeout': CONNECT_TIMEOUT_SEGUNDOS,
+        'read_timeout': READ_TIMEOUT_SEGUNDOS,
+        'retries': {'max_attempts': MAX_INTENTOS, 'mode': MODO_REINTENTOS},
+        'tcp_keepalive': TCP_KEEPALIVE
+    }
+    configuracion.update(opciones)
+
+    try:
+        return Config(**configuracion)
+    except TypeError:
+        # Las versiones de botocore anteriores a tcp_keepalive rechazan la opción
+        configuracion.pop('tcp_keepalive', None)
+        return Config(**configuracion)
+
+def crear_cliente(servicio, **opciones):
+    """Crea un cliente nuevo con la configuración ajustada (sin memoizar)"""
+    import boto3
+    return boto3.client(servicio, config=configuracion_cliente(**opciones))
+
+def obtener_cliente(servicio):
+    """Devuelve el cliente de bajo nivel del servicio, creándolo una sola vez por contenedor"""
+    cliente = _clientes.get(servicio)
+    if cliente is not None:
+        return cliente
+
+    # La sesión por defecto de boto3 no es thread-safe al crear clientes
+    with _clientes_lock:
+        cliente = _clientes.get(servicio)
+        if cliente is None:
+            cliente = crear_cliente(servicio)
+            _clientes[servicio] = cliente
+
+    return cliente
+
+def obtener_ejecutor():
+    """Pool de hilos pequeño para solapar llamadas de E/S dentro de una invocación"""
+    pool = _ejecutor['pool']
+    if pool is None:
+        with _clientes_lock:
+            pool = _ejecutor['pool']
+            if pool is None:
+                pool = ThreadPoolExecutor(max_workers=HILOS_IO, thread_name_prefix='aws-io')
+                _ejecutor['pool'] = pool
+
+    return pool
+
+def serializar_valor(valor):
+    """Convierte un valor de Python al formato tipado de DynamoDB"""
+    if isinstance(valor, bool):
+        return {'BOOL': valor}
+    if valor is None:
+        return {'NULL': True}
+    if isinstance(valor, str):
+        return {'S': valor}
+    if isinstance(valor, (int, float, Decimal)):
+        return {'N': str(valor)}
+    if isinstance(valor, (bytes, bytearray)):
+        return {'B': bytes(valor)}
+    if isinstance(valor, dict):
+        return {'M': {clave: serializar_valor(v) for clave, v in valor.items()}}
+    if isinstance(valor, (set, frozenset)):
+        if all(isinstance(v, str) for v in valor):
+            return {'SS': sorted(valor)}
+        return {'NS': [str(v) for v in valor]}
+    if isinstance(valor, (list, tuple)):
+        return {'L': [serializar_valor(v) for v in valor]}
+    raise TypeError(f"Tipo no soportado por DynamoDB: {type(valor).__name__}")
+
+def deserializar_valor(valor):
+    """Convierte un valor tipado de DynamoDB a Python"""
+    tipo, dato = next(iter(valor.items()))
+    if tipo == 'S':
+        return dato
+    if tipo == 'N':
+        return Decimal(dato)
+    if tipo == 'BOOL':
+        return dato
+    if tipo == 'NULL':
+        return None
+    if tipo == 'L':
+        return [deserializar_valor(v) for v in dato]
+    if tipo == 'M':
+        return {clave: deserializar_valor(v) for clave, v in dato.items()}
+    if tipo == 'SS':
+        return set(dato)
+    if tipo == 'NS':
+        return {Decimal(v) for v in dato}
+    if tipo == 'B':
+        return dato
+    if tipo == 'BS':
+        return set(dato)
+    raise TypeError(f"Tipo de DynamoDB desconocido: {tipo}")
+
+def serializar_item(item):
+    return {clave: serializar_valor(valor) for clave, valor in item.items()}
+
+def deserializar_item(item):
+    return {clave: deserializar_valor(valor) for clave, valor in item.items()}
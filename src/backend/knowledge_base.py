@@ -0,0 +1,555 @@
+"""
+Acceso compartido a FAQKnowledgeBase para las Lambdas Orchestrator y Fulfillment.
+
+Cada contenedor mantiene una copia en memoria (snapshot) de toda la tabla,
+cargada con un scan paginado en el primer uso. Las consultas se resuelven
+contra ese snapshot sin llamar a DynamoDB.
+
+Los cambios se detectan con un item marcador (keyword `__version__`):
+    {'keyword': '__version__', 'version': N, 'desde': M, 'cambios': {keyword: version}}
+`cambios` registra la versión en la que se modificó cada keyword a partir de
+la versión `desde`. Al vencer el TTL se lee el marcador; si la versión avanzó,
+solo se releen con batch_get_item las keywords modificadas. Si el marcador no
+existe o el snapshot es anterior a `desde`, se recarga la tabla completa.
+Con un snapshot ya cargado, esa sincronización corre en el pool de E/S y el
+turno que la dispara sigue respondiendo con los datos vigentes.
+Quien escriba en la tabla debe llamar a `registrar_cambios`.
+
+Para topics mal escritos ("precioo", "ubicasion") `buscar_item(topic,
+difuso=True)` recurre a un índice de borrado simétrico (estilo SymSpell)
+sobre keywords y variaciones sin tildes: cada término se registra bajo las
+cadenas que resultan de borrarle hasta `FAQ_FUZZY_MAX_DISTANCE` caracteres,
+guardadas como hashes en un arreglo ordenado, y una consulta solo calcula la
+distancia de edición contra los términos que comparten alguno de sus
+borrados. El índice se construye en el pool de E/S con el primer topic que
+no coincide con nada; hasta que está listo solo se resuelven las
+coincidencias exactas y sin tildes. Las actualizaciones incrementales del
+snapshot recalculan solo los borrados de las keywords modificadas.
+"""
+
+import os
+import random
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+from aws_clients import deserializar_item, obtener_cliente, obtener_ejecutor, serializar_valor
+
+TABLA_FAQ = os.environ.get('FAQ_TABLE_NAME', 'FAQKnowledgeBase')
+KEYWORD_VERSION = os.environ.get('FAQ_VERSION_KEYWORD', '__version__')
+SNAPSHOT_TTL_SEGUNDOS = float(os.environ.get('FAQ_SNAPSHOT_TTL_SECONDS', '300'))
+MAX_CAMBIOS_REGISTRADOS = int(os.environ.get('FAQ_MAX_TRACKED_CHANGES', '500'))
+REFRESCO_EN_SEGUNDO_PLANO = os.environ.get('FAQ_SNAPSHOT_BACKGROUND_REFRESH', 'true').lower() == 'true'
+REINTENTO_CARGA_SEGUNDOS = float(os.environ.get('FAQ_SNAPSHOT_RETRY_SECONDS', '5'))
+DISTANCIA_DIFUSA_MAX = int(os.environ.get('FAQ_FUZZY_MAX_DISTANCE', '2'))
+TAMANO_LOTE_LECTURA = 100
+
+# Los términos más largos solo se comparan sin tildes: sus borrados crecen con el cuadrado del largo
+LARGO_MAX_DIFUSO = 24
+
+# Cada entrada del índice difuso es hash(borrado) << BITS_TERMINO | número de término
+BITS_TERMINO = 20
+MASCARA_TERMINO = (1 << BITS_TERMINO) - 1
+MASCARA_HASH = (1 << (63 - BITS_TERMINO)) - 1
+
+# Términos agregados o retirados desde la última construcción completa a partir de los cuales se reconstruye
+MIN_TERMINOS_RECONSTRUCCION = 1000
+
+_snapshot = {
+    'items': {},
+    'variaciones': {},
+    'difuso': None,
+    'version': None,
+    'verificado_en': None
+}
+
+# Sincronización en curso en el pool de E/S; su resultado se publica desde el hilo del handler
+_refresco = {'futuro': None}
+
+# Instante del último fallo de la primera carga, para no reintentarla en cada consulta
+_primera_carga = {'fallo_en': None}
+
+# Construcción del índice difuso en el pool de E/S y los items para los que se pidió
+_construccion = {'futuro': None, 'items': None}
+
+# Funciones a invocar cuando cambia el contenido del snapshot
+_suscriptores = []
+
+def al_actualizar(funcion):
+    """Registra una función que se llama cada vez que el snapshot cambia"""
+    _suscriptores.append(funcion)
+    return funcion
+
+def escanear_faq(**kwargs):
+    """Recorre todas las páginas del scan de FAQKnowledgeBase"""
+    cliente = obtener_cliente('dynamodb')
+    while True:
+        response = cliente.scan(TableName=TABLA_FAQ, **kwargs)
+        for item in response.get('Items', []):
+            yield deserializar_item(item)
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def leer_marcador():
+    """Lee el item marcador de versión (None si no existe)"""
+    response = obtener_cliente('dynamodb').get_item(
+        TableName=TABLA_FAQ,
+        Key={'keyword': {'S': KEYWORD_VERSION}},
+        ConsistentRead=True
+    )
+    item = response.get('Item')
+    return deserializar_item(item) if item else None
+
+def leer_items(keywords):
+    """Lee un conjunto de keywords con batch_get_item, reintentando las UnprocessedKeys"""
+    cliente = obtener_cliente('dynamodb')
+    keywords = list(keywords)
+    items = []
+
+    for inicio in range(0, len(keywords), TAMANO_LOTE_LECTURA):
+        lote = keywords[inicio:inicio + TAMANO_LOTE_LECTURA]
+        pendientes = {TABLA_FAQ: {'Keys': [{'keyword': {'S': k}} for k in lote]}}
+        intento = 0
+        while pendientes:
+            response = cliente.batch_get_item(RequestItems=pendientes)
+            items.extend(deserializar_item(item) for item in response.get('Responses', {}).get(TABLA_FAQ, []))
+            pendientes = response.get('UnprocessedKeys') or {}
+            if pendientes:
+                time.sleep(random.uniform(0, min(0.05 * 2 ** intento, 1.0)))
+                intento += 1
+
+    return items
+
+def indexar_variaciones(items):
+    """Construye el mapa variación -> keyword"""
+    variaciones = {}
+    for keyword, item in items.items():
+        for variacion in item.get('variaciones', []):
+            # Ante variaciones repetidas gana el primer item leído
+            variaciones.setdefault(str(variacion).lower().strip(), keyword)
+
+    return variaciones
+
+def normalizar_termino(texto):
+    """Minúsculas y sin tildes, para que 'ubicación' y 'ubicacion' sean el mismo término"""
+    descompuesto = unicodedata.normalize('NFD', str(texto).casefold().strip())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+def borrados(termino, distancia):
+    """Cadenas que resultan de borrar hasta `distancia` caracteres del término, agrupadas por cantidad de borrados"""
+    niveles = [{termino}]
+    for _ in range(distancia):
+        niveles.append({t[:i] + t[i + 1:] for t in niveles[-1] for i in range(len(t))})
+    return niveles
+
+def clave_borrado(borrado):
+    """Entrada del índice difuso para un borrado, con el número de término en cero"""
+    return (hash(borrado) & MASCARA_HASH) << BITS_TERMINO
+
+def terminos_item(keyword, item):
+    """Términos normalizados de un item: su keyword y sus variaciones, sin repetir"""
+    terminos = [normalizar_termino(keyword)]
+    terminos.extend(normalizar_termino(variacion) for variacion in item.get('variaciones', []))
+    return list(dict.fromkeys(terminos))
+
+def dueno(termino, keywords):
+    """Keyword que responde por un término: la que lo tiene como keyword o, si no, la primera leída"""
+    return next((keyword for keyword in keywords if normalizar_termino(keyword) == termino), keywords[0])
+
+def entradas_termino(termino, numero):
+    """Entradas del índice difuso de un término (ninguna si es demasiado largo)"""
+    if DISTANCIA_DIFUSA_MAX == 0 or len(termino) > LARGO_MAX_DIFUSO:
+        return []
+    return [clave_borrado(borrado) | numero for nivel in borrados(termino, DISTANCIA_DIFUSA_MAX) for borrado in nivel]
+
+def indexar_difuso(items):
+    """
+    Construye el índice difuso: término normalizado -> keywords que lo usan,
+    término -> keyword que responde y el arreglo ordenado de borrados
+    """
+    duenos = {}
+    for keyword, item in items.items():
+        for termino in terminos_item(keyword, item):
+            duenos.setdefault(termino, []).append(keyword)
+
+    lista = list(duenos)[:MASCARA_TERMINO + 1]
+    entradas = []
+    for numero, termino in enumerate(lista):
+        entradas.extend(entradas_termino(termino, numero))
+    entradas.sort()
+
+    return {
+        'duenos': duenos,
+        'terminos': {termino: dueno(termino, keywords) for termino, keywords in duenos.items()},
+        'lista': lista,
+        'numeros': {termino: numero for numero, termino in enumerate(lista)},
+        'borrados': array('q', entradas),
+        # Borrados de los términos agregados después de construir el arreglo: clave -> números de término
+        'agregados': {},
+        'construidos': len(lista)
+    }
+
+def actualizar_difuso(difuso, anteriores, items, keywords):
+    """
+    Índice difuso de `items` a partir del de `anteriores`, recalculando solo
+    los términos de las keywords modificadas. No modifica `difuso`, que puede
+    seguir en uso desde el hilo del handler.
+    """
+    modificadas = set(keywords)
+    duenos = dict(difuso['duenos'])
+    tocados = set()
+    for keyword in modificadas:
+        if keyword in anteriores:
+            for termino in terminos_item(keyword, anteriores[keyword]):
+                duenos[termino] = [k for k in duenos.get(termino, []) if k != keyword]
+                tocados.add(termino)
+    # En el mismo orden que los items, para que los empates se resuelvan igual que al construir completo
+    for keyword in items:
+        if keyword in modificadas:
+            for termino in terminos_item(keyword, items[keyword]):
+                duenos[termino] = duenos.get(termino, []) + [keyword]
+                tocados.add(termino)
+
+    terminos = dict(difuso['terminos'])
+    lista = list(difuso['lista'])
+    numeros = dict(difuso['numeros'])
+    agregados = dict(difuso['agregados'])
+    for termino in tocados:
+        if duenos[termino]:
+            terminos[termino] = dueno(termino, duenos[termino])
+            if termino not in numeros and len(lista) <= MASCARA_TERMINO:
+                numeros[termino] = len(lista)
+                for entrada in entradas_termino(termino, len(lista)):
+                    clave = entrada & ~MASCARA_TERMINO
+                    agregados[clave] = agregados.get(clave, ()) + (len(lista),)
+                lista.append(termino)
+        else:
+            del duenos[termino]
+            del terminos[termino]
+            # El número queda libre en la lista y sus entradas se ignoran al buscar
+            numero = numeros.pop(termino, None)
+            if numero is not None:
+                lista[numero] = None
+
+    # Con muchos agregados o retirados conviene volver a ordenar un único arreglo
+    construidos = difuso['construidos']
+    cambios = (len(lista) - construidos) + (len(lista) - len(numeros))
+    if cambios > max(MIN_TERMINOS_RECONSTRUCCION, construidos // 4):
+        return indexar_difuso(items)
+
+    return {
+        'duenos': duenos,
+        'terminos': terminos,
+        'lista': lista,
+        'numeros': numeros,
+        'borrados': difuso['borrados'],
+        'agregados': agregados,
+        'construidos': construidos
+    }
+
+def distancia_edicion(a, b, maximo):
+    """Distancia de Damerau-Levenshtein (transposiciones adyacentes) acotada; maximo + 1 si la supera"""
+    if abs(len(a) - len(b)) > maximo:
+        return maximo + 1
+
+    # Solo importa el tramo que difiere: 'tema1234-var0' contra 'tema1243-var0' compara '34' con '43'
+    inicio = 0
+    while inicio < len(a) and inicio < len(b) and a[inicio] == b[inicio]:
+        inicio += 1
+    fin = 0
+    while fin < len(a) - inicio and fin < len(b) - inicio and a[-1 - fin] == b[-1 - fin]:
+        fin += 1
+    a, b = a[inicio:len(a) - fin], b[inicio:len(b) - fin]
+    if not a or not b:
+        return min(len(a) + len(b), maximo + 1)
+    if maximo == 0:
+        return 1
+
+    # El primer carácter difiere: se sustituye, se borra, se inserta o se transpone con el siguiente
+    restante = maximo - 1
+    diferencia = len(a) - len(b)
+    distancia = maximo + 1
+    if abs(diferencia) <= restante:
+        distancia = 1 + distancia_edicion(a[1:], b[1:], restante)
+        if len(a) > 1 and len(b) > 1 and a[0] == b[1] and a[1] == b[0]:
+            distancia = min(distancia, 1 + distancia_edicion(a[2:], b[2:], restante))
+    if diferencia > -maximo and distancia > 1:
+        distancia = min(distancia, 1 + distancia_edicion(a[1:], b, restante))
+    if diferencia < maximo and distancia > 1:
+        distancia = min(distancia, 1 + distancia_edicion(a, b[1:], restante))
+    return min(distancia, maximo + 1)
+
+def distancia_permitida(termino):
+    """Los términos cortos toleran menos errores: 'sol' no debe resolverse como 'voz'"""
+    return min(DISTANCIA_DIFUSA_MAX, max(0, (len(termino) - 2) // 2))
+
+def buscar_difuso(difuso, topic):
+    """Keyword más cercana al topic dentro de la distancia permitida (None si no hay o es ambigua)"""
+    termino = normalizar_termino(topic)
+    keyword = difuso['terminos'].get(termino)
+    if keyword is not None:
+        return keyword
+
+    maximo = distancia_permitida(termino)
+    if maximo == 0 or len(termino) > LARGO_MAX_DIFUSO:
+        return None
+
+    indice, lista, agregados = difuso['borrados'], difuso['lista'], difuso['agregados']
+    mejor, mejores = maximo + 1, set()
+    vistos = set()
+    for cantidad, nivel in enumerate(borrados(termino, maximo)):
+        # Un término a distancia d comparte con el topic un borrado de a lo sumo d caracteres de cada lado
+        if cantidad > mejor:
+            break
+        for borrado in nivel:
+            clave = clave_borrado(borrado)
+            posicion = bisect_left(indice, clave)
+            numeros = []
+            while posicion < len(indice) and indice[posicion] >> BITS_TERMINO == clave >> BITS_TERMINO:
+                numeros.append(indice[posicion] & MASCARA_TERMINO)
+                posicion += 1
+            numeros.extend(agregados.get(clave, ()))
+
+            for numero in numeros:
+                candidato = lista[numero]
+                cota = min(mejor, maximo)
+                # None: término retirado desde la última construcción completa
+                if candidato is None or numero in vistos or len(candidato) - len(borrado) > mejor or abs(len(candidato) - len(termino)) > cota:
+                    continue
+                vistos.add(numero)
+
+                distancia = distancia_edicion(termino, candidato, cota)
+                if distancia > maximo:
+                    continue
+                if distancia < mejor:
+                    mejor, mejores = distancia, {difuso['terminos'][candidato]}
+                elif distancia == mejor:
+                    mejores.add(difuso['terminos'][candidato])
+
+    # Dos keywords a la misma distancia: mejor la respuesta por defecto que una equivocada
+    return next(iter(mejores)) if len(mejores) == 1 else None
+
+def indice_difuso():
+    """Índice difuso del snapshot vigente, o None mientras se construye en el pool de E/S"""
+    if _snapshot['difuso'] is None and _construccion['futuro'] is None:
+        _construccion['items'] = _snapshot['items']
+        _construccion['futuro'] = obtener_ejecutor().submit(indexar_difuso, _snapshot['items'])
+    return _snapshot['difuso']
+
+def cargar_snapshot(version):
+    """Lee la tabla completa y devuelve el contenido del nuevo snapshot"""
+    items = {}
+    for item in escanear_faq():
+        keyword = item.get('keyword')
+        if keyword and keyword != KEYWORD_VERSION:
+            items[keyword] = item
+
+    print(f"Snapshot FAQ cargado: {len(items)} items, versión {version}")
+    # El índice difuso se vuelve a construir con el próximo topic que lo necesite
+    return {
+        'items': items,
+        'variaciones': indexar_variaciones(items),
+        'difuso': None,
+        'version': version
+    }
+
+def aplicar_cambios(base, keywords, version, difuso=None):
+    """Relee solo las keywords modificadas; las que ya no existen se eliminan del snapshot"""
+    items = dict(base)
+    for keyword in keywords:
+        items.pop(keyword, None)
+    for item in leer_items(keywords):
+        items[item['keyword']] = item
+
+    print(f"Snapshot FAQ actualizado a la versión {version}: {len(keywords)} keywords releídas")
+    return {
+        'items': items,
+        'variaciones': indexar_variaciones(items),
+        'difuso': actualizar_difuso(difuso, base, items, keywords) if difuso is not None else None,
+        'version': version
+    }
+
+def calcular_actualizacion(items_locales, version_local, cargado, difuso=None):
+    """
+    Compara el snapshot con el item marcador y devuelve su nuevo contenido,
+    o None si no hubo cambios. No modifica el estado del módulo, así que puede
+    ejecutarse en el pool de E/S.
+    """
+    marcador = leer_marcador()
+
+    # Sin marcador no hay forma de saber qué cambió: se recarga completo
+    if marcador is None:
+        return cargar_snapshot(None)
+
+    version = marcador.get('version')
+    if cargado and version == version_local:
+        return None
+
+    cambios = marcador.get('cambios')
+    incremental = (
+        cargado and
+        version_local is not None and
+        cambios is not None and
+        marcador.get('desde', 0) <= version_local
+    )
+
+    if incremental:
+        return aplicar_cambios(items_locales, [k for k, v in cambios.items() if v > version_local], version, difuso)
+    return cargar_snapshot(version)
+
+def publicar(contenido):
+    """Reemplaza el contenido del snapshot y avisa a los suscriptores"""
+    _snapshot.update(contenido)
+    for funcion in _suscriptores:
+        funcion()
+
+def publicar_refresco_terminado():
+    """Publica el resultado de la sincronización en segundo plano, si ya terminó"""
+    futuro = _refresco['futuro']
+    if futuro is None or not futuro.done():
+        return
+
+    _refresco['futuro'] = None
+    try:
+        contenido = futuro.result()
+    except Exception as e:
+        print(f"Error actualizando snapshot FAQ: {e}")
+        return
+
+    if contenido:
+        publicar(contenido)
+
+def publicar_indice_terminado():
+    """Publica el índice difuso construido en segundo plano, si ya terminó"""
+    futuro = _construccion['futuro']
+    if futuro is None or not futuro.done():
+        return
+
+    items = _construccion['items']
+    _construccion['futuro'], _construccion['items'] = None, None
+    try:
+        difuso = futuro.result()
+    except Exception as e:
+        print(f"Error construyendo el índice difuso: {e}")
+        return
+
+    # Si el snapshot cambió mientras tanto el índice no le corresponde; se pide otro con el próximo topic
+    if items is _snapshot['items']:
+        publicar({'difuso': difuso})
+
+def obtener_snapshot():
+    """Devuelve el snapshot vigente, sincronizándolo si venció el TTL"""
+    publicar_refresco_terminado()
+    publicar_indice_terminado()
+
+    ahora = time.monotonic()
+    verificado_en = _snapshot['verificado_en']
+    if verificado_en is not None and ahora - verificado_en < SNAPSHOT_TTL_SEGUNDOS:
+        return _snapshot
+
+    # La primera carga falló hace poco (por ejemplo, sin permisos de lectura): se espera antes de reintentar
+    fallo_en = _primera_carga['fallo_en']
+    if verificado_en is None and fallo_en is not None and ahora - fallo_en < REINTENTO_CARGA_SEGUNDOS:
+        return _snapshot
+
+    _snapshot['verificado_en'] = ahora
+    argumentos = (_snapshot['items'], _snapshot['version'], verificado_en is not None, _snapshot['difuso'])
+
+    # Con un snapshot ya cargado se sigue sirviendo mientras se sincroniza en el pool de E/S
+    if verificado_en is not None and REFRESCO_EN_SEGUNDO_PLANO:
+        if _refresco['futuro'] is None:
+            _refresco['futuro'] = obtener_ejecutor().submit(calcular_actualizacion, *argumentos)
+        return _snapshot
+
+    try:
+        contenido = calcular_actualizacion(*argumentos)
+    except Exception as e:
+        # Se sigue sirviendo el snapshot anterior y se reintenta al vencer el TTL;
+        # si nunca se cargó no hay nada que servir y se reintenta tras REINTENTO_CARGA_SEGUNDOS
+        print(f"Error actualizando snapshot FAQ: {e}")
+        if verificado_en is None:
+            _snapshot['verificado_en'] = None
+            _primera_carga['fallo_en'] = ahora
+        contenido = None
+
+    if contenido:
+        publicar(contenido)
+
+    return _snapshot
+
+def buscar_item(topic, difuso=False):
+    """Busca un item por keyword exacto o por variación y, con `difuso`, por el término más cercano"""
+    snapshot = obtener_snapshot()
+    item = snapshot['items'].get(topic)
+    if item is None:
+        keyword = snapshot['variaciones'].get(topic)
+        if keyword is None and difuso:
+            # Mientras el índice se construye solo se resuelven las coincidencias exactas
+            indice = indice_difuso()
+            keyword = buscar_difuso(indice, topic) if indice is not None else None
+        if keyword:
+            item = snapshot['items'].get(keyword)
+
+    return item
+
+def obtener_respuesta(topic, idioma, difuso=False):
+    """Respuesta del topic en el idioma pedido, con español como respaldo (None si no existe)"""
+    item = buscar_item(topic, difuso)
+    if not item:
+        return None
+
+    return item.get(f'respuesta_{idioma}') or item.get('respuesta_es')
+
+def registrar_cambios(keywords, cliente=None):
+    """Incrementa la versión del marcador anotando en la misma escritura las keywords modificadas"""
+    cliente = cliente or obtener_cliente('dynamodb')
+    keywords = list(dict.fromkeys(keywords))
+    if not keywords:
+        return None
+
+    while True:
+        response = cliente.get_item(
+            TableName=TABLA_FAQ,
+            Key={'keyword': {'S': KEYWORD_VERSION}},
+            ConsistentRead=True
+        )
+        marcador = deserializar_item(response['Item']) if 'Item' in response else {}
+        actual = marcador.get('version')
+        nueva = (actual or 0) + 1
+        cambios = marcador.get('cambios')
+
+        nombres = {'#v': 'version'}
+        valores = {':nueva': serializar_valor(nueva)}
+        if cambios is None or len(keywords) > TAMANO_LOTE_LECTURA or len(cambios) + len(keywords) > MAX_CAMBIOS_REGISTRADOS:
+            # Registro nuevo o compactado: los snapshots anteriores a esta versión recargarán completo
+            expresion = 'SET #v = :nueva, cambios = :vacio, desde = :nueva'
+            valores[':vacio'] = {'M': {}}
+        else:
+            asignaciones = []
+            for i, keyword in enumerate(keywords):
+                nombres[f'#k{i}'] = keyword
+                asignaciones.append(f'cambios.#k{i} = :nueva')
+            expresion = 'SET #v = :nueva, ' + ', '.join(asignaciones)
+
+        if actual is None:
+            condicion = 'attribute_not_exists(#v)'
+        else:
+            condicion = '#v = :actual'
+            valores[':actual'] = serializar_valor(actual)
+
+        try:
+            cliente.update_item(
+                TableName=TABLA_FAQ,
+                Key={'keyword': {'S': KEYWORD_VERSION}},
+                UpdateExpression=expresion,
+                ConditionExpression=condicion,
+                ExpressionAttributeNames=nombres,
+                ExpressionAttributeValues=valores
+            )
+            return nueva
+        except cliente.exceptions.ConditionalCheckFailedException:
+            # Otro escritor avanzó la versión: se vuelve a leer el marcador
+            continue
@@ -3,21 +3,77 @@
 import argparse
 import os
 import json
+import time
 import zipfile
 import logging
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def create_lex_import_zip(input_csv_path, output_zip_path, bot_locale_id):
+COPY_BUFFER_SIZE = 1024 * 1024
+ZIP64_LIMIT = (1 << 31) - 1
+UTTERANCES_FILENAME = 'preprocessed_utterances.csv'
+
+def list_shards(input_path):
+    """
+    Lista los archivos de utterances a empaquetar: el CSV del preprocesamiento o
+    varios fragmentos (shards) en el mismo directorio.
+
+    Args:
+        input_path (str): Directorio de entrada (preprocesados).
+
+    Returns:
+        list: Rutas de los CSV, en orden alfabético.
+    """
+    shards = sorted(
+        os.path.join(input_path, name)
+        for name in os.listdir(input_path)
+        if name.endswith('.csv')
+    )
+    if not shards:
+        raise FileNotFoundError(f"No se encontraron archivos CSV de utterances en: {input_path}")
+
+    return shards
+
+def copy_shards(shards, destination):
+    """
+    Copia los fragmentos uno tras otro en `destination` por bloques, sin cargarlos
+    en memoria, asegurando un salto de línea entre fragmentos.
+
+    Args:
+        shards (list): Rutas de los CSV.
+        destination (file): Archivo abierto en modo binario (la entrada del ZIP).
+    """
+    for shard in shards:
+        last_byte = b'\n'
+        with open(shard, 'rb') as source:
+            while True:
+                block = source.read(COPY_BUFFER_SIZE)
+                if not block:
+                    break
+                destination.write(block)
+                last_byte = block[-1:]
+        if last_byte != b'\n':
+            destination.write(b'\n')
+
+def create_lex_import_zip(input_csv_paths, output_zip_path, bot_locale_id, compress_level=6):
     """
     Crea un archivo ZIP en el formato requerido por Amazon Lex V2 para la importación.
 
+    El manifiesto se escribe desde memoria y las utterances se copian por bloques
+    directamente dentro del ZIP, sin archivos intermedios en el directorio de trabajo.
+
     Args:
-        input_csv_path (str): Ruta al archivo CSV con las utterances preprocesadas.
+        input_csv_paths (list): Rutas a los CSV con las utterances preprocesadas (uno o varios fragmentos).
         output_zip_path (str): Ruta donde se guardará el archivo ZIP de salida.
         bot_locale_id (str): El ID del locale del bot (ej. 'es_ES').
+        compress_level (int): Nivel de compresión deflate (1-9); 0 guarda sin comprimir.
+
+    Returns:
+        dict: Tamaños y tiempo del empaquetado.
     """
+    if isinstance(input_csv_paths, str):
+        input_csv_paths = [input_csv_paths]
 
     intent_name = 'FallbackIntent'
 
@@ -35,23 +91,41 @@ def create_lex_import_zip(input_csv_path, output_zip_path, bot_locale_id):
     }
 
     manifest_filename = 'BotLocale.json'
-    with open(manifest_filename, 'w') as f:
-        json.dump(manifest, f, indent=4)
+    input_bytes = sum(os.path.getsize(path) for path in input_csv_paths)
+    if compress_level:
+        compression, compresslevel = zipfile.ZIP_DEFLATED, compress_level
+    else:
+        compression, compresslevel = zipfile.ZIP_STORED, None
 
     # Crear el archivo ZIP
     logging.info(f"Creando archivo ZIP en: {output_zip_path}")
-    with zipfile.ZipFile(output_zip_path, 'w') as zipf:
+    start = time.perf_counter()
+    with zipfile.ZipFile(output_zip_path, 'w', compression=compression, compresslevel=compresslevel) as zipf:
         # Añadir el manifiesto en la raíz del ZIP
-        zipf.write(manifest_filename, arcname=manifest_filename)
+        zipf.writestr(manifest_filename, json.dumps(manifest, indent=4))
 
-        # Añadir el archivo de utterances dentro de un directorio con el nombre del intent
-        utterances_arcname = os.path.join(intent_name, os.path.basename(input_csv_path))
-        zipf.write(input_csv_path, arcname=utterances_arcname)
-        logging.info(f"Añadiendo {input_csv_path} como {utterances_arcname} al ZIP.")
+        # Añadir las utterances (todos los fragmentos en un solo archivo) dentro de un directorio con el nombre del intent
+        utterances_arcname = os.path.join(intent_name, UTTERANCES_FILENAME)
+        with zipf.open(utterances_arcname, 'w', force_zip64=input_bytes > ZIP64_LIMIT) as destination:
+            copy_shards(input_csv_paths, destination)
+        logging.info(f"Añadiendo {len(input_csv_paths)} archivo(s) como {utterances_arcname} al ZIP.")
 
-    # Limpiar el archivo de manifiesto local
-    os.remove(manifest_filename)
-    logging.info("Archivo ZIP creado exitosamente.")
+    elapsed = time.perf_counter() - start
+    zip_bytes = os.path.getsize(output_zip_path)
+    report = {
+        'input_files': len(input_csv_paths),
+        'input_bytes': input_bytes,
+        'zip_bytes': zip_bytes,
+        'compression_ratio': round(zip_bytes / input_bytes, 3) if input_bytes else None,
+        'compress_level': compress_level,
+        'seconds': round(elapsed, 3),
+        'mb_per_second': round(input_bytes / (1024 * 1024) / elapsed, 1) if elapsed else None
+    }
+    logging.info(
+        f"Archivo ZIP creado exitosamente: {input_bytes / (1024 * 1024):.1f} MB -> {zip_bytes / (1024 * 1024):.1f} MB "
+        f"en {elapsed:.2f} s ({report['mb_per_second']} MB/s)."
+    )
+    return report
 
 def main():
     """
@@ -61,15 +135,17 @@ def main():
     parser.add_argument('--input-path', type=str, required=True, help='Ruta al directorio de datos de entrada (preprocesados).')
     parser.add_argument('--output-path', type=str, required=True, help='Ruta al directorio de salida para el archivo ZIP.')
     parser.add_argument('--bot-locale-id', type=str, required=True, help='El ID del locale del bot (ej. es_ES).')
+    parser.add_argument('--compress-level', type=int, default=6, choices=range(0, 10),
+                        help='Nivel de compresión deflate (1-9); 0 guarda las utterances sin comprimir.')
     args = parser.parse_args()
 
-    input_file = os.path.join(args.input_path, 'preprocessed_utterances.csv')
+    input_files = list_shards(args.input_path)
     output_zip = os.path.join(args.output_path, 'lex-import.zip')
 
-    if not os.path.exists(input_file):
-        raise FileNotFoundError(f"No se encontró el archivo de entrada esperado: {input_file}")
+    report = create_lex_import_zip(input_files, output_zip, args.bot_locale_id, args.compress_level)
 
-    create_lex_import_zip(input_file, output_zip, args.bot_locale_id)
+    with open(os.path.join(args.output_path, 'build_report.json'), 'w') as f:
+        json.dump(report, f, indent=4)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,348 @@
+# src/backend/lex-retraining-pipeline/export.py
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import time
+import uuid
+import boto3
+import logging
+from datetime import datetime, timedelta
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SHARD_PREFIX = 'chat-logs'
+LOG_ATTRIBUTES = ('inputText', 'detectedLanguage', 'intent', 'timestamp')
+DEFAULT_OVERLAP_SECONDS = 900
+
+def split_uri(uri):
+    """
+    Separa una URI de S3 en bucket y clave.
+
+    Args:
+        uri (str): URI con la forma s3://bucket/clave.
+
+    Returns:
+        tuple: (bucket, clave).
+    """
+    bucket, _, key = uri.replace('s3://', '', 1).partition('/')
+    return bucket, key
+
+def load_checkpoint(checkpoint_uri, s3_client=None):
+    """
+    Lee el checkpoint de la exportación anterior desde S3 o un archivo local.
+
+    Args:
+        checkpoint_uri (str): URI s3:// o ruta local del checkpoint.
+        s3_client (botocore.client.S3, optional): Cliente de S3 para URIs s3://.
+
+    Returns:
+        dict: El checkpoint, o un diccionario vacío si todavía no existe.
+    """
+    try:
+        if checkpoint_uri.startswith('s3://'):
+            bucket, key = split_uri(checkpoint_uri)
+            body = s3_client.get_object(Bucket=bucket, Key=key)['Body'].read()
+            return json.loads(body)
+        with open(checkpoint_uri) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+            return {}
+        raise
+
+def save_checkpoint(checkpoint_uri, checkpoint, s3_client=None):
+    """
+    Guarda el checkpoint en S3 o en un archivo local.
+
+    Args:
+        checkpoint_uri (str): URI s3:// o ruta local del checkpoint.
+        checkpoint (dict): Contenido a guardar.
+        s3_client (botocore.client.S3, optional): Cliente de S3 para URIs s3://.
+    """
+    body = json.dumps(checkpoint, indent=4)
+    if checkpoint_uri.startswith('s3://'):
+        bucket, key = split_uri(checkpoint_uri)
+        s3_client.put_object(Bucket=bucket, Key=key, Body=body.encode('utf-8'))
+    else:
+        with open(checkpoint_uri, 'w') as f:
+            f.write(body)
+
+def rewind_timestamp(timestamp, seconds):
+    """
+    Retrocede un timestamp ISO 8601 la cantidad de segundos indicada.
+
+    Args:
+        timestamp (str): Timestamp en el formato que registra la Lambda Fulfillment.
+        seconds (float): Segundos a retroceder.
+
+    Returns:
+        str: El timestamp resultante, en el mismo formato.
+    """
+    return (datetime.fromisoformat(timestamp) - timedelta(seconds=seconds)).isoformat()
+
+def build_scan_filter(since=None, until=None, intents=None, languages=None):
+    """
+    Arma la FilterExpression del scan. El filtro no reduce la capacidad
+    consumida, pero evita transferir los items descartados.
+
+    Args:
+        since (str, optional): Solo items con timestamp estrictamente posterior (ISO 8601).
+        until (str, optional): Solo items con timestamp anterior o igual (ISO 8601).
+        intents (list, optional): Nombres de intent a exportar.
+        languages (list, optional): Idiomas detectados a exportar.
+
+    Returns:
+        dict: Argumentos de scan (ProjectionExpression, FilterExpression y sus valores).
+    """
+    names = {f'#{attribute}': attribute for attribute in LOG_ATTRIBUTES}
+    values = {}
+    conditions = []
+
+    if since:
+        conditions.append('#timestamp > :since')
+        values[':since'] = {'S': since}
+    if until:
+        conditions.append('#timestamp <= :until')
+        values[':until'] = {'S': until}
+    for attribute, allowed in (('intent', intents), ('detectedLanguage', languages)):
+        if allowed:
+            placeholders = [f':{attribute}{i}' for i in range(len(allowed))]
+            conditions.append(f"#{attribute} IN ({', '.join(placeholders)})")
+            values.update({placeholder: {'S': value} for placeholder, value in zip(placeholders, allowed)})
+
+    scan_arguments = {
+        'ProjectionExpression': ', '.join(names),
+        'ExpressionAttributeNames': names,
+        'ReturnConsumedCapacity': 'TOTAL'
+    }
+    if conditions:
+        scan_arguments['FilterExpression'] = ' AND '.join(conditions)
+        scan_arguments['ExpressionAttributeValues'] = values
+
+    return scan_arguments
+
+def write_shard(rows, destination, compress_level, s3_client=None):
+    """
+    Escribe un fragmento CSV comprimido con gzip, sin encabezado, en S3 o en disco.
+
+    Args:
+        rows (list): Filas (utterance, idioma).
+        destination (str): URI s3:// o ruta local del fragmento.
+        compress_level (int): Nivel de compresión gzip (1-9).
+        s3_client (botocore.client.S3, optional): Cliente de S3 para destinos s3://.
+
+    Returns:
+        int: Tamaño comprimido en bytes.
+    """
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=compress_level, mtime=0) as gz:
+        with io.TextIOWrapper(gz, encoding='utf-8', newline='') as text:
+            csv.writer(text).writerows(rows)
+    data = buffer.getvalue()
+
+    if destination.startswith('s3://'):
+        bucket, key = split_uri(destination)
+        s3_client.put_object(Bucket=bucket, Key=key, Body=data)
+    else:
+        os.makedirs(os.path.dirname(destination) or '.', exist_ok=True)
+        with open(destination, 'wb') as f:
+            f.write(data)
+
+    logging.info(f"Fragmento publicado: {destination} ({len(rows)} filas, {len(data)} bytes)")
+    return len(data)
+
+def export_segment(dynamodb_client, s3_client, table_name, segment, total_segments, scan_arguments,
+                   shard_prefix, shard_rows, compress_level):
+    """
+    Recorre un segmento del scan paralelo y publica sus utterances en fragmentos propios.
+
+    Args:
+        dynamodb_client (botocore.client.DynamoDB): Cliente de DynamoDB (compartido entre hilos).
+        s3_client (botocore.client.S3): Cliente de S3 (compartido entre hilos).
+        table_name (str): Tabla de logs de sesión.
+        segment (int): Segmento de este hilo.
+        total_segments (int): Cantidad total de segmentos.
+        scan_arguments (dict): Proyección y filtro de `build_scan_filter`.
+        shard_prefix (str): URI o ruta de los fragmentos del segmento, sin el número ni la extensión.
+        shard_rows (int): Filas máximas por fragmento.
+        compress_level (int): Nivel de compresión gzip.
+
+    Returns:
+        dict: Contadores del segmento (items leídos, exportados, fragmentos, watermark y capacidad consumida).
+    """
+    kwargs = dict(scan_arguments, TableName=table_name, Segment=segment, TotalSegments=total_segments)
+    stats = {'scanned': 0, 'exported': 0, 'capacity_units': 0.0, 'watermark': None, 'shards': []}
+    rows = []
+
+    def flush():
+        destination = f"{shard_prefix}-{len(stats['shards']):05d}.csv.gz"
+        write_shard(rows, destination, compress_level, s3_client)
+        stats['shards'].append(destination)
+        rows.clear()
+
+    try:
+        while True:
+            response = dynamodb_client.scan(**kwargs)
+            stats['scanned'] += response.get('ScannedCount', 0)
+            stats['capacity_units'] += response.get('ConsumedCapacity', {}).get('CapacityUnits', 0.0)
+
+            for item in response.get('Items', []):
+                timestamp = item.get('timestamp', {}).get('S')
+                if timestamp and (stats['watermark'] is None or timestamp > stats['watermark']):
+                    stats['watermark'] = timestamp
+                utterance = item.get('inputText', {}).get('S', '').strip()
+                if not utterance:
+                    continue
+
+                rows.append((utterance, item.get('detectedLanguage', {}).get('S', '')))
+                stats['exported'] += 1
+                if len(rows) >= shard_rows:
+                    flush()
+
+            if 'LastEvaluatedKey' not in response:
+                break
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+        if rows:
+            flush()
+    except Exception as e:
+        logging.error(f"Error en el segmento {segment}: {e}")
+        raise
+
+    return stats
+
+def export_logs(table_name, output_uri, aws_region=None, segments=8, workers=None, since=None, until=None,
+                intents=None, languages=None, shard_rows=100000, compress_level=6, overlap_seconds=0):
+    """
+    Exporta las utterances de la tabla de logs con un scan paralelo por segmentos.
+
+    Args:
+        table_name (str): Tabla de logs de sesión (ChatSessionLogs).
+        output_uri (str): Prefijo s3:// o directorio local donde se escriben los fragmentos.
+        aws_region (str, optional): Región de AWS.
+        segments (int): Segmentos del scan; cada uno escribe sus propios fragmentos.
+        workers (int, optional): Hilos que recorren los segmentos (por defecto, uno por segmento).
+        since (str, optional): Solo items con timestamp posterior.
+        until (str, optional): Solo items con timestamp anterior o igual.
+        intents (list, optional): Intents a exportar.
+        languages (list, optional): Idiomas a exportar.
+        shard_rows (int): Filas máximas por fragmento.
+        compress_level (int): Nivel de compresión gzip (1-9).
+        overlap_seconds (float): Segundos antes de `since` que se vuelven a leer, para no perder los items
+            escritos tarde con un timestamp anterior al watermark. Las filas repetidas las descarta el
+            dedup del preprocesamiento.
+
+    Returns:
+        dict: Métricas de la exportación, con el watermark y los fragmentos escritos.
+    """
+    workers = workers or segments
+    config = Config(max_pool_connections=max(10, workers), retries={'max_attempts': 10, 'mode': 'adaptive'})
+    dynamodb_client = boto3.client('dynamodb', region_name=aws_region, config=config)
+    s3_client = boto3.client('s3', region_name=aws_region, config=config)
+
+    scan_since = rewind_timestamp(since, overlap_seconds) if since and overlap_seconds else since
+    scan_arguments = build_scan_filter(scan_since, until, intents, languages)
+    run_id = time.strftime('%Y%m%dT%H%M%S') + '-' + uuid.uuid4().hex[:6]
+    output_uri = output_uri.rstrip('/')
+
+    start = time.perf_counter()
+    logging.info(f"Exportando {table_name} en {segments} segmentos con {workers} hilos (desde: {scan_since or 'el inicio'})")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(export_segment, dynamodb_client, s3_client, table_name, segment, segments, scan_arguments,
+                            f'{output_uri}/{SHARD_PREFIX}-{run_id}-s{segment:03d}', shard_rows, compress_level)
+            for segment in range(segments)
+        ]
+        results = [future.result() for future in futures]
+
+    # Con la ventana de solapamiento el watermark nunca retrocede respecto de `since`
+    watermarks = [result['watermark'] for result in results if result['watermark']] + ([since] if since else [])
+    elapsed = time.perf_counter() - start
+
+    return {
+        'table': table_name,
+        'run_id': run_id,
+        'since': since,
+        'scan_since': scan_since,
+        'watermark': max(watermarks) if watermarks else None,
+        'items_scanned': sum(result['scanned'] for result in results),
+        'rows_exported': sum(result['exported'] for result in results),
+        'capacity_units': round(sum(result['capacity_units'] for result in results), 1),
+        'shards': [shard for result in results for shard in result['shards']],
+        'seconds': round(elapsed, 1),
+        'rows_per_second': round(sum(result['exported'] for result in results) / elapsed) if elapsed else 0
+    }
+
+def main():
+    """
+    Función principal de la exportación.
+
+    Lee ChatSessionLogs con un scan paralelo por segmentos, filtra por ventana
+    de tiempo, intent e idioma, y escribe las utterances como CSV comprimidos
+    (utterance, idioma) en el formato de entrada de `preprocess.py`
+    (`--language-column 1`). Con `--checkpoint-uri` cada ejecución exporta
+    los items posteriores al último timestamp exportado, releyendo los
+    `--overlap-seconds` anteriores para recuperar los escritos tarde.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--table-name', type=str, default='ChatSessionLogs', help='Tabla de logs de sesión.')
+    parser.add_argument('--output-uri', type=str, required=True, help='Prefijo s3:// o directorio local de los fragmentos.')
+    parser.add_argument('--aws-region', type=str, default=None, help='Región de AWS.')
+    parser.add_argument('--segments', type=int, default=8, help='Segmentos del scan paralelo.')
+    parser.add_argument('--workers', type=int, default=None, help='Hilos que recorren los segmentos (por defecto, uno por segmento).')
+    parser.add_argument('--since', type=str, default=None, help='Solo items con timestamp posterior (ISO 8601); tiene prioridad sobre el checkpoint.')
+    parser.add_argument('--until', type=str, default=None, help='Solo items con timestamp anterior o igual (ISO 8601).')
+    parser.add_argument('--intents', type=str, default=None, help='Intents a exportar separados por comas (ej. FallbackIntent).')
+    parser.add_argument('--languages', type=str, default=None, help='Idiomas a exportar separados por comas (ej. es,en,pt).')
+    parser.add_argument('--shard-rows', type=int, default=100000, help='Filas máximas por fragmento.')
+    parser.add_argument('--compress-level', type=int, default=6, choices=range(1, 10), help='Nivel de compresión gzip.')
+    parser.add_argument('--checkpoint-uri', type=str, default=None, help='URI s3:// o ruta local del checkpoint de exportaciones anteriores.')
+    parser.add_argument('--overlap-seconds', type=float, default=DEFAULT_OVERLAP_SECONDS,
+                        help='Segundos antes del watermark del checkpoint que se vuelven a leer (0 no relee).')
+    args = parser.parse_args()
+
+    def split_list(value):
+        return [part.strip() for part in value.split(',') if part.strip()] if value else None
+
+    s3_client = boto3.client('s3', region_name=args.aws_region)
+    checkpoint = load_checkpoint(args.checkpoint_uri, s3_client) if args.checkpoint_uri else {}
+    since = args.since or checkpoint.get('watermark')
+    # Un --since explícito se respeta tal cual; la relectura solo aplica al watermark del checkpoint
+    overlap_seconds = 0 if args.since else args.overlap_seconds
+
+    metrics = export_logs(
+        args.table_name, args.output_uri, args.aws_region, args.segments, args.workers, since, args.until,
+        split_list(args.intents), split_list(args.languages), args.shard_rows, args.compress_level, overlap_seconds
+    )
+
+    if not metrics['shards']:
+        # El paso de preprocesamiento necesita al menos un archivo en su prefijo de entrada
+        destination = f"{args.output_uri.rstrip('/')}/{SHARD_PREFIX}-{metrics['run_id']}-empty.csv.gz"
+        write_shard([], destination, args.compress_level, s3_client)
+        metrics['shards'] = [destination]
+
+    logging.info("EXPORT_METRICS " + json.dumps({key: value for key, value in metrics.items() if key != 'shards'}))
+
+    # El checkpoint avanza solo después de publicar todos los fragmentos
+    if args.checkpoint_uri:
+        checkpoint = {
+            'table': args.table_name,
+            'watermark': metrics['watermark'],
+            'last_run_id': metrics['run_id'],
+            'rows_exported': checkpoint.get('rows_exported', 0) + metrics['rows_exported']
+        }
+        save_checkpoint(args.checkpoint_uri, checkpoint, s3_client)
+        logging.info(f"Checkpoint actualizado: watermark {metrics['watermark']}")
+
+if __name__ == '__main__':
+    main()
@@ -1,30 +1,94 @@
 # src/backend/lex-retraining-pipeline/import.py
 
 import argparse
+import json
 import os
+import random
 import boto3
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def start_lex_import(bot_id, bot_locale_id, aws_region, s3_uri):
+ZIP_FILENAME = 'lex-import.zip'
+BUILD_SUCCESS_STATUSES = ('Built', 'ReadyExpressTesting')
+BUILD_FAILURE_STATUSES = ('Failed',)
+# Justo después de build_bot_locale el locale puede seguir en NotBuilt antes de pasar a Building
+BUILD_PROGRESS_STATUSES = ('Building',)
+BUILD_FAILURE_AFTER_PROGRESS_STATUSES = ('NotBuilt',)
+
+def wait_for_status(describe, status_key, success_statuses, failure_statuses, deadline,
+                    initial_delay=5, max_delay=60, label='operación', progress_statuses=(),
+                    failure_after_progress_statuses=()):
     """
-    Inicia un trabajo de importación en Amazon Lex V2 y espera su finalización.
+    Consulta el estado de una operación de Lex con backoff exponencial y jitter
+    hasta que termine o venza el plazo.
+
+    Args:
+        describe (callable): Función sin argumentos que devuelve la respuesta de describe_*.
+        status_key (str): Clave del estado en la respuesta (ej. 'importStatus').
+        success_statuses (tuple): Estados que indican éxito.
+        failure_statuses (tuple): Estados que indican fallo.
+        deadline (float): Instante límite según time.monotonic().
+        initial_delay (float): Espera inicial entre consultas, en segundos.
+        max_delay (float): Espera máxima entre consultas, en segundos.
+        label (str): Nombre de la operación para los logs.
+        progress_statuses (tuple): Estados que indican que la operación ya empezó.
+        failure_after_progress_statuses (tuple): Estados que indican fallo solo después de haber visto
+            alguno de `progress_statuses`; antes se siguen consultando.
+
+    Returns:
+        dict: La última respuesta de describe_*.
+    """
+    delay = initial_delay
+    started = False
+    while True:
+        response = describe()
+        status = response[status_key]
+        logging.info(f"Estado actual de {label}: {status}")
+
+        if status in success_statuses:
+            return response
+        started = started or status in progress_statuses
+        if status in failure_statuses or (started and status in failure_after_progress_statuses):
+            logging.error(f"Falló {label}. Razones: {response.get('failureReasons', 'No se proporcionaron razones.')}")
+            raise Exception(f"Fallo en {label}.")
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"{label} no terminó dentro del plazo (último estado: {status}).")
+
+        # Jitter completo: evita que varias esperas concurrentes consulten al mismo tiempo
+        time.sleep(min(random.uniform(0, delay), remaining))
+        delay = min(delay * 2, max_delay)
+
+def start_lex_import(bot_id, bot_locale_id, aws_region, s3_uri, deadline=None, build=True):
+    """
+    Inicia un trabajo de importación en Amazon Lex V2, espera su finalización y
+    reconstruye el locale para que las nuevas utterances entren en el modelo.
 
     Args:
         bot_id (str): ID del bot de Amazon Lex.
         bot_locale_id (str): ID del locale del bot.
         aws_region (str): Región de AWS.
         s3_uri (str): URI de S3 del archivo ZIP a importar.
+        deadline (float, optional): Instante límite según time.monotonic() para importación y build.
+        build (bool): Si se ejecuta build_bot_locale después de la importación.
+
+    Returns:
+        dict: Duración de cada fase en segundos.
     """
     lex_client = boto3.client('lexv2-models', region_name=aws_region)
+    deadline = deadline or time.monotonic() + 3600
 
     s3_bucket, s3_key = s3_uri.replace('s3://', '').split('/', 1)
+    durations = {}
 
     try:
         logging.info(f"Iniciando importación para el bot {bot_id} ({bot_locale_id}) desde {s3_uri}")
+        start = time.monotonic()
 
         response = lex_client.start_import(
             payloadS3Location={
@@ -45,40 +109,124 @@ def start_lex_import(bot_id, bot_locale_id, aws_region, s3_uri):
         logging.info(f"Importación iniciada con ID: {import_id}")
 
         # Esperar a que la importación se complete
-        while True:
-            import_status = lex_client.describe_import(importId=import_id)
-            status = import_status['importStatus']
-            logging.info(f"Estado actual de la importación: {status}")
-
-            if status == 'Completed':
-                logging.info("Importación completada exitosamente.")
-                break
-            elif status == 'Failed':
-                logging.error(f"La importación falló. Razones: {import_status.get('failureReasons', 'No se proporcionaron razones.')}")
-                raise Exception("Fallo en la importación de Lex.")
-
-            time.sleep(15) # Esperar 15 segundos antes de volver a consultar
+        wait_for_status(
+            lambda: lex_client.describe_import(importId=import_id),
+            'importStatus', ('Completed',), ('Failed',), deadline,
+            label=f'la importación de {bot_locale_id}'
+        )
+        durations['import_seconds'] = round(time.monotonic() - start, 1)
+        logging.info("Importación completada exitosamente.")
+
+        if build:
+            start = time.monotonic()
+            lex_client.build_bot_locale(botId=bot_id, botVersion='DRAFT', localeId=bot_locale_id)
+            logging.info(f"Build del locale {bot_locale_id} iniciado.")
+
+            wait_for_status(
+                lambda: lex_client.describe_bot_locale(botId=bot_id, botVersion='DRAFT', localeId=bot_locale_id),
+                'botLocaleStatus', BUILD_SUCCESS_STATUSES, BUILD_FAILURE_STATUSES, deadline,
+                initial_delay=10, label=f'el build de {bot_locale_id}',
+                progress_statuses=BUILD_PROGRESS_STATUSES,
+                failure_after_progress_statuses=BUILD_FAILURE_AFTER_PROGRESS_STATUSES
+            )
+            durations['build_seconds'] = round(time.monotonic() - start, 1)
+            logging.info(f"Build del locale {bot_locale_id} completado.")
 
     except Exception as e:
         logging.error(f"Ocurrió un error durante la importación a Lex: {e}")
         raise
 
+    return durations
+
+def import_locales(bot_id, zip_uris, aws_region, timeout_seconds, build=True):
+    """
+    Importa (y reconstruye) varios locales en paralelo y espera a todos.
+
+    Args:
+        bot_id (str): ID del bot de Amazon Lex.
+        zip_uris (dict): {locale: URI de S3 de su ZIP}.
+        aws_region (str): Región de AWS.
+        timeout_seconds (float): Plazo total, compartido por todos los locales.
+        build (bool): Si se ejecuta build_bot_locale después de cada importación.
+
+    Returns:
+        dict: {locale: duración de cada fase}.
+    """
+    deadline = time.monotonic() + timeout_seconds
+    start = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=len(zip_uris)) as executor:
+        futures = {
+            locale: executor.submit(start_lex_import, bot_id, locale, aws_region, uri, deadline, build)
+            for locale, uri in zip_uris.items()
+        }
+        # Se espera a todos antes de propagar un error, para no dejar importaciones sin seguimiento
+        errors = {}
+        durations = {}
+        for locale, future in futures.items():
+            try:
+                durations[locale] = future.result()
+            except Exception as e:
+                errors[locale] = e
+
+    logging.info("IMPORT_METRICS " + json.dumps({
+        'bot_id': bot_id,
+        'locales': durations,
+        'failed_locales': sorted(errors),
+        'total_seconds': round(time.monotonic() - start, 1)
+    }))
+
+    if errors:
+        raise Exception(f"Falló la importación de los locales: {', '.join(sorted(errors))}")
+
+    return durations
+
+def publish_fingerprint_store(local_path, store_uri, aws_region):
+    """
+    Publica el almacén de huellas candidato generado por el preprocesamiento.
+    Solo se llama tras una importación exitosa, para que una importación fallida
+    no marque sus utterances como ya importadas.
+
+    Args:
+        local_path (str): Ruta local del archivo de huellas candidato.
+        store_uri (str): URI de S3 del almacén del bot y locale.
+        aws_region (str): Región de AWS.
+    """
+    s3_bucket, s3_key = store_uri.replace('s3://', '').split('/', 1)
+    logging.info(f"Publicando almacén de huellas en {store_uri}")
+    boto3.client('s3', region_name=aws_region).upload_file(local_path, s3_bucket, s3_key)
+
 def main():
     """
     Función principal para ejecutar el script de importación.
     """
     parser = argparse.ArgumentParser()
     parser.add_argument('--bot-id', type=str, required=True, help='ID del bot de Amazon Lex.')
-    parser.add_argument('--bot-locale-id', type=str, required=True, help='ID del locale del bot.')
+    parser.add_argument('--bot-locale-id', type=str, required=True,
+                        help='ID del locale del bot; varios separados por comas se importan en paralelo.')
     parser.add_argument('--aws-region', type=str, required=True, help='Región de AWS.')
-    parser.add_argument('--input-path', type=str, required=True, help='Ruta al directorio de entrada que contiene el ZIP.')
+    parser.add_argument('--input-s3-uri', type=str, required=True,
+                        help='URI de S3 del directorio con el ZIP (con varios locales, un subdirectorio por locale).')
+    parser.add_argument('--timeout-seconds', type=float, default=3600, help='Plazo total para importaciones y builds.')
+    parser.add_argument('--skip-build', action='store_true', help='No ejecutar build_bot_locale después de importar.')
+    parser.add_argument('--fingerprint-path', type=str, default=None, help='Directorio con el almacén de huellas candidato (fingerprints.bin).')
+    parser.add_argument('--fingerprint-store-uri', type=str, default=None, help='URI de S3 del almacén de huellas del bot y locale.')
     args = parser.parse_args()
 
-    # El URI de S3 se pasa implícitamente a través del entorno de SageMaker.
-    # El archivo lex-import.zip está en el directorio de entrada.
-    zip_s3_uri = os.path.join(args.input_path, 'lex-import.zip')
+    locales = [locale.strip() for locale in args.bot_locale_id.split(',') if locale.strip()]
+    input_s3_uri = args.input_s3_uri.rstrip('/')
+    # Lex importa desde S3: el ZIP montado en el contenedor no sirve como origen
+    if len(locales) == 1:
+        zip_uris = {locales[0]: f'{input_s3_uri}/{ZIP_FILENAME}'}
+    else:
+        zip_uris = {locale: f'{input_s3_uri}/{locale}/{ZIP_FILENAME}' for locale in locales}
+
+    import_locales(args.bot_id, zip_uris, args.aws_region, args.timeout_seconds, build=not args.skip_build)
 
-    start_lex_import(args.bot_id, args.bot_locale_id, args.aws_region, zip_s3_uri)
+    if args.fingerprint_path and args.fingerprint_store_uri:
+        publish_fingerprint_store(
+            os.path.join(args.fingerprint_path, 'fingerprints.bin'), args.fingerprint_store_uri, args.aws_region
+        )
 
 if __name__ == '__main__':
     main()
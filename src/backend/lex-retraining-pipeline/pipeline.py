@@ -5,6 +5,11 @@ from sagemaker.processing import ScriptProcessor, ProcessingInput, ProcessingOut
 from sagemaker.workflow.steps import ProcessingStep
 from sagemaker.workflow.pipeline import Pipeline
 from sagemaker.workflow.parameters import ParameterString
+from sagemaker.workflow.properties import PropertyFile
+from sagemaker.workflow.conditions import ConditionGreaterThan
+from sagemaker.workflow.condition_step import ConditionStep
+from sagemaker.workflow.functions import JsonGet, Join
+from sagemaker.workflow.execution_variables import ExecutionVariables
 import boto3
 import logging
 
@@ -16,8 +21,14 @@ def create_pipeline(
     input_data_uri,
     output_data_uri,
     bot_id,
-    bot_locale_id,
-    aws_region
+    bot_locale_ids,
+    aws_region,
+    fingerprint_store_uri=None,
+    language_column=None,
+    import_timeout_seconds=3600,
+    log_table_name=None,
+    export_checkpoint_uri=None,
+    export_intents=None
 ):
     """
     Define y crea un pipeline de SageMaker para el reentrenamiento de un bot de Lex.
@@ -27,8 +38,20 @@ def create_pipeline(
         input_data_uri (str): URI de S3 del archivo CSV de entrada.
         output_data_uri (str): URI de S3 para los artefactos de salida.
         bot_id (str): ID del bot de Amazon Lex V2.
-        bot_locale_id (str): ID del locale del bot (ej. 'es_ES').
+        bot_locale_ids (list): IDs de los locales del bot (ej. ['es_ES', 'en_US', 'pt_BR']). Cada locale
+            se empaqueta e importa en una rama propia, en paralelo con las demás.
         aws_region (str): Región de AWS.
+        fingerprint_store_uri (str, optional): Prefijo de S3 de los almacenes de huellas. Si se indica,
+            cada ejecución importa solo las utterances que no se importaron antes en ese bot y locale.
+        language_column (int, optional): Columna del CSV con el idioma de cada utterance. Si no se
+            indica, el preprocesamiento detecta el idioma.
+        import_timeout_seconds (int): Plazo de cada rama para importar y reconstruir su locale.
+        log_table_name (str, optional): Tabla de logs de sesión (ChatSessionLogs). Si se indica, un
+            primer paso exporta sus utterances a `<input_data_uri>/<id de ejecución>/` y esa es la
+            entrada del preprocesamiento, con el idioma registrado por la Lambda.
+        export_checkpoint_uri (str, optional): URI de S3 del checkpoint de la exportación; con él
+            cada ejecución exporta solo los logs nuevos.
+        export_intents (list, optional): Intents a exportar (ej. ['FallbackIntent']); todos si no se indica.
 
     Returns:
         sagemaker.workflow.pipeline.Pipeline: El objeto de pipeline de SageMaker.
@@ -43,56 +66,132 @@ def create_pipeline(
         role=sagemaker_role_arn
     )
 
-    # 2. Definir el paso de preprocesamiento
+    if isinstance(bot_locale_ids, str):
+        bot_locale_ids = [bot_locale_ids]
+
+    # Almacén de huellas de las utterances ya importadas, uno por bot y locale
+    store_prefix = None
+    if fingerprint_store_uri:
+        store_prefix = f"{fingerprint_store_uri.rstrip('/')}/{bot_id}"
+
+    # 2. Opcionalmente, exportar los logs de sesión como entrada del preprocesamiento
+    export_step = None
+    preprocess_input_uri = input_data_uri
+    if log_table_name:
+        preprocess_input_uri = Join(on='/', values=[input_data_uri.rstrip('/'), ExecutionVariables.PIPELINE_EXECUTION_ID])
+        export_arguments = [
+            '--table-name', log_table_name,
+            '--output-uri', preprocess_input_uri,
+            '--aws-region', aws_region
+        ]
+        if export_checkpoint_uri:
+            export_arguments += ['--checkpoint-uri', export_checkpoint_uri]
+        if export_intents:
+            export_arguments += ['--intents', ','.join(export_intents)]
+
+        export_step = ProcessingStep(
+            name='ExportChatLogs',
+            processor=script_processor,
+            code='export.py',
+            job_arguments=export_arguments
+        )
+        # Los logs traen el idioma detectado en la segunda columna
+        if language_column is None:
+            language_column = 1
+
+    preprocess_arguments = [
+        '--input-path', '/opt/ml/processing/input',
+        '--output-path', '/opt/ml/processing/output',
+        '--locales', ','.join(bot_locale_ids)
+    ]
+    if store_prefix:
+        preprocess_arguments += ['--fingerprint-store-prefix', store_prefix]
+    if language_column is not None:
+        preprocess_arguments += ['--language-column', str(language_column)]
+
+    # El reporte del preprocesamiento indica cuántas utterances nuevas hay por locale
+    preprocess_report = PropertyFile(
+        name='PreprocessReport',
+        output_name='preprocessed_data',
+        path='preprocess_report.json'
+    )
+
+    # 3. Definir el paso de preprocesamiento (separa las utterances en un directorio por locale)
     preprocess_step = ProcessingStep(
         name='PreprocessUtterances',
         processor=script_processor,
-        inputs=[ProcessingInput(source=input_data_uri, destination='/opt/ml/processing/input')],
+        inputs=[ProcessingInput(source=preprocess_input_uri, destination='/opt/ml/processing/input')],
         outputs=[ProcessingOutput(output_name='preprocessed_data', source='/opt/ml/processing/output')],
         code='preprocess.py',
-        job_arguments=[
-            '--input-path', '/opt/ml/processing/input',
-            '--output-path', '/opt/ml/processing/output'
-        ]
+        job_arguments=preprocess_arguments,
+        property_files=[preprocess_report],
+        depends_on=[export_step] if export_step else None
     )
 
-    # 3. Definir el paso de empaquetado (build)
-    build_step = ProcessingStep(
-        name='BuildLexImportPackage',
-        processor=script_processor,
-        inputs=[ProcessingInput(source=preprocess_step.properties.Outputs['preprocessed_data'].S3Output.S3Uri, destination='/opt/ml/processing/input')],
-        outputs=[ProcessingOutput(output_name='lex_zip_package', source='/opt/ml/processing/output')],
-        code='build.py',
-        job_arguments=[
-            '--input-path', '/opt/ml/processing/input',
-            '--output-path', '/opt/ml/processing/output',
-            '--bot-locale-id', bot_locale_id
-        ]
-    )
-
-    # 4. Definir el paso de importación a Lex
-    import_step = ProcessingStep(
-        name='ImportToLex',
-        processor=script_processor,
-        inputs=[ProcessingInput(source=build_step.properties.Outputs['lex_zip_package'].S3Output.S3Uri, destination='/opt/ml/processing/input')],
-        code='import.py',
-        job_arguments=[
+    # 4. Una rama de empaquetado e importación por locale; las ramas no dependen entre sí y corren en paralelo
+    locale_steps = []
+    for bot_locale_id in bot_locale_ids:
+        locale_data_uri = Join(on='/', values=[preprocess_step.properties.ProcessingOutputConfig.Outputs['preprocessed_data'].S3Output.S3Uri, bot_locale_id])
+
+        build_step = ProcessingStep(
+            name=f'BuildLexImportPackage-{bot_locale_id}',
+            processor=script_processor,
+            inputs=[ProcessingInput(source=locale_data_uri, destination='/opt/ml/processing/input')],
+            outputs=[ProcessingOutput(output_name='lex_zip_package', source='/opt/ml/processing/output')],
+            code='build.py',
+            job_arguments=[
+                '--input-path', '/opt/ml/processing/input',
+                '--output-path', '/opt/ml/processing/output',
+                '--bot-locale-id', bot_locale_id
+            ]
+        )
+
+        # Lex importa el ZIP directamente desde la salida del build en S3
+        import_inputs = []
+        import_arguments = [
             '--bot-id', bot_id,
             '--bot-locale-id', bot_locale_id,
             '--aws-region', aws_region,
-            '--input-path', '/opt/ml/processing/input'
+            '--input-s3-uri', build_step.properties.ProcessingOutputConfig.Outputs['lex_zip_package'].S3Output.S3Uri,
+            '--timeout-seconds', str(import_timeout_seconds)
         ]
-    )
-
-    # 5. Crear el pipeline con los tres pasos
+        if store_prefix:
+            # El almacén candidato se publica solo si la importación termina bien
+            import_inputs.append(ProcessingInput(source=locale_data_uri, destination='/opt/ml/processing/fingerprints'))
+            import_arguments += [
+                '--fingerprint-path', '/opt/ml/processing/fingerprints',
+                '--fingerprint-store-uri', f'{store_prefix}/{bot_locale_id}/fingerprints.bin'
+            ]
+
+        import_step = ProcessingStep(
+            name=f'ImportToLex-{bot_locale_id}',
+            processor=script_processor,
+            inputs=import_inputs,
+            code='import.py',
+            job_arguments=import_arguments
+        )
+
+        # Empaquetar e importar solo si el preprocesamiento dejó utterances nuevas para el locale
+        locale_steps.append(ConditionStep(
+            name=f'CheckNewUtterances-{bot_locale_id}',
+            conditions=[ConditionGreaterThan(
+                left=JsonGet(step_name=preprocess_step.name, property_file=preprocess_report,
+                             json_path=f'locales.{bot_locale_id}.rows_written'),
+                right=0
+            )],
+            if_steps=[build_step, import_step],
+            else_steps=[]
+        ))
+
+    # 5. Crear el pipeline
     pipeline = Pipeline(
         name='LexRetrainingPipeline',
         parameters=[
             ParameterString(name="InputDataUrl", default_value=input_data_uri),
             ParameterString(name="BotId", default_value=bot_id),
-            ParameterString(name="BotLocaleId", default_value=bot_locale_id),
+            ParameterString(name="BotLocaleIds", default_value=','.join(bot_locale_ids)),
         ],
-        steps=[preprocess_step, build_step, import_step]
+        steps=([export_step] if export_step else []) + [preprocess_step] + locale_steps
     )
 
     return pipeline
@@ -110,11 +209,19 @@ if __name__ == '__main__':
     # ID de tu bot de Lex V2.
     BOT_ID = 'MI_BOT_ID_AQUI'
 
-    # Locale del bot que quieres reentrenar (ej. 'es_ES').
-    BOT_LOCALE_ID = 'es_ES'
+    # Locales del bot que quieres reentrenar; cada uno se importa en una rama paralela.
+    BOT_LOCALE_IDS = ['es_ES', 'en_US', 'pt_BR']
 
     # Región de AWS.
     AWS_REGION = 'us-east-1'
+
+    # Prefijo de S3 donde se guardan las huellas de las utterances ya importadas (None para importar todo siempre).
+    FINGERPRINT_STORE_URI = 's3://mi-bucket-de-datos-aqui/lex-fingerprints'
+
+    # Tabla de logs de sesión a exportar como entrada (None para usar INPUT_DATA_URI tal cual).
+    # Con ella, INPUT_DATA_URI es el prefijo donde cada ejecución deja su exportación.
+    LOG_TABLE_NAME = None
+    EXPORT_CHECKPOINT_URI = 's3://mi-bucket-de-datos-aqui/chat-logs-export/checkpoint.json'
     # ----------------------------------------------
 
     logging.info("Creando la definición del pipeline...")
@@ -124,8 +231,11 @@ if __name__ == '__main__':
         input_data_uri=INPUT_DATA_URI,
         output_data_uri=None, # Ya no es necesario
         bot_id=BOT_ID,
-        bot_locale_id=BOT_LOCALE_ID,
-        aws_region=AWS_REGION
+        bot_locale_ids=BOT_LOCALE_IDS,
+        aws_region=AWS_REGION,
+        fingerprint_store_uri=FINGERPRINT_STORE_URI,
+        log_table_name=LOG_TABLE_NAME,
+        export_checkpoint_uri=EXPORT_CHECKPOINT_URI
     )
 
     logging.info("Definición del pipeline creada. Enviando a SageMaker...")
@@ -1,49 +1,521 @@
 # src/backend/lex-retraining-pipeline/preprocess.py
 
 import argparse
+import hashlib
+import json
 import os
+import re
+import resource
+import sys
+import tempfile
+import time
+import unicodedata
+import numpy as np
 import pandas as pd
 import logging
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+INPUT_EXTENSIONS = ('.csv', '.csv.gz')
+OUTPUT_FILENAME = 'preprocessed_utterances.csv'
+REPORT_FILENAME = 'preprocess_report.json'
+FINGERPRINTS_FILENAME = 'fingerprints.bin'
+NON_WORD = re.compile(r'[\W_]+')
+SHINGLE_SIZE = 3
+MERSENNE_PRIME = (1 << 61) - 1
+
+# Palabras funcionales frecuentes (sin tildes) para separar utterances sin idioma etiquetado
+LANGUAGE_WORDS = {
+    'es': frozenset(['el', 'la', 'los', 'las', 'de', 'del', 'que', 'y', 'en', 'un', 'una', 'por', 'para', 'con', 'es',
+                     'como', 'cual', 'cuanto', 'cuando', 'donde', 'hola', 'gracias', 'quiero', 'necesito', 'tienen',
+                     'puedo', 'mi', 'su', 'al', 'esta', 'hay', 'precio', 'horario', 'ubicacion', 'ayuda', 'buenos']),
+    'en': frozenset(['the', 'a', 'an', 'of', 'and', 'is', 'are', 'to', 'in', 'for', 'with', 'what', 'how', 'where',
+                     'when', 'hello', 'hi', 'thanks', 'thank', 'you', 'i', 'my', 'do', 'does', 'can', 'want', 'need',
+                     'your', 'price', 'hours', 'location', 'help', 'please']),
+    'pt': frozenset(['o', 'os', 'as', 'de', 'do', 'da', 'que', 'e', 'em', 'no', 'na', 'um', 'uma', 'por', 'para',
+                     'com', 'como', 'qual', 'quanto', 'quando', 'onde', 'ola', 'obrigado', 'obrigada', 'quero',
+                     'preciso', 'voces', 'posso', 'meu', 'minha', 'nao', 'tem', 'preco', 'horario', 'ajuda', 'bom'])
+}
+
+def list_input_files(input_path):
+    """
+    Lista los CSV (planos o comprimidos con gzip) del directorio de entrada.
+
+    Args:
+        input_path (str): Directorio de entrada en el contenedor.
+
+    Returns:
+        list: Rutas de los archivos, en orden alfabético para que la salida sea reproducible.
+    """
+    input_files = sorted(
+        os.path.join(input_path, name)
+        for name in os.listdir(input_path)
+        if name.lower().endswith(INPUT_EXTENSIONS)
+    )
+    if not input_files:
+        raise FileNotFoundError(f"No se encontraron archivos CSV en el directorio de entrada: {input_path}")
+
+    return input_files
+
+def iter_chunks(input_files, chunk_size, language_column=None):
+    """
+    Lee los archivos de entrada en bloques de como máximo `chunk_size` filas.
+
+    Args:
+        input_files (list): Rutas de los CSV. La compresión se infiere de la extensión.
+        chunk_size (int): Filas por bloque; acota la memoria sin importar el tamaño de la entrada.
+        language_column (int, optional): Índice de la columna con el idioma etiquetado de cada utterance.
+
+    Yields:
+        pandas.DataFrame: Bloque con la columna 'utterance' y, si se indicó, 'language'.
+    """
+    columns = {0: 'utterance'}
+    if language_column is not None:
+        columns[language_column] = 'language'
+
+    for input_file in input_files:
+        logging.info(f"Procesando archivo de entrada: {input_file}")
+        # Asumimos que no tiene encabezado y las utterances están en la primera columna.
+        try:
+            reader = pd.read_csv(
+                input_file,
+                header=None,
+                usecols=sorted(columns),
+                dtype=str,
+                keep_default_na=False,
+                compression='infer',
+                chunksize=chunk_size
+            )
+        except pd.errors.EmptyDataError:
+            # Un fragmento vacío (ej. una exportación sin items nuevos) no aporta filas
+            logging.info(f"Archivo vacío, se omite: {input_file}")
+            continue
+        for chunk in reader:
+            yield chunk.rename(columns=columns)
+
+def clean_chunk(chunk):
+    """
+    Normaliza y filtra un bloque: recorta espacios y elimina utterances vacías.
+
+    Args:
+        chunk (pandas.DataFrame): Bloque leído por `iter_chunks`.
+
+    Returns:
+        pandas.DataFrame: Bloque limpio.
+    """
+    chunk = chunk.dropna(subset=['utterance']).assign(utterance=lambda df: df['utterance'].str.strip())
+    return chunk[chunk['utterance'] != '']
+
+def normalization_key(text):
+    """
+    Clave con la que se comparan utterances: casefold, sin tildes, sin puntuación
+    y con los espacios colapsados ('¿Cuál es el PRECIO?' -> 'cual es el precio').
+
+    Args:
+        text (str): Utterance original.
+
+    Returns:
+        str: Clave normalizada (vacía si la utterance solo tenía puntuación).
+    """
+    text = unicodedata.normalize('NFKD', text.casefold())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(NON_WORD.sub(' ', text).split())
+
+def language_of(locale_id):
+    """Idioma de un locale de Lex ('es_ES' -> 'es'); acepta también 'es-ES' y 'es'."""
+    return locale_id.replace('-', '_').split('_')[0].lower()
+
+def detect_locale(key, locales):
+    """
+    Detector mínimo por palabras funcionales, para entradas sin idioma etiquetado.
+
+    Args:
+        key (str): Clave normalizada de la utterance.
+        locales (list): Locales pedidos; solo se elige entre ellos.
+
+    Returns:
+        str: El locale con más palabras reconocidas (el primero ante un empate).
+    """
+    tokens = key.split()
+    best_locale, best_score = locales[0], 0
+    for locale in locales:
+        words = LANGUAGE_WORDS.get(language_of(locale), frozenset())
+        score = sum(1 for token in tokens if token in words)
+        if score > best_score:
+            best_locale, best_score = locale, score
+
+    return best_locale
+
+def assign_locales(chunk, keys, locales):
+    """
+    Asigna un locale a cada fila: el etiquetado si la entrada trae columna de
+    idioma y la fila tiene etiqueta, el detectado si no. Con un único locale no
+    hay nada que decidir.
+
+    Args:
+        chunk (pandas.DataFrame): Bloque limpio.
+        keys (pandas.Series): Claves normalizadas de las filas.
+        locales (list): Locales pedidos.
+
+    Returns:
+        pandas.Series: Locale de cada fila (None si la etiqueta no corresponde a ningún locale pedido).
+    """
+    def detect(row_keys):
+        if len(locales) == 1:
+            return pd.Series(locales[0], index=row_keys.index, dtype=object)
+        return row_keys.map(lambda key: detect_locale(key, locales))
+
+    if 'language' in chunk:
+        # La etiqueta puede ser el locale completo ('es_ES', 'es-ES') o solo el idioma ('es')
+        by_label = {language_of(locale): locale for locale in locales}
+        by_label.update({locale.lower(): locale for locale in locales})
+        labels = chunk['language'].str.strip()
+        assigned = labels.map(
+            lambda label: by_label.get(label.replace('-', '_').lower()) or by_label.get(language_of(label))
+        )
+        # Las filas sin etiqueta usan el locale detectado
+        blank = labels == ''
+        if blank.any():
+            assigned[blank] = detect(keys[blank])
+        return assigned
+    return detect(keys)
+
+def key_hash(key):
+    """Hash estable de 64 bits de una clave normalizada (no depende de PYTHONHASHSEED)."""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def spill_to_partitions(chunks, partition_dir, partitions, locales, removed):
+    """
+    Primera pasada del dedup: limpia cada bloque, asigna un locale a cada fila y
+    la escribe en un archivo temporal según su locale y el hash de su clave, de
+    modo que dos duplicados exactos del mismo locale siempre caen en la misma
+    partición.
+
+    Args:
+        chunks (iterable): Bloques leídos por `iter_chunks`.
+        partition_dir (str): Directorio temporal para las particiones.
+        partitions (int): Cantidad de particiones por locale.
+        locales (list): Locales pedidos.
+        removed (dict): Contadores de filas eliminadas por regla; se actualizan 'empty' y 'unsupported_locale'.
+
+    Returns:
+        tuple: ({locale: rutas de sus particiones}, filas leídas).
+    """
+    paths = {
+        locale: [os.path.join(partition_dir, f'{locale}-part-{i:04d}.csv') for i in range(partitions)]
+        for locale in locales
+    }
+    handles = {
+        (locale, i): open(path, 'w', encoding='utf-8', newline='')
+        for locale in locales for i, path in enumerate(paths[locale])
+    }
+    rows_read = 0
+    try:
+        for chunk in chunks:
+            rows_read += len(chunk)
+            cleaned = clean_chunk(chunk)
+            keys = cleaned['utterance'].map(normalization_key)
+            # Las vacías se descartan antes de hashear: una columna con None pasaría a float64 y truncaría los hashes
+            nonempty = (keys != '').to_numpy(dtype=bool)
+            valid, keys = cleaned[nonempty], keys[nonempty]
+            removed['empty'] += len(chunk) - len(valid)
+            hashes = np.fromiter((key_hash(key) for key in keys), dtype=np.uint64, count=len(keys))
+            valid = valid.assign(locale=assign_locales(valid, keys, locales), hash=hashes)
+            assigned = valid.dropna(subset=['locale'])
+            removed['unsupported_locale'] += len(valid) - len(assigned)
+
+            for (locale, partition), rows in assigned.groupby([assigned['locale'], assigned['hash'] % partitions]):
+                rows[['hash', 'utterance']].to_csv(handles[(locale, int(partition))], index=False, header=False)
+    finally:
+        for handle in handles.values():
+            handle.close()
+
+    return paths, rows_read
+
+def iter_unique_rows(partition_paths, chunk_size, removed):
+    """
+    Segunda pasada del dedup: recorre cada partición conservando la primera
+    aparición de cada hash. La memoria queda acotada por los hashes únicos de
+    una sola partición.
+
+    Args:
+        partition_paths (list): Rutas devueltas por `spill_to_partitions`.
+        chunk_size (int): Filas leídas por bloque.
+        removed (dict): Contadores de filas eliminadas por regla; se actualiza 'exact_duplicate'.
+
+    Yields:
+        pandas.DataFrame: Bloque de filas únicas con columnas 'hash' y 'utterance'.
+    """
+    for path in partition_paths:
+        if os.path.getsize(path) == 0:
+            continue
+
+        seen = set()
+        reader = pd.read_csv(path, header=None, names=['hash', 'utterance'],
+                             dtype={'hash': 'uint64', 'utterance': str}, keep_default_na=False,
+                             chunksize=chunk_size)
+        for chunk in reader:
+            keep = []
+            for value in chunk['hash']:
+                keep.append(value not in seen)
+                seen.add(value)
+            unique = chunk[keep]
+            removed['exact_duplicate'] += len(chunk) - len(unique)
+            yield unique
+
+def create_minhash_params(num_perm, seed=1):
+    """
+    Coeficientes de las permutaciones (a * x + b) mod p usadas por MinHash.
+
+    Args:
+        num_perm (int): Cantidad de permutaciones (largo de la firma).
+        seed (int): Semilla, para que las firmas sean reproducibles entre ejecuciones.
+
+    Returns:
+        tuple: Arreglos numpy (a, b).
+    """
+    generator = np.random.RandomState(seed)
+    a = generator.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+    b = generator.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+    return a, b
+
+def minhash_signature(key, params):
+    """
+    Firma MinHash de los shingles de caracteres de una clave normalizada.
+
+    Args:
+        key (str): Clave normalizada.
+        params (tuple): Coeficientes devueltos por `create_minhash_params`.
+
+    Returns:
+        numpy.ndarray: Firma de num_perm valores de 32 bits.
+    """
+    a, b = params
+    padded = f' {key} '
+    shingles = {padded[i:i + SHINGLE_SIZE] for i in range(max(1, len(padded) - SHINGLE_SIZE + 1))}
+    values = np.array([key_hash(shingle) & 0xFFFFFFFF for shingle in shingles], dtype=np.uint64)
+    permuted = (np.outer(values, a) + b) % np.uint64(MERSENNE_PRIME)
+    return (permuted.min(axis=0) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+def is_near_duplicate(key, index, params, bands, threshold):
+    """
+    Consulta el índice LSH y, si la clave no tiene un vecino con similitud de
+    Jaccard estimada >= `threshold`, la agrega como representante.
+
+    Args:
+        key (str): Clave normalizada de la utterance.
+        index (dict): Índice LSH {'buckets': {...}, 'signatures': [...]}.
+        params (tuple): Coeficientes de MinHash.
+        bands (int): Bandas en las que se divide la firma.
+        threshold (float): Similitud mínima para considerar dos utterances casi duplicadas.
+
+    Returns:
+        bool: True si la utterance es casi duplicada de una ya conservada.
+    """
+    signature = minhash_signature(key, params)
+    rows_per_band = len(signature) // bands
+    band_keys = [(band, signature[band * rows_per_band:(band + 1) * rows_per_band].tobytes()) for band in range(bands)]
+
+    candidates = {index['buckets'][band_key] for band_key in band_keys if band_key in index['buckets']}
+    for candidate in candidates:
+        if np.mean(index['signatures'][candidate] == signature) >= threshold:
+            return True
+
+    position = len(index['signatures'])
+    index['signatures'].append(signature)
+    for band_key in band_keys:
+        index['buckets'].setdefault(band_key, position)
+    return False
+
+def load_fingerprints(store_uri):
+    """
+    Carga el almacén de huellas de las utterances ya importadas: un arreglo
+    ordenado de hashes de 64 bits (little-endian, compatible con array('Q')).
+
+    Args:
+        store_uri (str): URI s3:// o ruta local del archivo de huellas.
+
+    Returns:
+        numpy.ndarray: Hashes ordenados; vacío si el almacén todavía no existe.
+    """
+    if store_uri.startswith('s3://'):
+        import boto3
+
+        bucket, key = store_uri.replace('s3://', '').split('/', 1)
+        s3_client = boto3.client('s3')
+        try:
+            data = s3_client.get_object(Bucket=bucket, Key=key)['Body'].read()
+        except s3_client.exceptions.NoSuchKey:
+            logging.info(f"No existe un almacén de huellas en {store_uri}; se procesarán todas las utterances.")
+            data = b''
+    elif os.path.exists(store_uri):
+        with open(store_uri, 'rb') as f:
+            data = f.read()
+    else:
+        data = b''
+
+    fingerprints = np.frombuffer(data, dtype='<u8')
+    logging.info(f"Almacén de huellas cargado: {len(fingerprints)} utterances ya importadas.")
+    return fingerprints
+
+def in_store(hashes, fingerprints):
+    """
+    Indica qué hashes ya están en el almacén, con búsqueda binaria vectorizada.
+
+    Args:
+        hashes (numpy.ndarray): Hashes a consultar.
+        fingerprints (numpy.ndarray): Almacén ordenado.
+
+    Returns:
+        numpy.ndarray: Máscara booleana.
+    """
+    if not len(fingerprints):
+        return np.zeros(len(hashes), dtype=bool)
+
+    positions = np.searchsorted(fingerprints, hashes).clip(max=len(fingerprints) - 1)
+    return fingerprints[positions] == hashes
+
+def peak_rss_mb():
+    """Pico de memoria residente del proceso en MB (ru_maxrss está en KB en Linux y en bytes en macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def write_locale_output(locale, partition_paths, locale_path, args, removed):
+    """
+    Segunda pasada para un locale: dedup exacto, descarte de lo ya importado y
+    casi duplicados, escribiendo `preprocessed_utterances.csv` en su directorio.
+
+    Args:
+        locale (str): Locale de Lex.
+        partition_paths (list): Particiones del locale.
+        locale_path (str): Directorio de salida del locale.
+        args (argparse.Namespace): Argumentos del script.
+        removed (dict): Contadores de filas eliminadas por regla.
+
+    Returns:
+        int: Filas escritas.
+    """
+    os.makedirs(locale_path, exist_ok=True)
+    output_file_path = os.path.join(locale_path, OUTPUT_FILENAME)
+    logging.info(f"Guardando archivo preprocesado de {locale} en: {output_file_path}")
+
+    store_uri = f"{args.fingerprint_store_prefix.rstrip('/')}/{locale}/{FINGERPRINTS_FILENAME}" if args.fingerprint_store_prefix else None
+    fingerprints = load_fingerprints(store_uri) if store_uri else None
+    new_fingerprints = []
+    lsh_index = {'buckets': {}, 'signatures': []}
+    minhash_params = create_minhash_params(args.minhash_permutations) if args.near_duplicates else None
+    rows_written = 0
+
+    with open(output_file_path, 'w', encoding='utf-8', newline='') as output_file:
+        for unique in iter_unique_rows(partition_paths, args.chunk_size, removed):
+            if fingerprints is not None:
+                hashes = unique['hash'].to_numpy(dtype=np.uint64)
+                imported = in_store(hashes, fingerprints)
+                removed['already_imported'] += int(imported.sum())
+                unique = unique[~imported]
+                # Los casi duplicados también se registran: su representante sí se importa
+                new_fingerprints.append(hashes[~imported])
+
+            if args.near_duplicates:
+                keep = [
+                    not is_near_duplicate(normalization_key(utterance), lsh_index, minhash_params,
+                                          args.lsh_bands, args.near_dup_threshold)
+                    for utterance in unique['utterance']
+                ]
+                removed['near_duplicate'] += keep.count(False)
+                # Una lista vacía seleccionaría columnas en vez de filas: el bloque puede quedar vacío tras el dedup
+                unique = unique[np.array(keep, dtype=bool)]
+
+            unique[['utterance']].to_csv(output_file, index=False, header=False)
+            rows_written += len(unique)
+
+    if fingerprints is not None:
+        candidate = np.union1d(fingerprints, np.concatenate([fingerprints[:0]] + new_fingerprints))
+        candidate.astype('<u8').tofile(os.path.join(locale_path, FINGERPRINTS_FILENAME))
+        logging.info(f"Almacén de huellas candidato de {locale}: {len(candidate)} utterances.")
+
+    return rows_written
+
 def main():
     """
     Función principal para el preprocesamiento de utterances.
 
-    Lee un archivo CSV desde una ruta de entrada, elimina filas vacías y guarda
-    el resultado en una ruta de salida. Este script está diseñado para ser
-    ejecutado como un paso en un pipeline de SageMaker Processing.
+    Lee en bloques todos los CSV del directorio de entrada, separa las
+    utterances por locale (según una columna de idioma o un detector simple),
+    elimina filas vacías y duplicadas (y opcionalmente casi duplicadas) y
+    escribe el resultado de cada locale en `<output-path>/<locale>/`, junto con
+    un reporte de las filas eliminadas por cada regla. Con un almacén de huellas
+    solo se emiten las utterances que no se importaron antes, y se deja en la
+    salida el almacén candidato que el paso de importación publicará si termina
+    bien. La memoria se mantiene acotada sin importar el tamaño de la entrada.
+    Este script está diseñado para ser ejecutado como un paso en un pipeline de
+    SageMaker Processing.
     """
     parser = argparse.ArgumentParser()
     parser.add_argument('--input-path', type=str, required=True, help='Ruta al directorio de datos de entrada en el contenedor.')
     parser.add_argument('--output-path', type=str, required=True, help='Ruta al directorio de datos de salida en el contenedor.')
+    parser.add_argument('--locales', type=str, required=True, help='Locales del bot separados por comas (ej. es_ES,en_US,pt_BR).')
+    parser.add_argument('--language-column', type=int, default=None,
+                        help='Índice de la columna con el idioma de cada utterance; si no se indica, se detecta.')
+    parser.add_argument('--chunk-size', type=int, default=100000, help='Filas leídas por bloque.')
+    parser.add_argument('--dedup-partitions', type=int, default=16,
+                        help='Particiones del dedup exacto; la memoria usada es proporcional a los únicos de una partición.')
+    parser.add_argument('--temp-path', type=str, default=None, help='Directorio para las particiones temporales.')
+    parser.add_argument('--near-duplicates', action='store_true',
+                        help='Colapsa también utterances casi duplicadas con MinHash/LSH (la memoria crece con las filas únicas).')
+    parser.add_argument('--near-dup-threshold', type=float, default=0.8, help='Similitud de Jaccard mínima entre casi duplicados.')
+    parser.add_argument('--minhash-permutations', type=int, default=64, help='Largo de la firma MinHash.')
+    parser.add_argument('--lsh-bands', type=int, default=16, help='Bandas LSH (debe dividir a --minhash-permutations).')
+    parser.add_argument('--fingerprint-store-prefix', type=str, default=None,
+                        help='URI del bot bajo la que se guarda un almacén de huellas por locale; si se indica, solo se emiten las utterances nuevas.')
     args = parser.parse_args()
 
+    if args.minhash_permutations % args.lsh_bands:
+        parser.error('--lsh-bands debe dividir a --minhash-permutations')
+    locales = [locale.strip() for locale in args.locales.split(',') if locale.strip()]
+
     logging.info(f"Listando archivos en el directorio de entrada: {args.input_path}")
-    input_files = os.listdir(args.input_path)
-    if not input_files:
-        raise FileNotFoundError(f"No se encontraron archivos en el directorio de entrada: {args.input_path}")
+    input_files = list_input_files(args.input_path)
 
-    # Suponemos que solo hay un archivo CSV en el directorio de entrada
-    input_file_path = os.path.join(args.input_path, input_files[0])
-    logging.info(f"Procesando archivo de entrada: {input_file_path}")
+    start = time.perf_counter()
+    removed = {'empty': 0, 'unsupported_locale': 0, 'exact_duplicate': 0, 'already_imported': 0, 'near_duplicate': 0}
+    locale_report = {}
 
     try:
-        # Leer el CSV. Asumimos que no tiene encabezado y las utterances están en la primera columna.
-        df = pd.read_csv(input_file_path, header=None, names=['utterance'])
+        with tempfile.TemporaryDirectory(dir=args.temp_path) as partition_dir:
+            partition_paths, rows_read = spill_to_partitions(
+                iter_chunks(input_files, args.chunk_size, args.language_column),
+                partition_dir, args.dedup_partitions, locales, removed
+            )
 
-        # Eliminar filas donde la utterance esté vacía o sea solo espacios en blanco
-        df.dropna(subset=['utterance'], inplace=True)
-        df = df[df['utterance'].str.strip() != '']
+            for locale in locales:
+                rows_written = write_locale_output(
+                    locale, partition_paths[locale], os.path.join(args.output_path, locale), args, removed
+                )
+                locale_report[locale] = {'rows_written': rows_written}
 
-        # Guardar el resultado
-        output_file_path = os.path.join(args.output_path, 'preprocessed_utterances.csv')
-        logging.info(f"Guardando archivo preprocesado en: {output_file_path}")
-        df.to_csv(output_file_path, index=False, header=False)
+        rows_written = sum(report['rows_written'] for report in locale_report.values())
+        elapsed = time.perf_counter() - start
+        report = {
+            'input_files': len(input_files),
+            'rows_read': rows_read,
+            'rows_written': rows_written,
+            'locales': locale_report,
+            'removed': removed,
+            'rows_per_second': round(rows_read / elapsed) if elapsed else 0,
+            'peak_rss_mb': round(peak_rss_mb(), 1)
+        }
+        with open(os.path.join(args.output_path, REPORT_FILENAME), 'w') as f:
+            json.dump(report, f, indent=4)
 
-        logging.info("Preprocesamiento completado exitosamente.")
+        logging.info(
+            f"Preprocesamiento completado exitosamente: {len(input_files)} archivos, "
+            f"{rows_read} filas leídas, {rows_written} escritas, "
+            f"{report['rows_per_second']} filas/s, pico de memoria {report['peak_rss_mb']} MB."
+        )
+        logging.info(f"Filas escritas por locale: {locale_report}")
+        logging.info(f"Filas eliminadas por regla: {removed}")
 
     except Exception as e:
         logging.error(f"Error durante el preprocesamiento: {e}")
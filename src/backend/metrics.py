@@ -0,0 +1,113 @@
+"""
+Métricas de latencia por etapa para las Lambdas.
+
+`medir_invocacion` envuelve el handler y `etapa` (context manager) o `medir`
+(decorador) cronometran cada etapa. Al terminar la invocación se imprime una
+sola línea en CloudWatch Embedded Metric Format, de la que CloudWatch extrae
+las métricas sin llamadas a la API:
+
+    {"_aws": {...}, "Funcion": "Fulfillment", "ArranqueEnFrio": 1, "sentimiento_ms": 0.02, ...}
+
+Solo se cronometra y emite una fracción `METRICS_SAMPLE_RATE` de las
+invocaciones; el arranque en frío se emite siempre. Las etapas que corren en
+el pool de E/S suman en la invocación en curso, porque el handler espera su
+resultado antes de devolver.
+"""
+
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'SmartCloudBot')
+TASA_MUESTREO = float(os.environ.get('METRICS_SAMPLE_RATE', '1.0'))
+NIVEL_LOG = os.environ.get('LOG_LEVEL', 'INFO').upper()
+DEBUG = NIVEL_LOG == 'DEBUG'
+
+# Un contenedor atiende una invocación a la vez; el estado es de la invocación en curso
+_invocacion = {'muestreada': False, 'etapas': {}}
+_arranque = {'en_frio': True}
+
+# Parte fija de la línea EMF por (función, etapas medidas)
+_encabezados = {}
+
+@contextmanager
+def etapa(nombre):
+    """Acumula la duración del bloque en la etapa `nombre` de la invocación en curso"""
+    if not _invocacion['muestreada']:
+        yield
+        return
+
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        etapas = _invocacion['etapas']
+        etapas[nombre] = etapas.get(nombre, 0.0) + time.perf_counter() - inicio
+
+def medir(nombre):
+    """Decorador: cronometra cada llamada a la función como la etapa `nombre`"""
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with etapa(nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+def medir_invocacion(funcion_lambda):
+    """Decorador del handler: decide el muestreo, mide el total y emite la línea EMF"""
+    def decorador(handler):
+        @wraps(handler)
+        def envoltura(event, context):
+            en_frio = _arranque['en_frio']
+            _arranque['en_frio'] = False
+            _invocacion['muestreada'] = en_frio or random.random() < TASA_MUESTREO
+            _invocacion['etapas'] = {}
+
+            if DEBUG:
+                print("Event received:", json.dumps(event, ensure_ascii=False, default=str))
+
+            inicio = time.perf_counter()
+            try:
+                return handler(event, context)
+            finally:
+                if _invocacion['muestreada']:
+                    total = time.perf_counter() - inicio
+                    emitir(funcion_lambda, _invocacion['etapas'], total, en_frio, context)
+                _invocacion['muestreada'] = False
+        return envoltura
+    return decorador
+
+def encabezado(funcion_lambda, nombres):
+    """Parte fija de la línea EMF para un conjunto de etapas; se serializa una vez por contenedor"""
+    clave = (funcion_lambda, nombres)
+    plantilla = _encabezados.get(clave)
+    if plantilla is None:
+        metricas = [{'Name': nombre, 'Unit': 'Milliseconds'} for nombre in nombres]
+        metricas.append({'Name': 'ArranqueEnFrio', 'Unit': 'Count'})
+        declaracion = json.dumps([{'Namespace': NAMESPACE, 'Dimensions': [['Funcion']], 'Metrics': metricas}],
+                                 separators=(',', ':'))
+        plantilla = ('{"_aws":{"Timestamp":%d,"CloudWatchMetrics":' + declaracion.replace('%', '%%') + '},'
+                     '"Funcion":' + json.dumps(funcion_lambda).replace('%', '%%') + ','
+                     '"TasaMuestreo":' + json.dumps(TASA_MUESTREO) + ','
+                     '"ArranqueEnFrio":%d')
+        _encabezados[clave] = plantilla
+    return plantilla
+
+def emitir(funcion_lambda, etapas, total, en_frio, context=None):
+    """Imprime la línea EMF de una invocación (duraciones en milisegundos)"""
+    nombres = tuple(f'{nombre}_ms' for nombre in etapas) + ('total_ms',)
+    duraciones = list(etapas.values()) + [total]
+
+    partes = [encabezado(funcion_lambda, nombres) % (time.time() * 1000, 1 if en_frio else 0)]
+    partes.extend(f',"{nombre}":{duracion * 1000:.3f}' for nombre, duracion in zip(nombres, duraciones))
+
+    request_id = getattr(context, 'aws_request_id', None)
+    if request_id:
+        partes.append(',"requestId":' + json.dumps(request_id))
+
+    partes.append('}')
+    print(''.join(partes))
@@ -0,0 +1,124 @@
+"""
+Estado por sesión del Orchestrator: último idioma y tema con su confianza.
+
+El primer nivel es un LRU en memoria del contenedor, con vencimiento por
+inactividad. Si `SESSION_TABLE_NAME` está definido, un segundo nivel en
+DynamoDB permite que otro contenedor continúe la conversación:
+
+    {'sessionId': S, 'idioma': S, 'confianza_idioma': N, 'tema': S,
+     'confianza_tema': N, 'actualizado_en': N, 'expira_en': N}
+
+`expira_en` es el atributo TTL de la tabla. La confianza se guarda tal como
+se calculó y decae con una vida media al leerla, así que un turno que no
+cambia el estado no necesita escribir en la tabla.
+"""
+
+import os
+import time
+from collections import OrderedDict
+
+from aws_clients import deserializar_item, obtener_cliente, obtener_ejecutor, serializar_item
+
+SESION_MAX_ENTRADAS = int(os.environ.get('SESSION_CACHE_MAX_ENTRIES', '10000'))
+SESION_TTL_SEGUNDOS = float(os.environ.get('SESSION_TTL_SECONDS', '1800'))
+VIDA_MEDIA_SEGUNDOS = float(os.environ.get('SESSION_CONFIDENCE_HALF_LIFE_SECONDS', '300'))
+TABLA_SESIONES = os.environ.get('SESSION_TABLE_NAME', '')
+STATS_CADA = int(os.environ.get('SESSION_CACHE_STATS_EVERY', '1000'))
+
+# sessionId -> estado con la confianza sin decaer y el instante en que se calculó
+_sesiones = OrderedDict()
+_sesiones_stats = {'hits': 0, 'misses': 0, 'hits_tabla': 0, 'escrituras_tabla': 0}
+
+def decaer(confianza, desde, ahora):
+    """Confianza restante tras `ahora - desde` segundos"""
+    return float(confianza) * 0.5 ** (max(0.0, ahora - float(desde)) / VIDA_MEDIA_SEGUNDOS)
+
+def obtener(session_id):
+    """Estado vigente de la sesión con la confianza decaída al instante actual (None si no hay)"""
+    ahora = time.time()
+    estado = _sesiones.get(session_id)
+    if estado is not None:
+        _sesiones.move_to_end(session_id)
+        _sesiones_stats['hits'] += 1
+    else:
+        _sesiones_stats['misses'] += 1
+        if TABLA_SESIONES:
+            estado = leer_tabla(session_id)
+            if estado is not None:
+                _sesiones_stats['hits_tabla'] += 1
+                recordar(session_id, estado)
+
+    consultas = _sesiones_stats['hits'] + _sesiones_stats['misses']
+    if STATS_CADA > 0 and consultas % STATS_CADA == 0:
+        registrar_stats()
+
+    if estado is None or ahora - float(estado['actualizado_en']) > SESION_TTL_SEGUNDOS:
+        return None
+
+    return {
+        'idioma': estado['idioma'],
+        'confianza_idioma': decaer(estado['confianza_idioma'], estado['actualizado_en'], ahora),
+        'tema': estado.get('tema'),
+        'confianza_tema': decaer(estado.get('confianza_tema', 0), estado['actualizado_en'], ahora)
+    }
+
+def registrar_stats():
+    """Escribe en el log los contadores acumulados del LRU de sesiones y de la tabla"""
+    consultas = _sesiones_stats['hits'] + _sesiones_stats['misses']
+    hit_rate = _sesiones_stats['hits'] / consultas if consultas else 0.0
+    print(
+        f"Caché de sesiones: hits={_sesiones_stats['hits']} misses={_sesiones_stats['misses']} "
+        f"hits_tabla={_sesiones_stats['hits_tabla']} escrituras_tabla={_sesiones_stats['escrituras_tabla']} "
+        f"entradas={len(_sesiones)} hit_rate={hit_rate:.3f}"
+    )
+
+def guardar(session_id, idioma, confianza_idioma, tema, confianza_tema, anterior=None):
+    """Actualiza la sesión; la tabla solo se escribe si cambió el idioma o el tema respecto de `anterior`"""
+    estado = {
+        'idioma': idioma,
+        'confianza_idioma': round(confianza_idioma, 4),
+        'tema': tema,
+        'confianza_tema': round(confianza_tema, 4),
+        'actualizado_en': round(time.time(), 3)
+    }
+    recordar(session_id, estado)
+
+    cambio = anterior is None or anterior['idioma'] != idioma or anterior['tema'] != tema
+    if TABLA_SESIONES and cambio:
+        # Es una caché: una escritura perdida solo obliga a volver a detectar
+        obtener_ejecutor().submit(escribir_tabla, session_id, estado)
+
+def recordar(session_id, estado):
+    """Guarda el estado en el LRU del contenedor, desalojando la sesión menos reciente"""
+    if SESION_MAX_ENTRADAS <= 0:
+        return
+
+    _sesiones[session_id] = estado
+    _sesiones.move_to_end(session_id)
+    while len(_sesiones) > SESION_MAX_ENTRADAS:
+        _sesiones.popitem(last=False)
+
+def leer_tabla(session_id):
+    """Lee la sesión del nivel DynamoDB (None si no existe o falla la lectura)"""
+    try:
+        response = obtener_cliente('dynamodb').get_item(
+            TableName=TABLA_SESIONES,
+            Key={'sessionId': {'S': session_id}}
+        )
+    except Exception as e:
+        print(f"Error leyendo sesión: {e}")
+        return None
+
+    item = response.get('Item')
+    return deserializar_item(item) if item else None
+
+def escribir_tabla(session_id, estado):
+    """Escribe la sesión en el nivel DynamoDB con su vencimiento"""
+    item = dict(estado, sessionId=session_id, expira_en=int(estado['actualizado_en'] + SESION_TTL_SEGUNDOS))
+    if item['tema'] is None:
+        del item['tema']
+    try:
+        obtener_cliente('dynamodb').put_item(TableName=TABLA_SESIONES, Item=serializar_item(item))
+        _sesiones_stats['escrituras_tabla'] += 1
+    except Exception as e:
+        print(f"Error guardando sesión: {e}")
@@ -0,0 +1,8 @@
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, os.path.join(RAIZ, 'src', 'backend'))
+sys.path.insert(0, os.path.join(RAIZ, 'src', 'backend', 'lex-retraining-pipeline'))
+sys.path.insert(0, os.path.join(RAIZ, 'scripts', 'benchmarks'))
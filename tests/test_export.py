@@ -0,0 +1,48 @@
+import pytest
+
+boto3 = pytest.importorskip('boto3')
+moto = pytest.importorskip('moto')
+
+import export
+
+TIMESTAMPS = ['2026-10-18T10:00:00', '2026-10-18T11:55:00', '2026-10-18T12:05:00']
+
+
+@pytest.fixture
+def log_table(monkeypatch):
+    for name, value in (('AWS_DEFAULT_REGION', 'us-east-1'), ('AWS_ACCESS_KEY_ID', 'test'), ('AWS_SECRET_ACCESS_KEY', 'test')):
+        monkeypatch.setenv(name, value)
+    with moto.mock_aws():
+        client = boto3.client('dynamodb')
+        client.create_table(TableName='ChatSessionLogs', KeySchema=[{'AttributeName': 'sessionId', 'KeyType': 'HASH'}],
+                            AttributeDefinitions=[{'AttributeName': 'sessionId', 'AttributeType': 'S'}],
+                            BillingMode='PAY_PER_REQUEST')
+        for i, timestamp in enumerate(TIMESTAMPS):
+            client.put_item(TableName='ChatSessionLogs', Item={
+                'sessionId': {'S': str(i)}, 'inputText': {'S': f'hola {i}'}, 'detectedLanguage': {'S': 'es'},
+                'intent': {'S': 'FallbackIntent'}, 'timestamp': {'S': timestamp}
+            })
+        yield 'ChatSessionLogs'
+
+
+def test_rewind_timestamp():
+    assert export.rewind_timestamp('2026-10-18T12:00:00', 900) == '2026-10-18T11:45:00'
+    assert export.rewind_timestamp('2026-10-18T00:10:00.500000', 1200) == '2026-10-17T23:50:00.500000'
+
+
+def test_export_logs_rereads_the_overlap_window(log_table, tmp_path):
+    # El item de las 11:55 se escribió después de que la exportación anterior dejara el watermark en las 12:00
+    metrics = export.export_logs(log_table, str(tmp_path), 'us-east-1', segments=2, since='2026-10-18T12:00:00',
+                                 overlap_seconds=900)
+
+    assert metrics['scan_since'] == '2026-10-18T11:45:00'
+    assert metrics['rows_exported'] == 2
+    assert metrics['watermark'] == '2026-10-18T12:05:00'
+
+
+def test_export_logs_watermark_does_not_move_back(log_table, tmp_path):
+    metrics = export.export_logs(log_table, str(tmp_path), 'us-east-1', segments=2, since='2026-10-18T12:30:00',
+                                 overlap_seconds=3600)
+
+    assert metrics['rows_exported'] == 2
+    assert metrics['watermark'] == '2026-10-18T12:30:00'
@@ -0,0 +1,82 @@
+import signal
+
+import pytest
+
+import Fulfillment
+
+
+@pytest.fixture
+def sigterm(monkeypatch):
+    original = signal.getsignal(signal.SIGTERM)
+    monkeypatch.setattr(Fulfillment, '_senal_terminar', {'instalada': False, 'anterior': None})
+    yield
+    signal.signal(signal.SIGTERM, original)
+
+
+def test_importar_no_reemplaza_el_manejador_de_sigterm():
+    assert signal.getsignal(signal.SIGTERM) is not Fulfillment.terminar_por_senal
+
+
+def test_manejador_de_sigterm_encadena_el_anterior(sigterm, monkeypatch):
+    llamadas = []
+    monkeypatch.setattr(Fulfillment, 'vaciar_logs_al_terminar', lambda: llamadas.append('vaciar'))
+    signal.signal(signal.SIGTERM, lambda signum, frame: llamadas.append(signum))
+
+    Fulfillment.instalar_manejador_senal()
+    Fulfillment.instalar_manejador_senal()
+
+    assert signal.getsignal(signal.SIGTERM) is Fulfillment.terminar_por_senal
+    Fulfillment.terminar_por_senal(signal.SIGTERM, None)
+    assert llamadas == ['vaciar', signal.SIGTERM]
+
+
+def test_manejador_de_sigterm_sin_anterior_sale(sigterm):
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    Fulfillment.instalar_manejador_senal()
+
+    with pytest.raises(SystemExit):
+        Fulfillment.terminar_por_senal(signal.SIGTERM, None)
+
+
+def test_sigterm_ignorado_se_respeta(sigterm):
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    Fulfillment.instalar_manejador_senal()
+
+    assert signal.getsignal(signal.SIGTERM) == signal.SIG_IGN
+
+
+def test_vaciar_logs_al_terminar_sin_logs_no_imprime(monkeypatch, capsys):
+    monkeypatch.setattr(Fulfillment, '_logs_stats', {'encolados': 0, 'escritos': 0, 'descartados': 0, 'derramados': 0})
+
+    Fulfillment.vaciar_logs_al_terminar()
+
+    assert capsys.readouterr().out == ''
+
+
+def test_vaciar_logs_al_terminar_imprime_los_contadores(monkeypatch, capsys):
+    monkeypatch.setattr(Fulfillment, '_logs_stats', {'encolados': 2, 'escritos': 2, 'descartados': 0, 'derramados': 0})
+
+    Fulfillment.vaciar_logs_al_terminar()
+
+    assert 'Logs de sesión' in capsys.readouterr().out
+
+
+def test_vaciar_al_responder_solo_con_un_lote_pendiente(monkeypatch):
+    cola = Fulfillment.queue.Queue()
+    monkeypatch.setattr(Fulfillment, '_cola_logs', cola)
+    monkeypatch.setattr(Fulfillment, 'LOG_FLUSH_AL_RESPONDER', False)
+    monkeypatch.setattr(Fulfillment, 'LOG_FLUSH_UMBRAL', 3)
+
+    for _ in range(2):
+        cola.put({})
+    assert not Fulfillment.vaciar_al_responder()
+
+    cola.put({})
+    assert Fulfillment.vaciar_al_responder()
+
+    monkeypatch.setattr(Fulfillment, 'LOG_FLUSH_UMBRAL', 0)
+    assert not Fulfillment.vaciar_al_responder()
+    monkeypatch.setattr(Fulfillment, 'LOG_FLUSH_AL_RESPONDER', True)
+    assert Fulfillment.vaciar_al_responder()
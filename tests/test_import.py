@@ -0,0 +1,39 @@
+import importlib
+import time
+
+import pytest
+
+pytest.importorskip('boto3')
+
+lex_import = importlib.import_module('import')
+
+
+def describe_sequence(statuses):
+    responses = iter(statuses)
+    return lambda: {'botLocaleStatus': next(responses)}
+
+
+def wait_for_build(statuses, monkeypatch):
+    monkeypatch.setattr(lex_import.time, 'sleep', lambda seconds: None)
+    return lex_import.wait_for_status(
+        describe_sequence(statuses), 'botLocaleStatus', lex_import.BUILD_SUCCESS_STATUSES,
+        lex_import.BUILD_FAILURE_STATUSES, time.monotonic() + 60, label='el build',
+        progress_statuses=lex_import.BUILD_PROGRESS_STATUSES,
+        failure_after_progress_statuses=lex_import.BUILD_FAILURE_AFTER_PROGRESS_STATUSES
+    )
+
+
+def test_not_built_before_building_keeps_polling(monkeypatch):
+    response = wait_for_build(['NotBuilt', 'NotBuilt', 'Building', 'Built'], monkeypatch)
+
+    assert response['botLocaleStatus'] == 'Built'
+
+
+def test_not_built_after_building_is_a_failure(monkeypatch):
+    with pytest.raises(Exception, match='Fallo en el build'):
+        wait_for_build(['NotBuilt', 'Building', 'NotBuilt'], monkeypatch)
+
+
+def test_failed_is_always_terminal(monkeypatch):
+    with pytest.raises(Exception, match='Fallo en el build'):
+        wait_for_build(['Failed'], monkeypatch)
@@ -0,0 +1,191 @@
+import random
+
+import knowledge_base
+
+
+def distancia_osa(a, b):
+    """Distancia de alineamiento óptimo de cadenas por programación dinámica completa"""
+    d = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i][0] = i
+    for j in range(len(b) + 1):
+        d[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            costo = 0 if a[i - 1] == b[j - 1] else 1
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + costo)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[-1][-1]
+
+
+def terminos_fuerza_bruta(items):
+    """Término normalizado -> keyword, con las keywords antes que las variaciones"""
+    duenos = {}
+    for keyword in items:
+        duenos.setdefault(knowledge_base.normalizar_termino(keyword), keyword)
+    for keyword, item in items.items():
+        for variacion in item.get('variaciones', []):
+            duenos.setdefault(knowledge_base.normalizar_termino(variacion), keyword)
+    return duenos
+
+
+def buscar_fuerza_bruta(duenos, topic):
+    """Lo que buscar_difuso debe devolver, comparando el topic contra todos los términos"""
+    termino = knowledge_base.normalizar_termino(topic)
+    if termino in duenos:
+        return duenos[termino]
+
+    maximo = knowledge_base.distancia_permitida(termino)
+    if maximo == 0:
+        return None
+
+    distancias = {}
+    for candidato, keyword in duenos.items():
+        distancia = distancia_osa(termino, candidato)
+        if distancia <= maximo:
+            distancias.setdefault(distancia, set()).add(keyword)
+    if not distancias:
+        return None
+
+    mejores = distancias[min(distancias)]
+    return next(iter(mejores)) if len(mejores) == 1 else None
+
+
+def items_aleatorios(aleatorio, cantidad):
+    # Alfabeto chico para que haya muchos términos a distancia 1 y 2 entre sí
+    def palabra():
+        return ''.join(aleatorio.choice('abcd') for _ in range(aleatorio.randint(3, 9)))
+
+    items = {}
+    while len(items) < cantidad:
+        keyword = palabra()
+        items[keyword] = {'keyword': keyword, 'variaciones': [palabra() for _ in range(2)]}
+    return items
+
+
+def test_buscar_difuso_coincide_con_fuerza_bruta():
+    aleatorio = random.Random(7)
+    items = items_aleatorios(aleatorio, 150)
+    indice = knowledge_base.indexar_difuso(items)
+    duenos = terminos_fuerza_bruta(items)
+
+    for _ in range(1000):
+        topic = ''.join(aleatorio.choice('abcd') for _ in range(aleatorio.randint(2, 10)))
+        assert knowledge_base.buscar_difuso(indice, topic) == buscar_fuerza_bruta(duenos, topic), topic
+
+
+def test_buscar_difuso_no_supera_la_distancia_maxima():
+    items = {'bbdbccdb': {'keyword': 'bbdbccdb', 'variaciones': []}}
+    indice = knowledge_base.indexar_difuso(items)
+
+    assert distancia_osa('bbcdccbd', 'bbdbccdb') == 3
+    assert knowledge_base.buscar_difuso(indice, 'bbcdccbd') is None
+
+
+def test_buscar_difuso_topics_mal_escritos():
+    items = {
+        'precio': {'keyword': 'precio', 'variaciones': ['costo', 'preço']},
+        'horario': {'keyword': 'horario', 'variaciones': ['hours']},
+        'ubicacion': {'keyword': 'ubicacion', 'variaciones': ['location']}
+    }
+    indice = knowledge_base.indexar_difuso(items)
+
+    assert knowledge_base.buscar_difuso(indice, 'precioo') == 'precio'
+    assert knowledge_base.buscar_difuso(indice, 'horaro') == 'horario'
+    assert knowledge_base.buscar_difuso(indice, 'ubicasion') == 'ubicacion'
+    assert knowledge_base.buscar_difuso(indice, 'Ubicación') == 'ubicacion'
+    assert knowledge_base.buscar_difuso(indice, 'preco') == 'precio'
+    assert knowledge_base.buscar_difuso(indice, 'sol') is None
+
+
+def test_actualizar_difuso_equivale_a_reconstruir():
+    aleatorio = random.Random(11)
+    items = items_aleatorios(aleatorio, 150)
+    indice = knowledge_base.indexar_difuso(items)
+
+    for _ in range(5):
+        # Igual que aplicar_cambios: las keywords modificadas pasan al final de los items
+        keywords = aleatorio.sample(list(items), 10) + [f'nueva{aleatorio.randrange(1000)}']
+        nuevos = dict(items)
+        for keyword in keywords:
+            nuevos.pop(keyword, None)
+        for keyword in keywords[::2]:
+            nuevos[keyword] = {'keyword': keyword, 'variaciones': [''.join(aleatorio.choice('abcd') for _ in range(6))]}
+
+        indice = knowledge_base.actualizar_difuso(indice, items, nuevos, keywords)
+        items = nuevos
+        completo = knowledge_base.indexar_difuso(items)
+        duenos = terminos_fuerza_bruta(items)
+
+        assert indice['borrados'] is not completo['borrados']
+        assert indice['terminos'] == completo['terminos'] == duenos
+        for _ in range(300):
+            topic = ''.join(aleatorio.choice('abcd') for _ in range(aleatorio.randint(2, 10)))
+            assert knowledge_base.buscar_difuso(indice, topic) == buscar_fuerza_bruta(duenos, topic), topic
+
+
+def test_actualizar_difuso_no_modifica_el_indice_anterior():
+    items = {'precio': {'keyword': 'precio', 'variaciones': ['costo']}}
+    indice = knowledge_base.indexar_difuso(items)
+    nuevos = {'horario': {'keyword': 'horario', 'variaciones': []}}
+
+    actualizado = knowledge_base.actualizar_difuso(indice, items, nuevos, ['precio', 'horario'])
+
+    assert knowledge_base.buscar_difuso(indice, 'precioo') == 'precio'
+    assert knowledge_base.buscar_difuso(indice, 'horaro') is None
+    assert knowledge_base.buscar_difuso(actualizado, 'precioo') is None
+    assert knowledge_base.buscar_difuso(actualizado, 'horaro') == 'horario'
+
+
+def test_indice_difuso_se_construye_en_segundo_plano(monkeypatch):
+    items = {'ubicacion': {'keyword': 'ubicacion', 'variaciones': ['location'], 'respuesta_es': 'Calle 1'}}
+    monkeypatch.setitem(knowledge_base._snapshot, 'items', items)
+    monkeypatch.setitem(knowledge_base._snapshot, 'variaciones', knowledge_base.indexar_variaciones(items))
+    monkeypatch.setitem(knowledge_base._snapshot, 'difuso', None)
+    monkeypatch.setitem(knowledge_base._snapshot, 'verificado_en', float('inf'))
+    avisos = []
+    monkeypatch.setattr(knowledge_base, '_suscriptores', [lambda: avisos.append(True)])
+
+    # El primer topic sin coincidencia pide el índice y, mientras se construye, no se resuelve
+    assert knowledge_base.obtener_respuesta('location', 'es', difuso=True) == 'Calle 1'
+    assert knowledge_base._construccion['futuro'] is None
+    assert knowledge_base.obtener_respuesta('ubicasion', 'es', difuso=True) is None
+    futuro = knowledge_base._construccion['futuro']
+    futuro.result()
+    assert avisos == []
+
+    # Se publica desde el hilo del handler en la siguiente consulta
+    assert knowledge_base.obtener_respuesta('ubicasion', 'es', difuso=True) == 'Calle 1'
+    assert knowledge_base._construccion['futuro'] is None
+    assert avisos == [True]
+
+
+def test_obtener_snapshot_reintenta_la_primera_carga_tras_una_espera(monkeypatch):
+    monkeypatch.setitem(knowledge_base._snapshot, 'items', {})
+    monkeypatch.setitem(knowledge_base._snapshot, 'variaciones', {})
+    monkeypatch.setitem(knowledge_base._snapshot, 'version', None)
+    monkeypatch.setitem(knowledge_base._snapshot, 'verificado_en', None)
+    monkeypatch.setattr(knowledge_base, '_suscriptores', [])
+    items = {'precio': {'keyword': 'precio', 'variaciones': [], 'respuesta_es': '10 USD'}}
+    resultados = [RuntimeError('scan falló'), {'items': items, 'variaciones': {}, 'difuso': None, 'version': 1}]
+
+    def calcular_actualizacion(*argumentos):
+        resultado = resultados.pop(0)
+        if isinstance(resultado, Exception):
+            raise resultado
+        return resultado
+
+    monkeypatch.setattr(knowledge_base, 'calcular_actualizacion', calcular_actualizacion)
+    monkeypatch.setattr(knowledge_base, '_primera_carga', {'fallo_en': None})
+
+    # Dos consultas seguidas tras el fallo hacen una sola carga
+    assert knowledge_base.obtener_respuesta('precio', 'es') is None
+    assert knowledge_base.obtener_respuesta('precio', 'es') is None
+    assert knowledge_base._snapshot['verificado_en'] is None
+    assert len(resultados) == 1
+
+    # Pasada la espera se reintenta
+    monkeypatch.setattr(knowledge_base, 'REINTENTO_CARGA_SEGUNDOS', 0)
+    assert knowledge_base.obtener_respuesta('precio', 'es') == '10 USD'
+    assert resultados == []
@@ -0,0 +1,58 @@
+import pytest
+
+import Orchestrator
+
+
+@pytest.mark.parametrize('mensaje, idioma, tema', [
+    ('What is the price?', 'en', 'precio'),
+    ('What are your business hours?', 'en', 'horario'),
+    ('Qual é o preço do plano?', 'pt', 'precio'),
+    ('Onde fica o endereço?', 'pt', 'ubicacion'),
+    ('Hello there', 'en', 'saludo'),
+    ('Olá', 'pt', 'saludo'),
+    ('Hola, ¿cuál es el precio?', 'es', 'precio')
+])
+def test_resolver_tema_sobre_el_texto_traducido(mensaje, idioma, tema):
+    assert Orchestrator.resolver_tema(mensaje, idioma) == tema
+
+
+@pytest.mark.parametrize('mensaje, tema', [
+    ('precios', 'precio'),
+    ('¿Cuáles son los precios?', 'precio'),
+    ('prices', 'precio'),
+    ('What are your prices?', 'precio'),
+    ('horarios de atención', 'horario'),
+    ('schedules?', 'horario'),
+    ('Quais são os preços?', 'precio'),
+    ('ubicaciones', 'ubicacion'),
+    ('¿Dónde está la ubicación?', 'ubicacion'),
+    ('contactar', 'contacto')
+])
+def test_resolver_tema_reconoce_plurales_y_formas_flexionadas(mensaje, tema):
+    clave = Orchestrator.normalizar_mensaje(mensaje)
+    idioma, _ = Orchestrator.detectar_idioma(clave)
+    assert Orchestrator.resolver_tema(clave, idioma) == tema
+
+
+@pytest.mark.parametrize('mensaje, tema', [
+    ('I need help', 'contacto'),
+    ('Preciso de ajuda', 'contacto')
+])
+def test_resolver_tema_sin_senal_de_idioma_prueba_cada_diccionario(mensaje, tema):
+    # Ninguna palabra puntúa un idioma: la detección cae en español
+    clave = Orchestrator.normalizar_mensaje(mensaje)
+    assert Orchestrator.detectar_idioma(clave)[0] == 'es'
+    assert Orchestrator.resolver_tema(clave, 'es') == tema
+
+
+@pytest.mark.parametrize('mensaje, idioma', [
+    ('sometimes', 'en'),
+    ('placement', 'en'),
+    ('this is it', 'en'),
+    ('chihuahua', 'es'),
+    ('hospitalidad', 'es'),
+    ('his', 'en'),
+    ('sometimes', 'es')
+])
+def test_resolver_tema_solo_con_palabras_completas(mensaje, idioma):
+    assert Orchestrator.resolver_tema(mensaje, idioma) == 'error'
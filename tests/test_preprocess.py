@@ -0,0 +1,46 @@
+import argparse
+
+import pandas as pd
+
+import preprocess
+
+
+def read_partitions(paths):
+    rows = []
+    for path in paths:
+        with open(path, encoding='utf-8') as handle:
+            rows.extend(line.rstrip('\n').split(',', 1) for line in handle)
+    return rows
+
+
+def test_spill_to_partitions_keeps_full_64_bit_hashes(tmp_path):
+    # Una utterance que solo tiene puntuación deja la clave vacía en el mismo bloque
+    chunk = pd.DataFrame({'utterance': ['¿Cuál es el PRECIO?', '¿?', 'horario de atención']})
+    removed = {'empty': 0, 'unsupported_locale': 0}
+
+    paths, rows_read = preprocess.spill_to_partitions([chunk], str(tmp_path), 4, ['es_ES'], removed)
+
+    assert rows_read == 3
+    assert removed == {'empty': 1, 'unsupported_locale': 0}
+    rows = read_partitions(paths['es_ES'])
+    assert sorted(int(value) for value, _ in rows) == sorted([
+        preprocess.key_hash('cual es el precio'),
+        preprocess.key_hash('horario de atencion')
+    ])
+
+
+def test_write_locale_output_with_empty_blocks_after_dedup(tmp_path):
+    # Con un bloque por fila, cada duplicado exacto llega a los casi duplicados como un bloque vacío
+    chunk = pd.DataFrame({'utterance': ['cual es el precio', 'cual es el precio', 'horario', 'horario']})
+    removed = {'empty': 0, 'unsupported_locale': 0, 'exact_duplicate': 0, 'already_imported': 0, 'near_duplicate': 0}
+    paths, _ = preprocess.spill_to_partitions([chunk], str(tmp_path), 1, ['es_ES'], removed)
+    args = argparse.Namespace(chunk_size=1, near_duplicates=True, near_dup_threshold=0.8, minhash_permutations=64,
+                              lsh_bands=16, fingerprint_store_prefix=None)
+    locale_path = tmp_path / 'es_ES'
+
+    rows_written = preprocess.write_locale_output('es_ES', paths['es_ES'], str(locale_path), args, removed)
+
+    assert rows_written == 2
+    assert removed['exact_duplicate'] == 2
+    output = (locale_path / preprocess.OUTPUT_FILENAME).read_text(encoding='utf-8').splitlines()
+    assert output == ['cual es el precio', 'horario']